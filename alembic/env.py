@@ -13,7 +13,11 @@ from src.models.base import Base
 # Import the SQLAlchemy models
 from src.models.user_model import User
 from src.models.role_model import Role
+from src.models.permission_model import Permission
 from src.models.token_model import Token
+from src.models.revoked_token_model import RevokedToken
+from src.models.session_model import UserSession
+from src.models.auth_event_model import AuthEvent
 
 # Load environment variables from the .env file
 load_dotenv()
@@ -31,12 +35,6 @@ DATABASE_URL = f"postgresql://{DB_USERNAME}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{D
 # Set target_metadata to include all models registered with Base
 target_metadata = Base.metadata
 
-# Create the SQLAlchemy engine with connection pooling
-engine = create_engine(
-    DATABASE_URL,
-    poolclass=pool.NullPool
-)
-
 def run_migrations_offline():
     """
     Run migrations in 'offline' mode.
@@ -61,18 +59,30 @@ def run_migrations_online():
     Run migrations in 'online' mode.
     
     In online mode, Alembic connects to the database and applies
-    the migrations directly.
+    the migrations directly. A caller that already holds a connection
+    (src.utils.migrations, while holding the migration lock) passes it
+    in through `config.attributes["connection"]`.
     """
-    connectable = engine
+    connection = context.config.attributes.get("connection")
+    if connection is not None:
+        _run_migrations(connection)
+        return
+
+    engine = create_engine(
+        DATABASE_URL,
+        poolclass=pool.NullPool
+    )
+    with engine.connect() as connection:
+        _run_migrations(connection)
 
-    with connectable.connect() as connection:
-        context.configure(
-            connection=connection,
-            target_metadata=target_metadata,
-        )
+def _run_migrations(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+    )
 
-        with context.begin_transaction():
-            context.run_migrations()
+    with context.begin_transaction():
+        context.run_migrations()
 
 # Determine if Alembic is running in offline or online mode
 if context.is_offline_mode():
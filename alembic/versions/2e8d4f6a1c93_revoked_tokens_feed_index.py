@@ -0,0 +1,26 @@
+"""Revoked tokens feed index
+
+Revision ID: 2e8d4f6a1c93
+Revises: 9c1e5b7a2d40
+Create Date: 2026-10-18 18:41:09.226075
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e8d4f6a1c93'
+down_revision: Union[str, None] = '9c1e5b7a2d40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_revoked_tokens_revoked_at_id', 'revoked_tokens', ['revoked_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_revoked_tokens_revoked_at_id', table_name='revoked_tokens')
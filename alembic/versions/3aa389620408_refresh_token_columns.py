@@ -0,0 +1,55 @@
+"""Refresh token columns
+
+Revision ID: 3aa389620408
+Revises: 640ebe8122e2
+Create Date: 2026-10-18 09:12:40.118302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3aa389620408'
+down_revision: Union[str, None] = '640ebe8122e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The tokens table was never written to, so it can be reshaped in place
+    op.execute("DELETE FROM tokens")
+    op.drop_constraint('tokens_token_key', 'tokens', type_='unique')
+    op.alter_column('tokens', 'token', new_column_name='token_hash',
+                    existing_type=sa.String(), type_=sa.String(length=64), nullable=False)
+    op.create_unique_constraint('uq_tokens_token_hash', 'tokens', ['token_hash'])
+    op.alter_column('tokens', 'user_id', existing_type=sa.Integer(), nullable=False)
+    op.create_foreign_key('fk_tokens_user_id_users', 'tokens', 'users', ['user_id'], ['id'])
+    op.create_index(op.f('ix_tokens_user_id'), 'tokens', ['user_id'], unique=False)
+    op.add_column('tokens', sa.Column('family_id', sa.String(length=32), nullable=False))
+    op.add_column('tokens', sa.Column('device', sa.String(), nullable=True))
+    op.add_column('tokens', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    op.add_column('tokens', sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False))
+    op.add_column('tokens', sa.Column('used_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('tokens', sa.Column('revoked_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index(op.f('ix_tokens_family_id'), 'tokens', ['family_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM tokens")
+    op.drop_index(op.f('ix_tokens_family_id'), table_name='tokens')
+    op.drop_column('tokens', 'revoked_at')
+    op.drop_column('tokens', 'used_at')
+    op.drop_column('tokens', 'expires_at')
+    op.drop_column('tokens', 'created_at')
+    op.drop_column('tokens', 'device')
+    op.drop_column('tokens', 'family_id')
+    op.drop_index(op.f('ix_tokens_user_id'), table_name='tokens')
+    op.drop_constraint('fk_tokens_user_id_users', 'tokens', type_='foreignkey')
+    op.alter_column('tokens', 'user_id', existing_type=sa.Integer(), nullable=True)
+    op.drop_constraint('uq_tokens_token_hash', 'tokens', type_='unique')
+    op.alter_column('tokens', 'token_hash', new_column_name='token',
+                    existing_type=sa.String(length=64), type_=sa.String(), nullable=True)
+    op.create_unique_constraint('tokens_token_key', 'tokens', ['token'])
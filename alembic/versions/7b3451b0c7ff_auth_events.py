@@ -0,0 +1,55 @@
+"""Auth events
+
+Revision ID: 7b3451b0c7ff
+Revises: 4f64906e3f27
+Create Date: 2026-10-18 15:37:22.518903
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b3451b0c7ff'
+down_revision: Union[str, None] = '4f64906e3f27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('auth_events',
+    sa.Column('id', sa.String(length=32), nullable=False),
+    sa.Column('occurred_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('event_type', sa.String(length=16), nullable=False),
+    sa.Column('outcome', sa.String(length=32), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('ip', sa.String(length=45), nullable=True),
+    sa.Column('user_agent', sa.String(length=512), nullable=True),
+    sa.Column('latency_ms', sa.Float(), nullable=True),
+    sa.PrimaryKeyConstraint('id', 'occurred_at'),
+    postgresql_partition_by='RANGE (occurred_at)'
+    )
+    op.create_index(op.f('ix_auth_events_user_id'), 'auth_events', ['user_id'], unique=False)
+
+    # Rows outside every monthly partition land here; the app creates upcoming months ahead of time
+    op.execute("CREATE TABLE auth_events_default PARTITION OF auth_events DEFAULT")
+    today = date.today()
+    for offset in range(2):
+        year, month = divmod(today.month - 1 + offset, 12)
+        start = date(today.year + year, month + 1, 1)
+        year, month = divmod(start.month, 12)
+        end = date(start.year + year, month + 1, 1)
+        op.execute(
+            f"CREATE TABLE auth_events_{start:%Y_%m} PARTITION OF auth_events "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+
+
+def downgrade() -> None:
+    # Dropping the parent drops every partition with it
+    op.drop_index(op.f('ix_auth_events_user_id'), table_name='auth_events')
+    op.drop_table('auth_events')
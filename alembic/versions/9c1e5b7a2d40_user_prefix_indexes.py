@@ -0,0 +1,30 @@
+"""User prefix indexes
+
+Revision ID: 9c1e5b7a2d40
+Revises: 7b3451b0c7ff
+Create Date: 2026-10-18 16:02:44.518301
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9c1e5b7a2d40'
+down_revision: Union[str, None] = '7b3451b0c7ff'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Not CONCURRENTLY: that needs autocommit, which would release the advisory
+    # lock src.utils.migrations holds for the length of the upgrade transaction
+    op.create_index('ix_users_username_lower_prefix', 'users', [sa.text('lower(username) text_pattern_ops')], unique=False)
+    op.create_index('ix_users_email_lower_prefix', 'users', [sa.text('lower(email) text_pattern_ops')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_email_lower_prefix', table_name='users')
+    op.drop_index('ix_users_username_lower_prefix', table_name='users')
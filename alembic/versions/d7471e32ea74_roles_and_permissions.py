@@ -0,0 +1,79 @@
+"""Roles and permissions
+
+Revision ID: d7471e32ea74
+Revises: fc3add938cff
+Create Date: 2026-10-18 13:26:51.904417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7471e32ea74'
+down_revision: Union[str, None] = 'fc3add938cff'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Snapshot of src.utils.permissions.PERMISSION_BITS at this revision
+PERMISSIONS = {
+    "users:read": 0,
+    "users:write": 1,
+    "users:import": 2,
+    "roles:manage": 3,
+    "tokens:introspect": 4,
+}
+
+
+def upgrade() -> None:
+    permissions = op.create_table('permissions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('bit', sa.SmallInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name'),
+    sa.UniqueConstraint('bit')
+    )
+    op.create_index(op.f('ix_permissions_id'), 'permissions', ['id'], unique=False)
+    op.create_table('user_roles',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('role_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['role_id'], ['roles.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'role_id')
+    )
+    op.create_index(op.f('ix_user_roles_role_id'), 'user_roles', ['role_id'], unique=False)
+    op.create_table('role_permissions',
+    sa.Column('role_id', sa.Integer(), nullable=False),
+    sa.Column('permission_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['role_id'], ['roles.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['permission_id'], ['permissions.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('role_id', 'permission_id')
+    )
+
+    # Keep existing single-user role assignments, then drop the one-user-per-role column
+    op.execute("INSERT INTO user_roles (user_id, role_id) SELECT user_id, id FROM roles WHERE user_id IS NOT NULL")
+    op.drop_constraint('roles_user_id_fkey', 'roles', type_='foreignkey')
+    op.drop_column('roles', 'user_id')
+
+    op.bulk_insert(permissions, [{"name": name, "bit": bit} for name, bit in PERMISSIONS.items()])
+    # An admin role holding every permission, assigned by operators
+    op.execute("INSERT INTO roles (name) SELECT 'admin' WHERE NOT EXISTS (SELECT 1 FROM roles WHERE name = 'admin')")
+    op.execute(
+        "INSERT INTO role_permissions (role_id, permission_id) "
+        "SELECT roles.id, permissions.id FROM roles CROSS JOIN permissions WHERE roles.name = 'admin'"
+    )
+
+
+def downgrade() -> None:
+    op.add_column('roles', sa.Column('user_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('roles_user_id_fkey', 'roles', 'users', ['user_id'], ['id'])
+    # Only one user per role fits the old shape
+    op.execute("UPDATE roles SET user_id = (SELECT min(user_id) FROM user_roles WHERE user_roles.role_id = roles.id)")
+    op.drop_table('role_permissions')
+    op.drop_index(op.f('ix_user_roles_role_id'), table_name='user_roles')
+    op.drop_table('user_roles')
+    op.drop_index(op.f('ix_permissions_id'), table_name='permissions')
+    op.drop_table('permissions')
@@ -0,0 +1,136 @@
+"""
+Compare the pure-ASGI AuthMiddleware with the previous BaseHTTPMiddleware
+implementation under concurrent load.
+
+Runs fully in-process against a minimal app, so no database is needed:
+
+    python -m benchmarks.bench_auth_middleware --requests 5000 --concurrency 100
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+import httpx
+from fastapi import FastAPI, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from src.schemas.user_schema import UserResponse
+from src.utils.auth_middleware import AuthMiddleware
+from src.utils.jwt_utils import create_access_token, decode_access_token
+from src.utils.token_cache import token_cache
+
+EXEMPT_PATHS = ["/auth/", "/docs", "/redoc", "/openapi.json"]
+
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware implementation AuthMiddleware replaced."""
+
+    def __init__(self, app, exempt_paths: list[str] = None):
+        super().__init__(app)
+        self.exempt_paths = exempt_paths or []
+
+    async def dispatch(self, request: Request, call_next):
+        if any(request.url.path.startswith(path) for path in self.exempt_paths):
+            return await call_next(request)
+
+        auth_header = request.headers.get("Authorization")
+        if auth_header:
+            token_type, token = auth_header.split()
+            if token_type.lower() != "bearer":
+                return JSONResponse(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    content={"error": True, "message": "Invalid token type", "data": None},
+                )
+        else:
+            return JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"error": True, "message": "Authorization header missing", "data": None},
+            )
+
+        try:
+            user_response = token_cache.get(token)
+            if user_response is None:
+                user = decode_access_token(token)
+                if user is None:
+                    raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+                user_response = UserResponse.model_validate(user)
+                token_cache.set(token, user_response, exp=user.get("exp"))
+            request.state.user = user_response
+        except Exception as e:
+            return JSONResponse(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                content={"error": True, "message": str(e), "data": None},
+            )
+
+        return await call_next(request)
+
+
+def build_app(middleware_class) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(middleware_class, exempt_paths=EXEMPT_PATHS)
+
+    @app.get("/users/me")
+    async def me(request: Request):
+        return {"error": False, "message": "Request successful", "data": request.state.user.model_dump()}
+
+    return app
+
+
+async def run_load(app: FastAPI, headers: dict, total: int, concurrency: int) -> dict:
+    latencies: list[float] = []
+    remaining = iter(range(total))
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            for _ in remaining:
+                start = time.perf_counter()
+                response = await client.get("/users/me", headers=headers)
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200, response.text
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "rps": total / elapsed,
+        "p50_ms": quantiles[49] * 1000,
+        "p95_ms": quantiles[94] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+    }
+
+
+async def main(total: int, concurrency: int) -> dict:
+    token = create_access_token({"id": 1, "username": "bench", "email": "bench@example.com"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    results = {}
+    for name, middleware_class in (("base_http", LegacyAuthMiddleware), ("pure_asgi", AuthMiddleware)):
+        token_cache.clear()  # the two implementations cache different value types
+        app = build_app(middleware_class)
+        await run_load(app, headers, min(total, 200), concurrency)  # warm-up
+        results[name] = await run_load(app, headers, total, concurrency)
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args.requests, args.concurrency))
+    for name, stats in results.items():
+        print(
+            f"{name:>10}: {stats['rps']:8.0f} req/s  p50 {stats['p50_ms']:6.2f} ms  "
+            f"p95 {stats['p95_ms']:6.2f} ms  p99 {stats['p99_ms']:6.2f} ms"
+        )
@@ -0,0 +1,69 @@
+"""
+Micro-benchmarks for the auth hot paths (pytest-benchmark).
+
+Runs offline, no database needed:
+
+    python -m pytest benchmarks/bench_micro.py --benchmark-autosave
+
+Saved runs land in .benchmarks/ as JSON tagged with the git commit; compare
+two of them with `pytest-benchmark compare 0001 0002`.
+"""
+import os
+
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+import pytest
+
+from src.models.response_model import ResponseModel
+from src.schemas.user_schema import UserResponse
+from src.utils.hash_utils import hash_password_sync, verify_password_sync
+from src.utils.jwt_utils import create_access_token, decode_access_token
+from src.utils.token_cache import TokenCache
+
+CLAIMS = {"id": 42, "username": "bench", "email": "bench@example.com"}
+PASSWORD = "correct horse battery staple"
+
+
+@pytest.fixture(scope="module")
+def access_token():
+    return create_access_token(CLAIMS)
+
+
+@pytest.fixture(scope="module")
+def password_hash():
+    return hash_password_sync(PASSWORD)
+
+
+def test_create_access_token(benchmark):
+    benchmark(create_access_token, CLAIMS)
+
+
+def test_decode_access_token(benchmark, access_token):
+    claims = benchmark(decode_access_token, access_token)
+    assert claims["id"] == CLAIMS["id"]
+
+
+def test_token_cache_hit(benchmark, access_token):
+    cache = TokenCache(maxsize=1000, ttl=300)
+    cache.set(access_token, UserResponse.model_validate(CLAIMS))
+    assert benchmark(cache.get, access_token) is not None
+
+
+def test_get_password_hash(benchmark):
+    # Hashing is deliberately slow, so keep the round count small
+    benchmark.pedantic(hash_password_sync, args=(PASSWORD,), rounds=5, iterations=1)
+
+
+def test_verify_password(benchmark, password_hash):
+    assert benchmark.pedantic(verify_password_sync, args=(PASSWORD, password_hash), rounds=5, iterations=1)
+
+
+def test_response_model_serialization(benchmark):
+    user = UserResponse.model_validate(CLAIMS)
+
+    def serialize():
+        return ResponseModel(error=False, message="Request successful", data=user.model_dump()).model_dump_json()
+
+    benchmark(serialize)
@@ -0,0 +1,202 @@
+"""
+Scripted HTTP load scenario: register, login, GET /users/me, GET /users/{id}.
+
+By default the app runs in-process against a throwaway SQLite database, so
+no server or Postgres is needed:
+
+    python -m benchmarks.load_test --users 50 --concurrency 20
+
+Point DATABASE_URL at a local Postgres (with migrations applied) to measure
+against the real driver, or pass --base-url to load an already running
+server. Per-step p50/p95/p99 latency and RPS are printed and written to a
+JSON file tagged with the current git commit; pass --compare with an earlier
+file to print the change per step.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{tempfile.mkdtemp(prefix='inquest-auth-load-')}/load.db"
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+
+import httpx
+
+STEPS = ("register", "login", "users_me", "user_by_id")
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {step: [] for step in STEPS}
+        self.errors: dict[str, int] = {step: 0 for step in STEPS}
+        self.elapsed: dict[str, float] = {}
+
+    async def timed(self, step: str, request) -> httpx.Response:
+        start = time.perf_counter()
+        response = await request
+        self.latencies[step].append(time.perf_counter() - start)
+        if response.status_code >= 400:
+            self.errors[step] += 1
+        return response
+
+    def report(self) -> dict:
+        summary = {}
+        for step in STEPS:
+            samples = sorted(self.latencies[step])
+            if not samples:
+                continue
+            quantiles = statistics.quantiles(samples, n=100) if len(samples) > 1 else samples * 99
+            summary[step] = {
+                "requests": len(samples),
+                "errors": self.errors[step],
+                "rps": len(samples) / self.elapsed[step],
+                "p50_ms": quantiles[49] * 1000,
+                "p95_ms": quantiles[94] * 1000,
+                "p99_ms": quantiles[98] * 1000,
+            }
+        return summary
+
+
+async def run_step(step: str, recorder: Recorder, jobs: list, concurrency: int) -> list:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(job):
+        async with semaphore:
+            return await recorder.timed(step, job())
+
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(run(job) for job in jobs))
+    recorder.elapsed[step] = time.perf_counter() - started
+    return responses
+
+
+async def scenario(client: httpx.AsyncClient, users: int, concurrency: int, reads_per_user: int) -> dict:
+    recorder = Recorder()
+    run_id = uuid.uuid4().hex[:8]
+    accounts = [
+        {"username": f"load-{run_id}-{i}", "email": f"load-{run_id}-{i}@example.com", "password": f"pw-{run_id}-{i}"}
+        for i in range(users)
+    ]
+
+    registered = await run_step("register", recorder, [
+        (lambda account=account: client.post("/auth/register", json=account)) for account in accounts
+    ], concurrency)
+    user_ids = [response.json()["data"]["id"] for response in registered if response.status_code == 200]
+
+    logins = await run_step("login", recorder, [
+        (lambda account=account: client.post("/auth/login", json={"email": account["email"], "password": account["password"]}))
+        for account in accounts
+    ], concurrency)
+    headers = [
+        {"Authorization": f"Bearer {response.json()['data']['access_token']}"}
+        for response in logins if response.status_code == 200
+    ]
+    if not headers or not user_ids:
+        raise SystemExit("Registration or login failed; check the server logs")
+
+    await run_step("users_me", recorder, [
+        (lambda header=header: client.get("/users/me", headers=header))
+        for header in headers for _ in range(reads_per_user)
+    ], concurrency)
+
+    await run_step("user_by_id", recorder, [
+        (lambda header=header, user_id=user_id: client.get(f"/users/{user_id}", headers=header))
+        for header, user_id in zip(headers, user_ids) for _ in range(reads_per_user)
+    ], concurrency)
+
+    return recorder.report()
+
+
+async def run_in_process(users: int, concurrency: int, reads_per_user: int) -> dict:
+    from src.env.database import engine
+    from src.main import app
+    from src.models.base import Base
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+        return await scenario(client, users, concurrency, reads_per_user)
+
+
+async def run_remote(base_url: str, users: int, concurrency: int, reads_per_user: int) -> dict:
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        return await scenario(client, users, concurrency, reads_per_user)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_comparison(current: dict, baseline: dict) -> None:
+    print(f"\nChange vs {baseline.get('commit', '?')} ({baseline.get('timestamp', '?')}):")
+    for step, stats in current["results"].items():
+        before = baseline["results"].get(step)
+        if not before:
+            continue
+        deltas = "  ".join(
+            f"{metric} {(stats[metric] - before[metric]) / before[metric] * 100:+6.1f}%"
+            for metric in ("rps", "p50_ms", "p95_ms", "p99_ms")
+            if before[metric]
+        )
+        print(f"{step:>12}: {deltas}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--reads-per-user", type=int, default=10)
+    parser.add_argument("--base-url", help="Load a running server instead of the in-process app")
+    parser.add_argument("--output", help="Where to write the JSON results (default: benchmarks/results/<commit>-<time>.json)")
+    parser.add_argument("--compare", help="A previous results file to compare against")
+    args = parser.parse_args()
+
+    if args.base_url:
+        results = asyncio.run(run_remote(args.base_url, args.users, args.concurrency, args.reads_per_user))
+    else:
+        results = asyncio.run(run_in_process(args.users, args.concurrency, args.reads_per_user))
+
+    now = datetime.now(timezone.utc)
+    report = {
+        "commit": git_commit(),
+        "timestamp": now.isoformat(),
+        "target": args.base_url or os.environ["DATABASE_URL"].split("://")[0],
+        "parameters": {"users": args.users, "concurrency": args.concurrency, "reads_per_user": args.reads_per_user},
+        "results": results,
+    }
+
+    for step, stats in results.items():
+        print(
+            f"{step:>12}: {stats['requests']:6d} req  {stats['errors']:4d} err  {stats['rps']:8.1f} req/s  "
+            f"p50 {stats['p50_ms']:8.2f} ms  p95 {stats['p95_ms']:8.2f} ms  p99 {stats['p99_ms']:8.2f} ms"
+        )
+
+    output = args.output or os.path.join(
+        os.path.dirname(__file__), "results", f"{report['commit']}-{now.strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as results_file:
+        json.dump(report, results_file, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            print_comparison(report, json.load(baseline_file))
+
+
+if __name__ == "__main__":
+    main()
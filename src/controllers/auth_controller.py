@@ -1,30 +1,41 @@
+from urllib.parse import parse_qs
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.models.login_model import LoginModel
 from src.models.response_model import ResponseModel
 from src.env.database import get_db
-from src.schemas.user_schema import UserCreate
+from src.schemas.token_schema import IntrospectionResponse, RefreshTokenRequest, RevokeTokenRequest, TokenResponse
+from src.schemas.user_schema import UserCreate, UserResponse
 from src.services.auth_service import AuthService
+from src.utils.auth_middleware import public
+from src.utils.permissions import require_permission
+from src.utils.rate_limiter import limit_login_by_ip, login_rate_limiter
+from src.utils.responses import ModelResponse
 
 router = APIRouter()
 auth_service = AuthService()
 
 
-@router.post("/register", response_model=ResponseModel)
-async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
+@router.post("/register", response_model=ResponseModel[UserResponse])
+@public
+async def register(user: UserCreate, request: Request, db: AsyncSession = Depends(get_db)):
     try:
-        new_user = await auth_service.register_user(user, db)
-        return new_user
+        new_user = await auth_service.register_user(
+            user, db, ip=request.client.host if request.client else None, device=request.headers.get("User-Agent")
+        )
+        return ModelResponse(new_user)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
 
-@router.post("/login", response_model=ResponseModel)
+@router.post("/login", response_model=ResponseModel[TokenResponse], dependencies=[Depends(limit_login_by_ip)])
+@public
 async def login(request: Request, db: AsyncSession = Depends(get_db)):
     content_type = request.headers.get('Content-Type', '')
 
@@ -41,7 +52,13 @@ async def login(request: Request, db: AsyncSession = Depends(get_db)):
                 detail="Unsupported content type"
             )
 
-        response = await auth_service.authenticate_user(form_data.email, form_data.password, db)
+        # Throttle per target account before any query or hash runs
+        await login_rate_limiter.check_email(form_data.email)
+
+        response = await auth_service.authenticate_user(
+            form_data.email, form_data.password, db, device=request.headers.get("User-Agent"),
+            ip=request.client.host if request.client else None
+        )
         
         if response.error:
             raise HTTPException(
@@ -49,9 +66,50 @@ async def login(request: Request, db: AsyncSession = Depends(get_db)):
                 detail=response.message
             )
 
-        return response
+        return ModelResponse(response)
 
     except ValidationError as e:
         raise RequestValidationError(e.errors())
-    except HTTPException as e:
-        raise HTTPException(status_code=e.status_code, detail=e.detail)
\ No newline at end of file
+    except HTTPException:
+        # Re-raise untouched so headers such as Retry-After survive
+        raise
+
+@router.post("/refresh", response_model=ResponseModel[TokenResponse])
+@public
+async def refresh(body: RefreshTokenRequest, request: Request, db: AsyncSession = Depends(get_db)):
+    response = await auth_service.refresh_session(
+        body.refresh_token, db, device=request.headers.get("User-Agent")
+    )
+    if response.error:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=response.message
+        )
+    return ModelResponse(response)
+
+
+@router.post("/revoke", response_model=ResponseModel)
+@public
+async def revoke(body: RevokeTokenRequest, db: AsyncSession = Depends(get_db)):
+    return ModelResponse(await auth_service.revoke_token(body.token, db))
+
+@router.post("/introspect", response_model=IntrospectionResponse, response_model_exclude_none=True,
+             dependencies=[Depends(require_permission("tokens:introspect"))])
+async def introspect(request: Request):
+    # RFC 7662 callers send a form body; JSON is accepted as well
+    try:
+        if 'application/json' in request.headers.get('Content-Type', ''):
+            body = await request.json()
+            token = body.get("token") if isinstance(body, dict) else None
+        else:
+            token = parse_qs((await request.body()).decode()).get("token", [None])[0]
+    except ValueError:
+        # Malformed JSON or a body that is not UTF-8
+        token = None
+    if not isinstance(token, str) or not token:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="invalid_request: token is required"
+        )
+    response = await auth_service.introspect_token(token)
+    return ORJSONResponse(response.model_dump(exclude_none=True))
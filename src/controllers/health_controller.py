@@ -0,0 +1,28 @@
+from fastapi import APIRouter, status
+from src.models.response_model import ResponseModel
+from src.utils.auth_middleware import public
+from src.utils.health import readiness_probe
+from src.utils.responses import ModelResponse, error_response
+from src.utils.warmup import readiness
+
+router = APIRouter()
+
+@router.get("/healthz", response_model=ResponseModel)
+@public
+async def liveness():
+    # The process is up and serving; says nothing about dependencies
+    return ModelResponse(ResponseModel(error=False, message="Alive", data=None))
+
+@router.get("/readyz", response_model=ResponseModel)
+@public
+async def readiness_check():
+    # Not cached: warm-up finishing and shutdown starting must show up immediately
+    if not readiness.ready:
+        return error_response(status.HTTP_503_SERVICE_UNAVAILABLE, "Not ready")
+    ready, checks = await readiness_probe.check()
+    if not ready:
+        return ModelResponse(
+            ResponseModel(error=True, message="Dependencies unavailable", data=checks),
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    return ModelResponse(ResponseModel(error=False, message="Ready", data=checks))
@@ -0,0 +1,15 @@
+from fastapi import APIRouter, HTTPException, Response, status
+from src.env.config import settings
+from src.utils.metrics import render_metrics
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+async def read_metrics():
+    if not settings.METRICS_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Metrics are disabled"
+        )
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
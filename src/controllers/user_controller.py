@@ -1,28 +1,86 @@
-from fastapi import APIRouter, Request, HTTPException, Depends, status
+from typing import Optional, Union
+from fastapi import APIRouter, Request, HTTPException, Depends, Query, status
+from fastapi.responses import StreamingResponse
+from src.env.config import settings
 from src.models.response_model import ResponseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.env.database import get_db
-from src.utils.common import get_user_by_id
+from src.schemas.user_schema import UserBatchRequest, UserImportReport, UserPage, UserResponse
+from src.services.user_import_service import UserImportService, iter_lines, parse_rows
+from src.utils.common import export_users, get_user_by_id, get_users_by_ids, list_users
+from src.utils.permissions import require_permission
+from src.utils.responses import ModelResponse
 
 router = APIRouter()
+user_import_service = UserImportService()
+require_users_read = require_permission("users:read")
 
-@router.get("/me", response_model=ResponseModel)
+@router.get("", response_model=ResponseModel[Union[list[UserResponse], UserPage]])
+async def get_users(
+    request: Request,
+    ids: Optional[list[str]] = Query(None, description="User ids, repeated or comma-separated"),
+    after: Optional[int] = Query(None, description="Last id of the previous page"),
+    limit: int = Query(settings.USER_LIST_DEFAULT_LIMIT, ge=1, le=settings.USER_LIST_MAX_LIMIT),
+    q: Optional[str] = Query(None, max_length=254, description="Username or email prefix"),
+    db: AsyncSession = Depends(get_db),
+):
+    if ids is None:
+        # Without ids this enumerates users, so it needs the same grant as the export
+        await require_users_read(request)
+        return ModelResponse(await list_users(db, after, limit, q))
+    try:
+        user_ids = [int(user_id) for value in ids for user_id in value.split(",") if user_id.strip()]
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="ids must be integers"
+        )
+    if not user_ids or len(user_ids) > settings.USER_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Provide between 1 and {settings.USER_BATCH_MAX_IDS} ids"
+        )
+    return ModelResponse(await get_users_by_ids(user_ids, db))
+
+@router.post("/batch", response_model=ResponseModel[list[UserResponse]])
+async def get_users_batch(body: UserBatchRequest, db: AsyncSession = Depends(get_db)):
+    return ModelResponse(await get_users_by_ids(body.ids, db))
+
+@router.post("/import", response_model=ResponseModel[UserImportReport], dependencies=[Depends(require_permission("users:import"))])
+async def import_users(request: Request, db: AsyncSession = Depends(get_db)):
+    # The body is streamed: NDJSON by default, CSV with a header row for text/csv
+    input_format = "csv" if request.headers.get("content-type", "").startswith("text/csv") else "ndjson"
+    rows = parse_rows(iter_lines(request.stream()), input_format)
+    report = await user_import_service.import_users(rows, db)
+    return ModelResponse(ResponseModel[UserImportReport](
+        error=False,
+        message=f"Imported {report.imported} users, {report.failed} failed",
+        data=report
+    ))
+
+@router.get("/export", dependencies=[Depends(require_users_read)])
+async def export_users_ndjson(q: Optional[str] = Query(None, max_length=254, description="Username or email prefix")):
+    return StreamingResponse(
+        export_users(q, settings.USER_EXPORT_BATCH_SIZE),
+        media_type="application/x-ndjson"
+    )
+
+@router.get("/me", response_model=ResponseModel[UserResponse])
 async def read_users_me(request: Request):
-    user_data = request.state.user.dict()
-    user_data.pop('exp', None)  # Remove 'exp' field
-    response = ResponseModel(
+    # The middleware already validated the user from the token claims
+    response = ResponseModel[UserResponse](
         error=False,
         message="Request successful",
-        data=user_data
+        data=request.state.user
     )
-    return response
+    return ModelResponse(response)
 
-@router.get("/{user_id}", response_model=ResponseModel)
+@router.get("/{user_id}", response_model=ResponseModel[UserResponse])
 async def get_user(user_id: int, db: AsyncSession = Depends(get_db)):
     user = await get_user_by_id(user_id, db)
-    if not user:
+    if user.error:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    return user
+    return ModelResponse(user)
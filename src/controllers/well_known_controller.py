@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Response
+from src.env.config import settings
+from src.utils.jwt_keys import key_ring
+
+router = APIRouter()
+
+@router.get("/jwks.json")
+async def read_jwks():
+    # Serve the pre-serialized document; downstream services cache it and verify tokens locally
+    return Response(
+        content=key_ring.jwks_json,
+        media_type="application/json",
+        headers={"Cache-Control": f"public, max-age={settings.JWKS_MAX_AGE}"},
+    )
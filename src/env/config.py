@@ -9,9 +9,139 @@ class Settings:
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
     ENV: str = os.getenv("ENV")
 
-    DATABASE_URL: str = (
-        f"postgresql://{os.getenv('DB_USERNAME')}:{os.getenv('DB_PASSWORD')}@"
+    # Async driver URL; DATABASE_URL overrides the DB_* parts (e.g. for a local SQLite stand-in)
+    DATABASE_URL: str = os.getenv("DATABASE_URL") or (
+        f"postgresql+asyncpg://{os.getenv('DB_USERNAME')}:{os.getenv('DB_PASSWORD')}@"
         f"{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
     )
 
+    # Connection pool tuning
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Connections opened during startup warm-up, before the worker reports ready
+    DB_POOL_MIN_SIZE: int = int(os.getenv("DB_POOL_MIN_SIZE", str(DB_POOL_SIZE)))
+
+    # Optional read replicas (comma-separated async URLs) for user lookups; a failed replica is
+    # skipped for DB_REPLICA_RETRY_INTERVAL, and users written in the last DB_READ_YOUR_WRITES_WINDOW
+    # seconds are read from the primary
+    DATABASE_REPLICA_URLS: list[str] = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+    DB_REPLICA_RETRY_INTERVAL: float = float(os.getenv("DB_REPLICA_RETRY_INTERVAL", "30"))  # seconds
+    DB_READ_YOUR_WRITES_WINDOW: float = float(os.getenv("DB_READ_YOUR_WRITES_WINDOW", "5"))  # seconds
+
+    # Startup schema handling: "check" (fail fast unless at head), "upgrade" (lock-guarded) or "off".
+    # Migrations normally run once per deploy with `python -m src.migrate upgrade`.
+    MIGRATIONS_ON_STARTUP: str = os.getenv("MIGRATIONS_ON_STARTUP", "check")
+
+    # Password hashing pool: "process" (spread across cores) or "thread"
+    HASH_EXECUTOR: str = os.getenv("HASH_EXECUTOR", "process")
+    HASH_MAX_CONCURRENCY: int = int(os.getenv("HASH_MAX_CONCURRENCY", str(os.cpu_count() or 1)))
+    HASH_MAX_QUEUE: int = int(os.getenv("HASH_MAX_QUEUE", "64"))
+
+    # Password hash schemes, preferred first; older schemes are verified then upgraded on login
+    PASSWORD_SCHEMES: list[str] = [scheme.strip() for scheme in os.getenv("PASSWORD_SCHEMES", "argon2,bcrypt").split(",") if scheme.strip()]
+    ARGON2_MEMORY_COST: int = int(os.getenv("ARGON2_MEMORY_COST", "65536"))  # KiB
+    ARGON2_TIME_COST: int = int(os.getenv("ARGON2_TIME_COST", "3"))
+    ARGON2_PARALLELISM: int = int(os.getenv("ARGON2_PARALLELISM", "4"))
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+    # In-process cache of decoded access tokens (size 0 disables it)
+    TOKEN_CACHE_SIZE: int = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+    TOKEN_CACHE_TTL: int = int(os.getenv("TOKEN_CACHE_TTL", "300"))  # seconds
+
+    # Token signing: HS256 uses SECRET_KEY; RS*/ES* sign with <kid>.pem keys from JWT_KEYS_DIR
+    JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
+    JWT_KEYS_DIR: str = os.getenv("JWT_KEYS_DIR")
+    JWT_ACTIVE_KID: str = os.getenv("JWT_ACTIVE_KID")  # defaults to the last key by name
+    JWKS_MAX_AGE: int = int(os.getenv("JWKS_MAX_AGE", "300"))  # seconds
+
+    REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+
+    # Access token revocation: "database" (revoked_tokens table) or "memory" (single-process stand-in)
+    REVOCATION_BACKEND: str = os.getenv("REVOCATION_BACKEND", "database")
+    REVOCATION_SYNC_INTERVAL: float = float(os.getenv("REVOCATION_SYNC_INTERVAL", "5"))  # seconds
+    REVOCATION_FILTER_CAPACITY: int = int(os.getenv("REVOCATION_FILTER_CAPACITY", "100000"))
+    REVOCATION_FILTER_ERROR_RATE: float = float(os.getenv("REVOCATION_FILTER_ERROR_RATE", "0.001"))
+    # Seconds of recent revocations re-read on every sync; must exceed the longest revoke transaction
+    REVOCATION_FEED_OVERLAP: float = float(os.getenv("REVOCATION_FEED_OVERLAP", "30"))
+
+    # Access token format: "jwt" (self-contained) or "opaque" (short random handles backed by a session store)
+    TOKEN_MODE: str = os.getenv("TOKEN_MODE", "jwt")
+    # Opaque sessions: "database" (sessions table), "redis" or "memory" (single-process stand-in)
+    SESSION_STORE_BACKEND: str = os.getenv("SESSION_STORE_BACKEND", "database")
+    SESSION_IDLE_TIMEOUT: int = int(os.getenv("SESSION_IDLE_TIMEOUT", "3600"))  # seconds; sliding
+    SESSION_MAX_LIFETIME: int = int(os.getenv("SESSION_MAX_LIFETIME", "86400"))  # seconds; absolute
+    # How long a worker trusts its local copy of a session (bounds revocation delay on other workers)
+    SESSION_NEAR_CACHE_TTL: float = float(os.getenv("SESSION_NEAR_CACHE_TTL", "5"))
+    SESSION_NEAR_CACHE_SIZE: int = int(os.getenv("SESSION_NEAR_CACHE_SIZE", "10000"))
+    # Sliding expiry is written back in batches this often, and only when it moved by at least this much
+    SESSION_TOUCH_INTERVAL: float = float(os.getenv("SESSION_TOUCH_INTERVAL", "30"))  # seconds
+
+    # Shared Redis-protocol server for the optional Redis-backed components
+    REDIS_URL: str = os.getenv("REDIS_URL")
+
+    # Broadcast of cache invalidations between workers: "redis" for multi-worker deployments,
+    # "memory" (this process only) or "none"
+    CACHE_INVALIDATION_BACKEND: str = os.getenv("CACHE_INVALIDATION_BACKEND", "memory")
+    CACHE_INVALIDATION_CHANNEL: str = os.getenv("CACHE_INVALIDATION_CHANNEL", "inquest-auth:invalidate")
+
+    # Production server (python -m src.serve); 0 workers means one per available CPU
+    SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT: int = int(os.getenv("SERVER_PORT", "8000"))
+    SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", "0"))
+    SERVER_GRACEFUL_TIMEOUT: int = int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30"))  # seconds
+    SERVER_KEEPALIVE_TIMEOUT: int = int(os.getenv("SERVER_KEEPALIVE_TIMEOUT", "5"))  # seconds
+    # Comma-separated proxy addresses (or "*") whose X-Forwarded-For/-Proto headers are trusted
+    SERVER_FORWARDED_ALLOW_IPS: str = os.getenv("SERVER_FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+    # Read-through user cache: "memory", "redis" or "none"
+    USER_CACHE_BACKEND: str = os.getenv("USER_CACHE_BACKEND", "memory")
+    USER_CACHE_SIZE: int = int(os.getenv("USER_CACHE_SIZE", "10000"))
+    USER_CACHE_TTL: float = float(os.getenv("USER_CACHE_TTL", "60"))  # seconds
+    USER_CACHE_NEGATIVE_TTL: float = float(os.getenv("USER_CACHE_NEGATIVE_TTL", "10"))  # seconds
+
+    # Window for merging concurrent GET /users/{id} lookups into one query (0 disables)
+    USER_BATCH_WINDOW_MS: float = float(os.getenv("USER_BATCH_WINDOW_MS", "2"))
+    USER_BATCH_MAX_IDS: int = int(os.getenv("USER_BATCH_MAX_IDS", "1000"))
+
+    # GET /users keyset pages, and rows fetched per round trip by the NDJSON export's server-side cursor
+    USER_LIST_DEFAULT_LIMIT: int = int(os.getenv("USER_LIST_DEFAULT_LIMIT", "50"))
+    USER_LIST_MAX_LIMIT: int = int(os.getenv("USER_LIST_MAX_LIMIT", "500"))
+    USER_EXPORT_BATCH_SIZE: int = int(os.getenv("USER_EXPORT_BATCH_SIZE", "1000"))
+
+    # Bulk user import: rows per existence query, hashing round and INSERT, and per-row errors reported
+    USER_IMPORT_CHUNK_SIZE: int = int(os.getenv("USER_IMPORT_CHUNK_SIZE", "1000"))
+    USER_IMPORT_MAX_ERRORS: int = int(os.getenv("USER_IMPORT_MAX_ERRORS", "1000"))
+
+    # Write-behind audit log of logins and registrations (auth_events table)
+    AUDIT_ENABLED: bool = os.getenv("AUDIT_ENABLED", "true").lower() == "true"
+    AUDIT_QUEUE_SIZE: int = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+    AUDIT_BATCH_SIZE: int = int(os.getenv("AUDIT_BATCH_SIZE", "500"))
+    AUDIT_FLUSH_INTERVAL: float = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1"))  # seconds
+    # When the queue is full: "drop" the event, "block" the request until there is room, or "spill" to AUDIT_SPILL_PATH
+    AUDIT_OVERFLOW: str = os.getenv("AUDIT_OVERFLOW", "drop")
+    AUDIT_SPILL_PATH: str = os.getenv("AUDIT_SPILL_PATH", "audit-spill.ndjson")
+    # Monthly partitions are created this many months ahead (including the current one), checked this often
+    AUDIT_PARTITION_MONTHS_AHEAD: int = int(os.getenv("AUDIT_PARTITION_MONTHS_AHEAD", "3"))
+    AUDIT_PARTITION_CHECK_INTERVAL: float = float(os.getenv("AUDIT_PARTITION_CHECK_INTERVAL", "3600"))  # seconds
+
+    # Prometheus metrics at /metrics plus per-stage timers on the hot paths
+    METRICS_ENABLED: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+    # Readiness probes: results are reused for HEALTH_CACHE_TTL seconds between polls
+    HEALTH_CACHE_TTL: float = float(os.getenv("HEALTH_CACHE_TTL", "2"))
+    HEALTH_DB_TIMEOUT: float = float(os.getenv("HEALTH_DB_TIMEOUT", "1"))  # seconds
+    HEALTH_MAX_POOL_SATURATION: float = float(os.getenv("HEALTH_MAX_POOL_SATURATION", "0.9"))  # checked out / capacity
+    HEALTH_MAX_HASH_BACKLOG: float = float(os.getenv("HEALTH_MAX_HASH_BACKLOG", "0.8"))  # waiting / HASH_MAX_QUEUE
+
+    # Login throttling (sliding window): "memory", "redis" or "none"
+    LOGIN_RATE_LIMIT_BACKEND: str = os.getenv("LOGIN_RATE_LIMIT_BACKEND", "memory")
+    # Keyed on the client address; behind a load balancer list it in SERVER_FORWARDED_ALLOW_IPS,
+    # or every client shares the proxy's address and this becomes one global login limit
+    LOGIN_RATE_LIMIT_PER_IP: int = int(os.getenv("LOGIN_RATE_LIMIT_PER_IP", "30"))
+    LOGIN_RATE_LIMIT_PER_EMAIL: int = int(os.getenv("LOGIN_RATE_LIMIT_PER_EMAIL", "10"))
+    LOGIN_RATE_LIMIT_WINDOW: float = float(os.getenv("LOGIN_RATE_LIMIT_WINDOW", "60"))  # seconds
+
 settings = Settings()
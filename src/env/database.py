@@ -1,17 +1,216 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Optional, TypeVar
+from sqlalchemy import text
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from src.env.config import settings
+from src.utils.invalidation import CacheInvalidator, cache_invalidator
+from src.utils.metrics import TimedAsyncQueuePool
 
-# SQLAlchemy engine setup
-engine = create_engine(settings.DATABASE_URL)
+logger = logging.getLogger(__name__)
 
-# Session local class to use in your DB interaction
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+T = TypeVar("T")
+
+# Failures that mean a replica cannot serve reads right now, as opposed to a bad query
+_REPLICA_FAILURES = (OperationalError, InterfaceError, OSError, asyncio.TimeoutError)
+
+
+def engine_options(url: str) -> dict:
+    """
+    Build the pool options for an async engine.
+
+    SQLite stand-ins run without a sized queue pool, so only the pre-ping
+    and recycle options apply to them.
+
+    Args:
+        url (str): The database URL the engine will connect to.
+
+    Returns:
+        dict: Keyword arguments for create_async_engine.
+    """
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+    if not url.startswith("sqlite"):
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+        if settings.METRICS_ENABLED:
+            # Same pool, but checkout waits are recorded
+            options["poolclass"] = TimedAsyncQueuePool
+    return options
+
+# SQLAlchemy async engine setup
+engine = create_async_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+
+# Session factory to use in your DB interaction; objects stay readable after commit
+SessionLocal = async_sessionmaker(bind=engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+class ReplicaRouter:
+    """
+    Sends read-only lookups to read replicas.
+
+    Replicas take turns in round-robin order. One that fails to connect or
+    answer is skipped for `retry_interval` seconds, and the read moves on to
+    the next replica and finally to the primary. Keys passed to
+    `mark_written` are read from the primary for `sticky_window` seconds, so
+    a user's own writes are visible to them despite replication lag; with an
+    `invalidator` the other workers pin those keys too. With no replicas
+    every read runs on the primary.
+    """
+
+    def __init__(
+        self,
+        primary_sessions: async_sessionmaker,
+        replica_urls: list[str],
+        sticky_window: float = 5,
+        retry_interval: float = 30,
+        max_sticky_keys: int = 100000,
+        invalidator: Optional[CacheInvalidator] = None,
+    ):
+        self.primary_sessions = primary_sessions
+        self.sticky_window = sticky_window
+        self.retry_interval = retry_interval
+        self.max_sticky_keys = max_sticky_keys
+        self.replicas = [create_async_engine(url, **engine_options(url)) for url in replica_urls]
+        self._sessions = [
+            async_sessionmaker(bind=replica, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+            for replica in self.replicas
+        ]
+        self._down_until = [0.0] * len(self.replicas)
+        self._next = 0
+        self._written: OrderedDict[str, float] = OrderedDict()
+        self.invalidator = invalidator if self.replicas else None
+        if self.invalidator is not None:
+            self.invalidator.register("read-your-writes", self._pin)
+
+    def _pin(self, keys: list[str]) -> None:
+        deadline = time.monotonic() + self.sticky_window
+        for key in keys:
+            self._written[key] = deadline
+            self._written.move_to_end(key)
+        while len(self._written) > self.max_sticky_keys:
+            self._written.popitem(last=False)
+
+    async def mark_written(self, keys: list[str]) -> None:
+        """
+        Read these keys from the primary for the next `sticky_window` seconds.
+
+        Args:
+            keys (list[str]): Identifiers of the written rows, as later passed to `run_read`.
+        """
+        if not self.replicas or not keys:
+            return
+        self._pin(keys)
+        if self.invalidator is not None:
+            await self.invalidator.publish("read-your-writes", keys)
+
+    def is_pinned(self, keys: Iterable[str]) -> bool:
+        now = time.monotonic()
+        for key in keys:
+            deadline = self._written.get(key)
+            if deadline is None:
+                continue
+            if deadline > now:
+                return True
+            del self._written[key]
+        return False
+
+    def _replica_order(self) -> list[int]:
+        # Healthy replicas, starting from the next one in turn
+        count = len(self.replicas)
+        start, self._next = self._next, (self._next + 1) % count
+        now = time.monotonic()
+        return [index for index in ((start + offset) % count for offset in range(count)) if self._down_until[index] <= now]
+
+    def _mark_down(self, index: int) -> None:
+        logger.warning("Read replica %d unavailable; skipping it for %ss", index, self.retry_interval, exc_info=True)
+        self._down_until[index] = time.monotonic() + self.retry_interval
+
+    async def run_read(
+        self,
+        query: Callable[[AsyncSession], Awaitable[T]],
+        primary: Optional[AsyncSession] = None,
+        keys: Iterable[str] = (),
+    ) -> T:
+        """
+        Run a read-only query on a replica, failing over to the others and then the primary.
+
+        Args:
+            query (Callable): Runs the query on the session it is given; may be called more than once.
+            primary (Optional[AsyncSession]): The caller's primary session, reused when the read stays on the primary.
+            keys (Iterable[str]): Identifiers of the rows read, checked against recent writes.
+
+        Returns:
+            T: What `query` returned.
+        """
+        if self.replicas and not self.is_pinned(keys):
+            for index in self._replica_order():
+                try:
+                    async with self._sessions[index]() as db:
+                        return await query(db)
+                except _REPLICA_FAILURES:
+                    self._mark_down(index)
+        if primary is not None:
+            return await query(primary)
+        async with self.primary_sessions() as db:
+            return await query(db)
+
+    @asynccontextmanager
+    async def read_session(self) -> AsyncIterator[AsyncSession]:
+        """
+        Open a session on the next healthy replica, or the primary if there is none.
+
+        For streamed reads, which cannot be retried elsewhere once rows have been sent.
+        """
+        order = self._replica_order() if self.replicas else []
+        sessions = self._sessions[order[0]] if order else self.primary_sessions
+        async with sessions() as db:
+            yield db
+
+    async def dispose(self) -> None:
+        """Close the replicas' pooled connections."""
+        await asyncio.gather(*(replica.dispose() for replica in self.replicas))
+
+
+# Routes user lookups to DATABASE_REPLICA_URLS when any are configured
+replica_router = ReplicaRouter(
+    SessionLocal,
+    settings.DATABASE_REPLICA_URLS,
+    sticky_window=settings.DB_READ_YOUR_WRITES_WINDOW,
+    retry_interval=settings.DB_REPLICA_RETRY_INTERVAL,
+    invalidator=cache_invalidator,
+)
 
 # Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
+
+async def warm_pool(size: int) -> None:
+    """
+    Open pooled connections up front so early requests skip connection setup.
+
+    The connections are held together, so `size` distinct connections are
+    established, then returned to the pool.
+
+    Args:
+        size (int): Number of connections to open.
+    """
+    results = await asyncio.gather(*(engine.connect() for _ in range(size)), return_exceptions=True)
+    connections = [result for result in results if not isinstance(result, BaseException)]
+    try:
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        await asyncio.gather(*(conn.execute(text("SELECT 1")) for conn in connections))
     finally:
-        db.close()
+        # Including the connections that did open when another one failed
+        await asyncio.gather(*(conn.close() for conn in connections))
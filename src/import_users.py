@@ -0,0 +1,55 @@
+"""
+Bulk user import from an NDJSON or CSV file:
+
+    python -m src.import_users users.ndjson
+    python -m src.import_users users.csv --format csv
+
+Each row needs username, email and either password (hashed here, in
+parallel) or hashed_password (a bcrypt/argon2 hash from a previous system,
+stored as-is). Rows that fail are reported with their line number; the
+rest are imported.
+"""
+import argparse
+import asyncio
+import sys
+from typing import AsyncIterator
+from src.env.database import SessionLocal, engine
+from src.services.user_import_service import UserImportService, iter_lines, parse_rows
+from src.utils.hash_executor import hashing_executor
+
+
+async def read_chunks(path: str, size: int = 1 << 16) -> AsyncIterator[bytes]:
+    with open(path, "rb") as source:
+        while chunk := source.read(size):
+            yield chunk
+
+
+async def run(args: argparse.Namespace) -> int:
+    try:
+        async with SessionLocal() as db:
+            report = await UserImportService().import_users(
+                parse_rows(iter_lines(read_chunks(args.path)), args.format), db
+            )
+    finally:
+        hashing_executor.shutdown()
+        await engine.dispose()
+
+    for error in report.errors:
+        print(f"line {error.line}: {error.email or '-'}: {error.error}", file=sys.stderr)
+    if report.failed > len(report.errors):
+        print(f"... {report.failed - len(report.errors)} more errors not shown", file=sys.stderr)
+    print(f"Imported {report.imported} users, {report.failed} failed")
+    return 1 if report.failed else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=("ndjson", "csv"), help="Defaults to csv for .csv files, otherwise ndjson")
+    args = parser.parse_args()
+    args.format = args.format or ("csv" if args.path.endswith(".csv") else "ndjson")
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,32 @@
 from typing import AsyncIterator
 from fastapi import FastAPI
 from fastapi.exceptions import RequestValidationError, HTTPException
+from fastapi.responses import ORJSONResponse
 from src.utils.app_lifespan import lifespan
 from src.utils.exception_handlers import global_exception_handler, global_http_exception_handler, validation_exception_handler
 from src.controllers.auth_controller import router as auth_router
-from src.controllers import auth_controller, user_controller
+from src.controllers import auth_controller, health_controller, metrics_controller, user_controller, well_known_controller
+from src.env.config import settings
 from src.utils.auth_middleware import AuthMiddleware
+from src.utils.metrics import MetricsMiddleware
 
 app = FastAPI(
         lifespan=lifespan,
         docs_url="/docs", 
-        redoc_url="/redoc"
+        redoc_url="/redoc",
+        default_response_class=ORJSONResponse
     )
 
-# List of routes to exempt from authentication
-exempt_paths = ["/auth/", "/docs", "/redoc", "/openapi.json"]
+# List of routes to exempt from authentication (handlers marked @public are exempt already)
+exempt_paths = ["/.well-known/", "/metrics", "/docs", "/redoc", "/openapi.json"]
 
 # Add the AuthMiddleware
 app.add_middleware(AuthMiddleware, exempt_paths=exempt_paths)
 
+# Outermost, so request latency includes authentication and rejected requests
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 app.add_exception_handler(Exception, global_exception_handler)
 app.add_exception_handler(HTTPException, global_http_exception_handler)
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
@@ -27,15 +35,19 @@ app.add_exception_handler(RequestValidationError, validation_exception_handler)
 # Register the routers
 app.include_router(auth_controller.router, prefix="/auth", tags=["auth"])
 app.include_router(user_controller.router, prefix="/users", tags=["users"])
+app.include_router(well_known_controller.router, prefix="/.well-known", tags=["well-known"])
+app.include_router(health_controller.router, tags=["health"])
+app.include_router(metrics_controller.router)
 
-# Root endpoint, useful for health checks
+# Root endpoint; use /healthz and /readyz for health checks
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Auth Microservice"}
 
 
-# Entry point for running the app directly
+# Entry point for running the app directly (one process, for development);
+# use `python -m src.serve` in production
 if __name__ == "__main__":
     import uvicorn
     # Run the FastAPI app using Uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    uvicorn.run(app, host=settings.SERVER_HOST, port=settings.SERVER_PORT)
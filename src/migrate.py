@@ -0,0 +1,46 @@
+"""
+Database migration entry point, run once per deploy instead of in every worker:
+
+    python -m src.migrate upgrade          # apply migrations up to head
+    python -m src.migrate check            # exit 1 unless the schema is at head
+    python -m src.migrate current          # print the recorded revision
+
+Concurrent upgrades against Postgres are serialized with an advisory lock.
+"""
+import argparse
+import asyncio
+import sys
+from src.env.database import engine
+from src.utils.migrations import SchemaOutOfDate, check_schema_version, current_revisions, upgrade
+
+
+async def run(args: argparse.Namespace) -> int:
+    try:
+        if args.command == "upgrade":
+            applied = await upgrade(engine, args.revision)
+            print("Migrations applied" if applied else "Schema already at head")
+        elif args.command == "check":
+            await check_schema_version(engine)
+            print("Schema is at head")
+        else:
+            print(", ".join(sorted(await current_revisions(engine))) or "base")
+        return 0
+    except SchemaOutOfDate as e:
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    upgrade_parser = commands.add_parser("upgrade", help="Apply migrations")
+    upgrade_parser.add_argument("revision", nargs="?", default="head")
+    commands.add_parser("check", help="Verify the schema is at head")
+    commands.add_parser("current", help="Print the current revision")
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+import uuid
+from sqlalchemy import Column, DateTime, Float, Integer, String, func
+from src.models.base import Base
+
+# SQLAlchemy model for the audit log of logins and registrations.
+# On Postgres the table is range-partitioned by month on occurred_at, so the
+# partition key is part of the primary key and ids are generated client-side.
+class AuthEvent(Base):
+    __tablename__ = "auth_events"
+    __table_args__ = {"postgresql_partition_by": "RANGE (occurred_at)"}
+
+    id = Column(String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    occurred_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
+
+    event_type = Column(String(16), nullable=False)  # "login" or "register"
+    outcome = Column(String(32), nullable=False)  # "success", "invalid_credentials", "already_registered", ...
+    user_id = Column(Integer, index=True, nullable=True)
+    email = Column(String, nullable=True)
+    ip = Column(String(45), nullable=True)
+    user_agent = Column(String(512), nullable=True)
+    latency_ms = Column(Float, nullable=True)
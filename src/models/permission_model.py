@@ -0,0 +1,10 @@
+from sqlalchemy import Column, Integer, SmallInteger, String
+from src.models.base import Base
+
+# SQLAlchemy model for the Permission table; `bit` is the permission's position in the token bitmask
+class Permission(Base):
+    __tablename__ = "permissions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(64), unique=True, nullable=False)
+    bit = Column(SmallInteger, unique=True, nullable=False)
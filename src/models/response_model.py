@@ -1,10 +1,12 @@
 from pydantic import BaseModel
-from typing import Any, Dict, List, Optional, Union
+from typing import Generic, Optional, TypeVar
 
-class ResponseModel(BaseModel):
+DataT = TypeVar("DataT")
+
+class ResponseModel(BaseModel, Generic[DataT]):
     error: bool
     message: str
-    data: Optional[Union[Dict[str, Any], List[Any]]]  # Accept dict or list
+    data: Optional[DataT]  # Typed via ResponseModel[UserResponse]; bare ResponseModel accepts any payload
 
     class Config:
         from_attributes = True
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, Index, Integer, String, func
+from src.models.base import Base
+
+# SQLAlchemy model for revoked access tokens; (revoked_at, id) orders the change feed
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True, index=True)
+    jti = Column(String(32), unique=True, nullable=False)
+    expires_at = Column(DateTime(timezone=True), index=True, nullable=False)
+    revoked_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_revoked_tokens_revoked_at_id", "revoked_at", "id"),
+    )
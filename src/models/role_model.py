@@ -1,6 +1,22 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Table
 from sqlalchemy.orm import relationship
 from src.models.base import Base
+from src.models.permission_model import Permission
+
+# Association tables: a user has many roles, a role grants many permissions
+user_roles = Table(
+    "user_roles",
+    Base.metadata,
+    Column("user_id", Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+    Column("role_id", Integer, ForeignKey("roles.id", ondelete="CASCADE"), primary_key=True, index=True),
+)
+
+role_permissions = Table(
+    "role_permissions",
+    Base.metadata,
+    Column("role_id", Integer, ForeignKey("roles.id", ondelete="CASCADE"), primary_key=True),
+    Column("permission_id", Integer, ForeignKey("permissions.id", ondelete="CASCADE"), primary_key=True),
+)
 
 
 # SQLAlchemy model for the Role table
@@ -10,8 +26,6 @@ class Role(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, index=True)
 
-    # ForeignKey to associate role with a specific user
-    user_id = Column(Integer, ForeignKey("users.id"))
-
-    # Relationship with User model
-    users = relationship("User", back_populates="roles")
+    # Relationships with the User and Permission models
+    users = relationship("User", secondary=user_roles, back_populates="roles")
+    permissions = relationship(Permission, secondary=role_permissions)
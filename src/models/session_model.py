@@ -0,0 +1,18 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, func
+from src.models.base import Base
+
+# SQLAlchemy model for opaque access token sessions (TOKEN_MODE=opaque), stored hashed
+class UserSession(Base):
+    __tablename__ = "sessions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # SHA-256 of the opaque handle; the raw value is never stored
+    token_hash = Column(String(64), unique=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), index=True, nullable=False)
+    # JSON snapshot of the claims a JWT would carry (id, username, email, roles, perm)
+    claims = Column(Text, nullable=False)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Sliding expiry, pushed forward in batches while the session is used
+    expires_at = Column(DateTime(timezone=True), index=True, nullable=False)
+    max_expires_at = Column(DateTime(timezone=True), nullable=False)
@@ -1,10 +1,20 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, func
 from src.models.base import Base
 
-# SQLAlchemy model for the Token table
+# SQLAlchemy model for the Token table (refresh tokens, stored hashed)
 class Token(Base):
     __tablename__ = "tokens"
 
     id = Column(Integer, primary_key=True, index=True)
-    token = Column(String, unique=True)
-    user_id = Column(Integer)
+    # SHA-256 of the opaque refresh token; the raw value is never stored
+    token_hash = Column(String(64), unique=True, nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
+
+    # Every rotation of one login shares a family so reuse can revoke them all
+    family_id = Column(String(32), index=True, nullable=False)
+    device = Column(String, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    used_at = Column(DateTime(timezone=True), nullable=True)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Index, Integer, String, func
 from sqlalchemy.orm import relationship
 from src.models.base import Base
 
@@ -11,5 +11,23 @@ class User(Base):
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
 
-    # Relationship with Role model
-    roles = relationship("Role", back_populates="users")
+    # Case-insensitive prefix search (LIKE 'abc%') on GET /users; text_pattern_ops lets
+    # Postgres use these for LIKE whatever the database collation
+    __table_args__ = (
+        Index(
+            "ix_users_username_lower_prefix",
+            func.lower(username).label("username_lower"),
+            postgresql_ops={"username_lower": "text_pattern_ops"},
+        ),
+        Index(
+            "ix_users_email_lower_prefix",
+            func.lower(email).label("email_lower"),
+            postgresql_ops={"email_lower": "text_pattern_ops"},
+        ),
+    )
+
+    # Relationship with Role model, through user_roles
+    roles = relationship("Role", secondary="user_roles", back_populates="users")
+
+# Register the related model so the "Role" relationship resolves wherever User is imported
+from src.models.role_model import Role  # noqa: E402,F401
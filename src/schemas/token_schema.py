@@ -8,3 +8,30 @@ class Token(BaseModel):
 # Schema for parsing token data (used for token validation)
 class TokenData(BaseModel):
     username: str | None = None
+
+# Schema for the tokens returned by login and refresh
+class TokenResponse(BaseModel):
+    access_token: str
+    token_type: str
+    expires_in: int
+    refresh_token: str
+
+# Schema for exchanging a refresh token
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str
+
+# Schema for revoking an access or refresh token (RFC 7009 style)
+class RevokeTokenRequest(BaseModel):
+    token: str
+
+# Schema for an RFC 7662 introspection response; inactive tokens only carry `active`
+class IntrospectionResponse(BaseModel):
+    active: bool
+    token_type: str | None = None
+    scope: str | None = None
+    sub: str | None = None
+    username: str | None = None
+    email: str | None = None
+    roles: list[str] | None = None
+    exp: int | None = None
+    jti: str | None = None
@@ -1,4 +1,6 @@
-from pydantic import BaseModel, EmailStr
+from typing import Optional
+from pydantic import BaseModel, EmailStr, Field, model_validator
+from src.env.config import settings
 
 # Schema for creating a new user
 class UserCreate(BaseModel):
@@ -16,7 +18,42 @@ class UserResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# Schema for one keyset page of users; pass next_after as `after` to fetch the next page
+class UserPage(BaseModel):
+    items: list[UserResponse]
+    next_after: Optional[int] = None
+
 # Schema for returning an authentication token
 class Token(BaseModel):
     access_token: str
     token_type: str
+
+# Schema for looking up several users at once
+class UserBatchRequest(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=settings.USER_BATCH_MAX_IDS)
+
+# Schema for one row of a bulk import; exactly one of password and hashed_password is given
+class UserImportRow(BaseModel):
+    username: str = Field(min_length=1)
+    email: EmailStr
+    password: Optional[str] = None
+    hashed_password: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_password(self):
+        if (self.password is None) == (self.hashed_password is None):
+            raise ValueError("Provide either password or hashed_password")
+        return self
+
+# Schema for a row a bulk import skipped
+class UserImportError(BaseModel):
+    line: int
+    email: Optional[str] = None
+    error: str
+
+# Schema for the outcome of a bulk import
+class UserImportReport(BaseModel):
+    imported: int = 0
+    failed: int = 0
+    # Capped at USER_IMPORT_MAX_ERRORS; `failed` counts every skipped row
+    errors: list[UserImportError] = []
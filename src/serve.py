@@ -0,0 +1,114 @@
+"""
+Production server entry point:
+
+    python -m src.serve                    # one worker per available CPU
+    python -m src.serve --workers 4 --port 8080
+
+Runs the app under uvicorn's process manager. uvloop and httptools are used
+when installed (pip install uvloop httptools). Send SIGHUP to the parent
+for a rolling restart: workers are replaced one at a time, each finishing
+its in-flight requests (up to SERVER_GRACEFUL_TIMEOUT) and its replacement
+only accepting connections once warmed up, so the others keep serving.
+SIGTTIN and SIGTTOU add or remove a worker.
+
+Each worker has its own connection pool and password hashing pool (worker
+processes by default, see HASH_EXECUTOR), and keeps its own caches coherent
+with the others through CACHE_INVALIDATION_BACKEND=redis. HASH_MAX_CONCURRENCY
+is split between the workers, so together they run at most that many hashing
+jobs instead of that many each.
+"""
+import argparse
+import importlib.util
+import logging
+import math
+import os
+from typing import Optional
+from src.env.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    # Containers are often limited by a CFS quota rather than by the CPUs they can see
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as cpu_max:
+            quota, period = cpu_max.read().split()
+        if quota != "max":
+            return int(quota) / int(period)
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as quota_file, open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as period_file:
+            quota, period = int(quota_file.read()), int(period_file.read())
+        if quota > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_cpus() -> int:
+    """Return the CPUs this process may use: its affinity mask, capped by any cgroup quota."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        cpus = min(cpus, max(1, math.ceil(limit)))
+    return cpus
+
+
+def server_options(host: str, port: int, workers: int) -> dict:
+    """
+    Build the uvicorn options for a production run.
+
+    Args:
+        host (str): The interface to bind.
+        port (int): The port to bind.
+        workers (int): Worker processes; 0 for one per available CPU.
+
+    Returns:
+        dict: Keyword arguments for `uvicorn.run`.
+    """
+    return {
+        "host": host,
+        "port": port,
+        "workers": workers or available_cpus(),
+        "loop": "uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        "http": "httptools" if importlib.util.find_spec("httptools") else "h11",
+        "lifespan": "on",
+        # Client addresses (used by the per-IP login limit) come from X-Forwarded-For set by trusted proxies
+        "proxy_headers": True,
+        "forwarded_allow_ips": settings.SERVER_FORWARDED_ALLOW_IPS,
+        "timeout_graceful_shutdown": settings.SERVER_GRACEFUL_TIMEOUT,
+        "timeout_keep_alive": settings.SERVER_KEEPALIVE_TIMEOUT,
+    }
+
+
+def hash_concurrency_per_worker(workers: int) -> int:
+    """Share HASH_MAX_CONCURRENCY between worker processes, leaving each at least one slot."""
+    return max(1, settings.HASH_MAX_CONCURRENCY // workers)
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=settings.SERVER_HOST)
+    parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS, help="0 for one per available CPU")
+    args = parser.parse_args()
+
+    options = server_options(args.host, args.port, args.workers)
+    if options["workers"] > 1:
+        # Workers build their settings from the environment they inherit
+        os.environ["HASH_MAX_CONCURRENCY"] = str(hash_concurrency_per_worker(options["workers"]))
+        if settings.CACHE_INVALIDATION_BACKEND != "redis":
+            logger.warning("Running %d workers without CACHE_INVALIDATION_BACKEND=redis; their caches are only kept coherent by TTLs", options["workers"])
+    # Workers import the app themselves, so it is passed by name
+    uvicorn.run("src.main:app", **options)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,88 +1,301 @@
-from datetime import timedelta
-from passlib.context import CryptContext
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import update
 from sqlalchemy.future import select
+from src.env.database import SessionLocal
 from src.models.user_model import User
+from src.env.config import settings
+from src.schemas.token_schema import IntrospectionResponse, TokenResponse
 from src.schemas.user_schema import UserCreate, UserResponse
-from src.utils.hash_utils import get_password_hash
+from src.utils.hash_utils import get_password_hash, needs_rehash, verify_dummy_password, verify_password
 from src.models.response_model import ResponseModel
-from src.utils.jwt_utils import create_access_token
-from src.utils.common import get_user_by_email
+from src.utils.audit_log import audit_log
+from src.utils.jwt_utils import create_access_token, decode_access_token
+from src.utils.metrics import observe_stage
+from src.utils.permissions import decode_permissions, encode_permissions, load_user_authorization, permission_names
+from src.utils.revocation import revocation_list
+from src.utils.session_store import is_session_handle, session_store
+from src.utils.token_cache import token_cache
+from src.utils.common import get_user_by_email, invalidate_user
+from src.services.refresh_token_service import RefreshTokenError, RefreshTokenService
+
+logger = logging.getLogger(__name__)
+
+# Every failed login gets the same answer, whether the email is unknown or the password wrong
+INVALID_CREDENTIALS = "Invalid credentials"
 
 class AuthService:
     def __init__(self):
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+        # Strong references to in-flight background rehash tasks
+        self._background_tasks: set[asyncio.Task] = set()
+        self.refresh_tokens = RefreshTokenService()
 
-    async def register_user(self, user_create: UserCreate, db: AsyncSession) -> ResponseModel:
+    async def register_user(
+        self,
+        user_create: UserCreate,
+        db: AsyncSession,
+        ip: Optional[str] = None,
+        device: Optional[str] = None,
+    ) -> ResponseModel[UserResponse]:
         """
         Register a new user.
 
         Args:
             user_create (UserCreate): The user data to create a new user.
             db (AsyncSession): The database session.
+            ip (Optional[str]): The client address, for the audit log.
+            device (Optional[str]): The client's User-Agent, for the audit log.
 
         Returns:
-            ResponseModel: The response model containing the new user data.
+            ResponseModel[UserResponse]: The response model containing the new user data.
         
         Raises:
             ValueError: If the user is already registered.
         """
-        # Check if user already exists
-        result = db.execute(select(User).filter_by(email=user_create.email))
-        existing_user = result.scalars().first()
+        start = time.perf_counter()
+        outcome, user_id = "error", None
+        try:
+            # Check if user already exists
+            result = await db.execute(select(User).filter_by(email=user_create.email))
+            existing_user = result.scalars().first()
 
-        if existing_user:
-            raise ValueError("User already registered")
+            if existing_user:
+                outcome = "already_registered"
+                raise ValueError("User already registered")
 
-        # Hash the password
-        hashed_password = get_password_hash(user_create.password)
+            # Hash the password
+            hashed_password = await get_password_hash(user_create.password)
 
-        # Create a new user
-        new_user = User(
-            username=user_create.username,
-            email=user_create.email,
-            hashed_password=hashed_password
-        )
+            # Create a new user
+            new_user = User(
+                username=user_create.username,
+                email=user_create.email,
+                hashed_password=hashed_password
+            )
 
-        # Add and commit the new user
-        db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
-        user_response = UserResponse.model_validate(new_user)
-        return ResponseModel(error=False, message="User registered successfully", data=user_response.model_dump())
+            # Add and commit the new user
+            db.add(new_user)
+            await db.commit()
+            await db.refresh(new_user)
+            # Drop any cached "unknown email" entry left by earlier lookups
+            await invalidate_user(user_id=new_user.id, email=new_user.email)
+            user_response = UserResponse.model_validate(new_user)
+            outcome, user_id = "success", new_user.id
+            return ResponseModel[UserResponse](error=False, message="User registered successfully", data=user_response)
+        finally:
+            # Queued for the write-behind audit log; no I/O on this path
+            await audit_log.record(
+                "register", outcome, user_id=user_id, email=user_create.email, ip=ip, user_agent=device,
+                latency_ms=(time.perf_counter() - start) * 1000,
+            )
 
     
-    async def authenticate_user(self, email: str, password: str, db: AsyncSession) -> ResponseModel:
+    async def authenticate_user(
+        self,
+        email: str,
+        password: str,
+        db: AsyncSession,
+        device: Optional[str] = None,
+        ip: Optional[str] = None,
+    ) -> ResponseModel[TokenResponse]:
         """
         Authenticate a user based on email and password.
 
+        Every attempt is recorded in the audit log with its outcome and latency.
+
         Args:
             email (str): The user's email.
             password (str): The user's password.
             db (AsyncSession): The database session.
+            device (Optional[str]): A client description stored with the refresh token.
+            ip (Optional[str]): The client address, for the audit log.
 
         Returns:
-            ResponseModel: A response model with authentication status and data.
+            ResponseModel[TokenResponse]: A response model with authentication status and data.
         """
+        start = time.perf_counter()
+        outcome, user = "error", None
         try:
-            result = await get_user_by_email(email=email, db=db)
-            user = result.scalars().first()
+            with observe_stage("user_lookup"):
+                user = await get_user_by_email(email=email, db=db)
 
-            if user and self.pwd_context.verify(password, user.hashed_password):
-                access_token_expires = timedelta(minutes=60)
-                access_token = create_access_token(
-                    data={"id": user.id, "username": user.username,"email": user.email}, expires_delta=access_token_expires
-                )
-                return ResponseModel(
-                    error=False,
-                    message="Login successful",
-                    data={"access_token": access_token, "token_type": "bearer"}
-                )
+            with observe_stage("password_verify"):
+                if user is not None and user.hashed_password:
+                    verified = await verify_password(password, user.hashed_password)
+                else:
+                    # Unknown account: pay the same hashing cost so latency does not reveal it
+                    verified = await verify_dummy_password(password)
+
+            if verified:
+                if needs_rehash(user.hashed_password):
+                    self._schedule_rehash(user.id, password, user.hashed_password)
+
+                refresh_token = await self.refresh_tokens.issue(user.id, db, device=device)
+                response = await self._token_response(user, refresh_token, "Login successful", db)
+                await db.commit()
+                outcome = "success"
+                return response
             else:
-                raise Exception("Invalid credentials")
+                outcome = "invalid_credentials"
+                raise Exception(INVALID_CREDENTIALS)
+        except HTTPException:
+            # Back-pressure from the hashing pool must reach the client as-is
+            outcome = "rejected"
+            raise
         except Exception as e:
-            return ResponseModel(
+            if str(e) != INVALID_CREDENTIALS:
+                logger.exception("Login failed unexpectedly")
+            return ResponseModel[TokenResponse](
                 error=True,
-                message=str(e),
+                message=INVALID_CREDENTIALS,
                 data=None
-            )
\ No newline at end of file
+            )
+        finally:
+            # Every attempt is audited, whatever the outcome
+            await audit_log.record(
+                "login", outcome, user_id=user.id if user is not None else None, email=email, ip=ip,
+                user_agent=device, latency_ms=(time.perf_counter() - start) * 1000,
+            )
+
+    async def refresh_session(self, refresh_token: str, db: AsyncSession, device: Optional[str] = None) -> ResponseModel[TokenResponse]:
+        """
+        Exchange a refresh token for a new access token and a rotated refresh token.
+
+        Args:
+            refresh_token (str): The refresh token issued at login or by a previous refresh.
+            db (AsyncSession): The database session.
+            device (Optional[str]): A client description stored with the new refresh token.
+
+        Returns:
+            ResponseModel[TokenResponse]: A response model with the new tokens, or an error.
+        """
+        try:
+            user, new_refresh_token = await self.refresh_tokens.rotate(refresh_token, db, device=device)
+        except RefreshTokenError as e:
+            return ResponseModel[TokenResponse](error=True, message=str(e), data=None)
+        return await self._token_response(user, new_refresh_token, "Token refreshed", db)
+
+    async def revoke_token(self, token: str, db: AsyncSession) -> ResponseModel:
+        """
+        Revoke an access token (a JWT by its jti, or an opaque session) or a refresh token (with its whole family).
+
+        Unknown or already invalid tokens are accepted silently, as RFC 7009 requires.
+
+        Args:
+            token (str): The access or refresh token to revoke.
+            db (AsyncSession): The database session.
+
+        Returns:
+            ResponseModel: A response model confirming the revocation.
+        """
+        claims = decode_access_token(token)
+        if claims and claims.get("jti"):
+            expires_at = datetime.fromtimestamp(claims["exp"], tz=timezone.utc)
+            await revocation_list.revoke(claims["jti"], expires_at)
+            token_cache.invalidate(token)
+        elif not (is_session_handle(token) and await session_store.revoke(token)):
+            await self.refresh_tokens.revoke(token, db)
+        return ResponseModel(error=False, message="Token revoked", data=None)
+
+    async def introspect_token(self, token: str) -> IntrospectionResponse:
+        """
+        Describe an access token for another service (RFC 7662).
+
+        Introspection does not extend an opaque session's sliding expiry.
+
+        Args:
+            token (str): A JWT or opaque access token.
+
+        Returns:
+            IntrospectionResponse: The token's claims, or just `active=False` if it is not usable.
+        """
+        if is_session_handle(token):
+            session = await session_store.resolve(token, touch=False)
+            if session is None:
+                return IntrospectionResponse(active=False)
+            claims, exp, jti = session.claims, session.expires_at, None
+        else:
+            claims = decode_access_token(token)
+            if claims is None or (claims.get("jti") and await revocation_list.is_revoked(claims["jti"])):
+                return IntrospectionResponse(active=False)
+            exp, jti = claims.get("exp"), claims.get("jti")
+        return IntrospectionResponse(
+            active=True,
+            token_type="access_token",
+            scope=" ".join(permission_names(decode_permissions(claims.get("perm")))),
+            sub=str(claims["id"]),
+            username=claims.get("username"),
+            email=claims.get("email"),
+            roles=claims.get("roles", []),
+            exp=int(exp) if exp is not None else None,
+            jti=jti,
+        )
+
+    async def _token_response(self, user: User, refresh_token: str, message: str, db: AsyncSession) -> ResponseModel[TokenResponse]:
+        access_token_expires = timedelta(minutes=60)
+        # Roles and permissions travel in the token so authorization checks need no lookups
+        with observe_stage("authorization_load"):
+            roles, permissions = await load_user_authorization(user.id, db)
+        claims = {
+            "id": user.id,
+            "username": user.username,
+            "email": user.email,
+            "roles": roles,
+            "perm": encode_permissions(permissions),
+        }
+        if settings.TOKEN_MODE == "opaque":
+            # A short random handle; the claims stay server-side in the session store
+            with observe_stage("session_create"):
+                access_token = await session_store.create(claims)
+            expires_in = settings.SESSION_IDLE_TIMEOUT
+        else:
+            with observe_stage("token_encode"):
+                access_token = create_access_token(data=claims, expires_delta=access_token_expires)
+            expires_in = int(access_token_expires.total_seconds())
+        return ResponseModel[TokenResponse](
+            error=False,
+            message=message,
+            data=TokenResponse(
+                access_token=access_token,
+                token_type="bearer",
+                expires_in=expires_in,
+                refresh_token=refresh_token,
+            )
+        )
+
+    def _schedule_rehash(self, user_id: int, password: str, old_hash: str) -> None:
+        """
+        Upgrade a user's stored hash in the background after a successful login.
+
+        Args:
+            user_id (int): The user whose hash uses an outdated scheme or cost.
+            password (str): The verified plain password.
+            old_hash (str): The hash the password was verified against.
+        """
+        task = asyncio.create_task(self._rehash_password(user_id, password, old_hash))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _rehash_password(self, user_id: int, password: str, old_hash: str) -> None:
+        try:
+            hashed_password = await get_password_hash(password)
+            async with SessionLocal() as db:
+                # Only replace the hash that was verified; a password changed in the meantime wins
+                result = await db.execute(
+                    update(User)
+                    .where(User.id == user_id, User.hashed_password == old_hash)
+                    .values(hashed_password=hashed_password)
+                    .returning(User.email)
+                )
+                email = result.scalar_one_or_none()
+                await db.commit()
+            if email is not None:
+                await invalidate_user(user_id=user_id, email=email)
+        except Exception:
+            # The old hash still verifies, so the upgrade is retried on the next login
+            logger.exception("Failed to rehash password for user %s", user_id)
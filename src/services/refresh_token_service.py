@@ -0,0 +1,140 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from src.env.config import settings
+from src.models.token_model import Token
+from src.models.user_model import User
+
+
+class RefreshTokenError(Exception):
+    """Raised when a refresh token is unknown, expired, revoked or reused."""
+
+
+def hash_refresh_token(refresh_token: str) -> str:
+    # Refresh tokens are 256-bit random values, so a fast digest is enough (no bcrypt needed)
+    return hashlib.sha256(refresh_token.encode()).hexdigest()
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; Postgres returns aware ones
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class RefreshTokenService:
+    """
+    Issue and rotate opaque refresh tokens stored hashed in the `tokens` table.
+
+    Each login starts a token family. Every refresh marks the presented token
+    as used and issues its successor in the same family; presenting a token
+    that was already used (or revoked) is treated as theft and revokes the
+    whole family.
+    """
+
+    def __init__(self, expire_days: int = settings.REFRESH_TOKEN_EXPIRE_DAYS):
+        self.expire_delta = timedelta(days=expire_days)
+
+    async def issue(
+        self,
+        user_id: int,
+        db: AsyncSession,
+        device: Optional[str] = None,
+        family_id: Optional[str] = None,
+    ) -> str:
+        """
+        Create a refresh token for a user; the caller commits the session.
+
+        Args:
+            user_id (int): The token owner.
+            db (AsyncSession): The database session.
+            device (Optional[str]): A client description such as the user agent.
+            family_id (Optional[str]): The family to continue; a new one is started if omitted.
+
+        Returns:
+            str: The raw refresh token to hand to the client.
+        """
+        refresh_token = secrets.token_urlsafe(32)
+        db.add(Token(
+            token_hash=hash_refresh_token(refresh_token),
+            user_id=user_id,
+            family_id=family_id or secrets.token_hex(16),
+            device=device,
+            expires_at=datetime.now(timezone.utc) + self.expire_delta,
+        ))
+        return refresh_token
+
+    async def rotate(self, refresh_token: str, db: AsyncSession, device: Optional[str] = None) -> tuple[User, str]:
+        """
+        Exchange a refresh token for its successor with a single indexed lookup.
+
+        Args:
+            refresh_token (str): The raw refresh token presented by the client.
+            db (AsyncSession): The database session.
+            device (Optional[str]): A client description such as the user agent.
+
+        Returns:
+            tuple[User, str]: The token owner and the new raw refresh token.
+
+        Raises:
+            RefreshTokenError: If the token cannot be used.
+        """
+        result = await db.execute(
+            select(Token, User)
+            .join(User, User.id == Token.user_id)
+            .where(Token.token_hash == hash_refresh_token(refresh_token))
+        )
+        row = result.first()
+        if row is None:
+            raise RefreshTokenError("Invalid refresh token")
+        token, user = row
+
+        now = datetime.now(timezone.utc)
+        if token.used_at is not None or token.revoked_at is not None:
+            await self.revoke_family(token.family_id, db)
+            await db.commit()
+            raise RefreshTokenError("Refresh token reuse detected")
+        if _as_utc(token.expires_at) <= now:
+            raise RefreshTokenError("Refresh token expired")
+
+        # Conditional update so two concurrent refreshes cannot both win
+        claimed = await db.execute(
+            update(Token)
+            .where(Token.id == token.id, Token.used_at.is_(None), Token.revoked_at.is_(None))
+            .values(used_at=now)
+        )
+        if claimed.rowcount != 1:
+            await self.revoke_family(token.family_id, db)
+            await db.commit()
+            raise RefreshTokenError("Refresh token reuse detected")
+
+        new_refresh_token = await self.issue(user.id, db, device=device or token.device, family_id=token.family_id)
+        await db.commit()
+        return user, new_refresh_token
+
+    async def revoke_family(self, family_id: str, db: AsyncSession) -> None:
+        """Revoke every live token in a family; the caller commits the session."""
+        await db.execute(
+            update(Token)
+            .where(Token.family_id == family_id, Token.revoked_at.is_(None))
+            .values(revoked_at=datetime.now(timezone.utc))
+        )
+
+    async def revoke(self, refresh_token: str, db: AsyncSession) -> bool:
+        """
+        Revoke the family a refresh token belongs to (e.g. on logout).
+
+        Returns:
+            bool: True if the token was known.
+        """
+        result = await db.execute(
+            select(Token.family_id).where(Token.token_hash == hash_refresh_token(refresh_token))
+        )
+        family_id = result.scalar_one_or_none()
+        if family_id is None:
+            return False
+        await self.revoke_family(family_id, db)
+        await db.commit()
+        return True
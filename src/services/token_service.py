@@ -1,27 +1,26 @@
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional
-from jose import JWTError, jwt
-from src.schemas.user_schema import Token
-from src.utils.jwt_utils import create_access_token
+from jose import JWTError
+from src.utils.jwt_keys import KeyRing, key_ring as default_key_ring
 
 class TokenService:
-    def __init__(self, secret_key: str, algorithm: str):
-        self.secret_key = secret_key
-        self.algorithm = algorithm
+    def __init__(self, key_ring: Optional[KeyRing] = None):
+        # Signing algorithm and keys (including rotation) come from the key ring
+        self.key_ring = key_ring or default_key_ring
 
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None) -> str:
         to_encode = data.copy()
         if expires_delta:
-            expire = datetime.utcnow() + expires_delta
+            expire = datetime.now(timezone.utc) + expires_delta
         else:
-            expire = datetime.utcnow() + timedelta(minutes=15)
+            expire = datetime.now(timezone.utc) + timedelta(minutes=15)
         to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
+        encoded_jwt = self.key_ring.sign(to_encode)
         return encoded_jwt
 
     def verify_token(self, token: str) -> Optional[dict]:
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            payload = self.key_ring.verify(token)
             return payload
         except JWTError:
             return None
@@ -0,0 +1,209 @@
+import csv
+import json
+import logging
+from typing import AsyncIterator, Optional
+from pydantic import ValidationError
+from sqlalchemy import String, any_, bindparam, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from src.env.config import settings
+from src.models.user_model import User
+from src.schemas.user_schema import UserImportError, UserImportReport, UserImportRow
+from src.utils.hash_executor import hashing_executor
+from src.utils.hash_utils import hash_password_sync, pwd_context
+from src.utils.common import invalidate_users
+
+logger = logging.getLogger(__name__)
+
+
+def _decode(line: bytes) -> Optional[str]:
+    try:
+        return line.decode("utf-8").rstrip("\r")
+    except UnicodeDecodeError:
+        return None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Optional[str]]:
+    """
+    Split a stream of byte chunks into decoded lines, without buffering the whole input.
+
+    Args:
+        chunks (AsyncIterator[bytes]): The raw input, e.g. `request.stream()`.
+
+    Yields:
+        Optional[str]: Each line, without its line ending, or None if it is not valid UTF-8.
+    """
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield _decode(line)
+    if buffer:
+        yield _decode(buffer)
+
+
+async def parse_rows(lines: AsyncIterator[Optional[str]], input_format: str = "ndjson") -> AsyncIterator[tuple[int, Optional[dict]]]:
+    """
+    Parse NDJSON objects or CSV records (with a header row) from a line stream.
+
+    CSV fields may be quoted but must not contain line breaks.
+
+    Args:
+        lines (AsyncIterator[Optional[str]]): The input lines; None stands for an undecodable line.
+        input_format (str): "ndjson" or "csv".
+
+    Yields:
+        tuple[int, Optional[dict]]: The 1-based line number and the record, or None if the line is malformed.
+    """
+    header: Optional[list[str]] = None
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if line is None:
+            yield line_number, None
+            continue
+        if not line.strip():
+            continue
+        if input_format == "csv":
+            fields = next(csv.reader([line]))
+            if header is None:
+                header = [field.strip() for field in fields]
+                continue
+            # Empty cells mean "not given", so password/hashed_password can share one file
+            yield line_number, (
+                {name: value for name, value in zip(header, fields) if value != ""}
+                if len(fields) == len(header) else None
+            )
+        else:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield line_number, record if isinstance(record, dict) else None
+
+
+class UserImportService:
+    """
+    Registers users in bulk.
+
+    Rows are processed in chunks: one query finds the chunk's emails and
+    usernames that already exist, plaintext passwords are hashed across the
+    hashing pool, and the remaining rows go in with one multi-row
+    `INSERT ... ON CONFLICT DO NOTHING` and a commit. Bad or conflicting rows
+    are reported with their line number and skipped; the rest of the import
+    carries on.
+    """
+
+    def __init__(self, chunk_size: int = settings.USER_IMPORT_CHUNK_SIZE, max_errors: int = settings.USER_IMPORT_MAX_ERRORS):
+        self.chunk_size = chunk_size
+        self.max_errors = max_errors
+
+    async def import_users(self, rows: AsyncIterator[tuple[int, Optional[dict]]], db: AsyncSession) -> UserImportReport:
+        """
+        Import parsed rows.
+
+        Args:
+            rows (AsyncIterator[tuple[int, Optional[dict]]]): Line numbers and records, as yielded by `parse_rows`.
+            db (AsyncSession): The database session; each chunk is committed separately.
+
+        Returns:
+            UserImportReport: Counts of imported and failed rows, with per-row errors.
+        """
+        report = UserImportReport()
+        seen_emails: set[str] = set()
+        seen_usernames: set[str] = set()
+        chunk: list[tuple[int, UserImportRow]] = []
+
+        async for line, record in rows:
+            if record is None:
+                self._fail(report, line, None, "Malformed row")
+                continue
+            try:
+                row = UserImportRow.model_validate(record)
+            except ValidationError as e:
+                self._fail(report, line, record.get("email"), e.errors()[0]["msg"])
+                continue
+            if row.hashed_password is not None and pwd_context.identify(row.hashed_password, required=False) is None:
+                self._fail(report, line, row.email, "Unsupported password hash")
+                continue
+            if row.email in seen_emails or row.username in seen_usernames:
+                self._fail(report, line, row.email, "Duplicate email or username in import")
+                continue
+            seen_emails.add(row.email)
+            seen_usernames.add(row.username)
+
+            chunk.append((line, row))
+            if len(chunk) >= self.chunk_size:
+                await self._import_chunk(chunk, db, report)
+                chunk = []
+
+        if chunk:
+            await self._import_chunk(chunk, db, report)
+        return report
+
+    async def _import_chunk(self, chunk: list[tuple[int, UserImportRow]], db: AsyncSession, report: UserImportReport) -> None:
+        emails = [row.email for _, row in chunk]
+        usernames = [row.username for _, row in chunk]
+        if db.bind.dialect.name == "postgresql":
+            # Array parameters keep the statement identical whatever the chunk size
+            condition = or_(
+                User.email == any_(bindparam("emails", emails, type_=postgresql.ARRAY(String))),
+                User.username == any_(bindparam("usernames", usernames, type_=postgresql.ARRAY(String))),
+            )
+        else:
+            condition = or_(User.email.in_(emails), User.username.in_(usernames))
+        existing = (await db.execute(select(User.email, User.username).where(condition))).all()
+        taken_emails = {email for email, _ in existing}
+        taken_usernames = {username for _, username in existing}
+
+        pending: list[tuple[int, UserImportRow]] = []
+        for line, row in chunk:
+            if row.email in taken_emails:
+                self._fail(report, line, row.email, "Email already registered")
+            elif row.username in taken_usernames:
+                self._fail(report, line, row.email, "Username already taken")
+            else:
+                pending.append((line, row))
+        if not pending:
+            return
+
+        plaintext = [row.password for _, row in pending if row.hashed_password is None]
+        try:
+            hashes = iter(await hashing_executor.map(hash_password_sync, plaintext))
+        except Exception:
+            # Earlier chunks are already committed; report this one and carry on with the rest
+            logger.exception("Password hashing failed during a user import")
+            for line, row in pending:
+                self._fail(report, line, row.email, "Password hashing failed")
+            return
+        values = [
+            {
+                "username": row.username,
+                "email": row.email,
+                # Legacy hashes are kept as-is and upgraded by the rehash-on-login path
+                "hashed_password": row.hashed_password if row.hashed_password is not None else next(hashes),
+            }
+            for _, row in pending
+        ]
+
+        insert = postgresql.insert if db.bind.dialect.name == "postgresql" else sqlite.insert
+        statement = insert(User).values(values).on_conflict_do_nothing().returning(User.id, User.email)
+        inserted = {email: user_id for user_id, email in await db.execute(statement)}
+        await db.commit()
+
+        for line, row in pending:
+            if row.email not in inserted:
+                # Registered concurrently, between the existence check and the insert
+                self._fail(report, line, row.email, "Email or username already registered")
+                continue
+            report.imported += 1
+        # Drop any cached "unknown email" entries left by earlier lookups, for the whole chunk at once
+        await invalidate_users(list(inserted.values()), list(inserted))
+
+    def _fail(self, report: UserImportReport, line: int, email: Optional[str], error: str) -> None:
+        report.failed += 1
+        if len(report.errors) < self.max_errors:
+            report.errors.append(UserImportError(line=line, email=email, error=error))
+
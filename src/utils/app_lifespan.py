@@ -1,8 +1,40 @@
+import asyncio
 from fastapi import FastAPI
 from typing import AsyncIterator
-from src.utils.migrations import run_migrations
+from src.env.config import settings
+from src.env.database import engine, replica_router
+from src.utils.audit_log import audit_log
+from src.utils.hash_executor import hashing_executor
+from src.utils.invalidation import cache_invalidator
+from src.utils.migrations import check_schema_version, upgrade
+from src.utils.revocation import revocation_list
+from src.utils.session_store import session_store
+from src.utils.warmup import readiness, warm_up
 
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
-    # No migration code here
-    await run_migrations()
+    # Migrations run from `python -m src.migrate`; workers only confirm the schema is current
+    if settings.MIGRATIONS_ON_STARTUP == "upgrade":
+        await upgrade(engine)
+    elif settings.MIGRATIONS_ON_STARTUP == "check":
+        await check_schema_version(engine)
+    # Apply other workers' cache invalidations to this worker's caches
+    await cache_invalidator.start()
+    # Load revoked token ids into the local filter and follow new revocations
+    await revocation_list.start()
+    # Batched write-back of opaque session expiries
+    await session_store.start()
+    # Write-behind audit log; upcoming monthly partitions are created in the background
+    await audit_log.start()
+    # Open connections and load hashing/JWT backends, then report ready
+    await warm_up()
     yield
+    readiness.mark_not_ready()
+    await revocation_list.stop()
+    await session_store.stop()
+    await cache_invalidator.stop()
+    # Drain queued audit events before the pool closes
+    await audit_log.stop()
+    # Stop the password hashing workers (off the loop: shutdown waits for running jobs) and close pooled connections
+    await asyncio.to_thread(hashing_executor.shutdown)
+    await engine.dispose()
+    await replica_router.dispose()
@@ -0,0 +1,306 @@
+from abc import ABC, abstractmethod
+import asyncio
+import json
+import logging
+import os
+import uuid
+import zlib
+from datetime import date, datetime, timezone
+from typing import Optional
+from sqlalchemy import insert, text
+from src.env.config import settings
+from src.env.database import SessionLocal, engine
+from src.models.auth_event_model import AuthEvent
+
+logger = logging.getLogger(__name__)
+
+
+class AuditSink(ABC):
+    """Destination for batches of audit events."""
+
+    @abstractmethod
+    async def write(self, events: list[dict]) -> None:
+        """Persist a batch of events."""
+
+    async def maintain(self) -> None:
+        """Periodic housekeeping, run in the background while the log is started."""
+
+
+class DatabaseAuditSink(AuditSink):
+    """The `auth_events` table; each batch is one multi-row INSERT."""
+
+    def __init__(self, months_ahead: int = 3):
+        self.months_ahead = months_ahead
+
+    async def write(self, events: list[dict]) -> None:
+        async with SessionLocal() as db:
+            await db.execute(insert(AuthEvent).values(events))
+            await db.commit()
+
+    async def maintain(self) -> None:
+        await ensure_partitions(self.months_ahead)
+
+
+def _month_partitions(today: date, months: int) -> list[tuple[date, date]]:
+    bounds = []
+    start = today.replace(day=1)
+    for _ in range(months):
+        end = date(start.year + start.month // 12, start.month % 12 + 1, 1)
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+# Serializes partition maintenance between workers
+PARTITION_LOCK_ID = zlib.crc32(b"inquest-auth:auth-events-partitions")
+
+
+async def _create_partition(conn, start: date, end: date) -> None:
+    name = f"auth_events_{start:%Y_%m}"
+    # Literal bounds, read in the same session time zone as the partition's own bounds
+    in_range = f"occurred_at >= '{start.isoformat()}' AND occurred_at < '{end.isoformat()}'"
+    if await conn.scalar(text("SELECT to_regclass(:name) IS NOT NULL"), {"name": name}):
+        return
+    partition = (
+        f"CREATE TABLE {name} PARTITION OF auth_events "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+    in_default = await conn.scalar(text(f"SELECT EXISTS (SELECT 1 FROM auth_events_default WHERE {in_range})"))
+    if not in_default:
+        await conn.execute(text(partition))
+        return
+
+    # Postgres refuses a partition whose range already has rows in the default partition:
+    # detach the default, create the month, move its rows over and re-attach
+    logger.warning("Moving auth_events rows for %s out of the default partition", f"{start:%Y-%m}")
+    await conn.execute(text("ALTER TABLE auth_events DETACH PARTITION auth_events_default"))
+    await conn.execute(text(partition))
+    await conn.execute(text(f"INSERT INTO {name} SELECT * FROM auth_events_default WHERE {in_range}"))
+    await conn.execute(text(f"DELETE FROM auth_events_default WHERE {in_range}"))
+    await conn.execute(text("ALTER TABLE auth_events ATTACH PARTITION auth_events_default DEFAULT"))
+
+
+async def ensure_partitions(months: int = 3) -> None:
+    """
+    Create the monthly auth_events partitions for this month and the next ones (Postgres only).
+
+    Safe to run from every worker at once: each month is created in its own
+    transaction under an advisory lock, and rows that already fell into the
+    default partition for a missing month are moved into it.
+
+    Args:
+        months (int): Months to cover, starting with the current one.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    for start, end in _month_partitions(date.today(), months):
+        async with engine.begin() as conn:
+            await conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": PARTITION_LOCK_ID})
+            await _create_partition(conn, start, end)
+
+
+class AuditLog:
+    """
+    Write-behind audit log.
+
+    `record` only enqueues the event; a background task writes the queue to
+    the sink in batches, whenever `batch_size` events are waiting or every
+    `flush_interval` seconds, whichever comes first. When the queue is full
+    the `overflow` policy applies: "drop" the event (counted in `dropped`),
+    "block" the caller until there is room, or "spill" it to a local NDJSON
+    file. Spilled events, and batches the sink failed to take, are replayed
+    on the next start.
+    """
+
+    def __init__(
+        self,
+        sink: AuditSink,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1,
+        overflow: str = "drop",
+        spill_path: Optional[str] = None,
+        enabled: bool = True,
+        maintenance_interval: float = 3600,
+    ):
+        if overflow not in ("drop", "block", "spill"):
+            raise ValueError(f"Unknown audit overflow policy '{overflow}'")
+        self.sink = sink
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.spill_path = spill_path
+        self.enabled = enabled
+        self.maintenance_interval = maintenance_interval
+        self.dropped = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._batch_ready: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._maintenance_task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _ensure_queue(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._batch_ready = asyncio.Event()
+        return self._queue
+
+    async def record(
+        self,
+        event_type: str,
+        outcome: str,
+        user_id: Optional[int] = None,
+        email: Optional[str] = None,
+        ip: Optional[str] = None,
+        user_agent: Optional[str] = None,
+        latency_ms: Optional[float] = None,
+    ) -> None:
+        """
+        Queue an audit event; returns without I/O unless the overflow policy says otherwise.
+
+        Args:
+            event_type (str): "login" or "register".
+            outcome (str): e.g. "success", "invalid_credentials", "already_registered".
+            user_id (Optional[int]): The user, when known.
+            email (Optional[str]): The email the caller supplied.
+            ip (Optional[str]): The client address.
+            user_agent (Optional[str]): The client's User-Agent header.
+            latency_ms (Optional[float]): How long the operation took.
+        """
+        if not self.enabled:
+            return
+        event = {
+            "id": uuid.uuid4().hex,
+            "occurred_at": datetime.now(timezone.utc),
+            "event_type": event_type,
+            "outcome": outcome,
+            "user_id": user_id,
+            "email": email,
+            "ip": ip,
+            "user_agent": user_agent[:512] if user_agent else None,
+            "latency_ms": latency_ms,
+        }
+        queue = self._ensure_queue()
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            if self.overflow == "block":
+                self._batch_ready.set()
+                await queue.put(event)
+            elif self.overflow == "spill":
+                self._spill([event])
+            else:
+                self.dropped += 1
+                if self.dropped % 1000 == 1:
+                    logger.warning("Audit queue full, %d events dropped so far", self.dropped)
+        if queue.qsize() >= self.batch_size:
+            self._batch_ready.set()
+
+    async def flush(self) -> None:
+        """Write everything queued so far to the sink, in batches."""
+        queue = self._ensure_queue()
+        while not queue.empty():
+            batch = [queue.get_nowait() for _ in range(min(self.batch_size, queue.qsize()))]
+            try:
+                await self.sink.write(batch)
+            except Exception:
+                logger.exception("Failed to write %d audit events", len(batch))
+                if self.spill_path:
+                    self._spill(batch)
+
+    def _spill(self, events: list[dict]) -> None:
+        if not self.spill_path:
+            self.dropped += len(events)
+            return
+        with open(self.spill_path, "a") as spill_file:
+            for event in events:
+                spill_file.write(json.dumps({**event, "occurred_at": event["occurred_at"].isoformat()}) + "\n")
+
+    async def _replay_spill(self) -> None:
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return
+        # Claimed by renaming, so workers starting together do not replay the same file
+        # and events spilled meanwhile go to a fresh one; a failed replay leaves it for an operator
+        replaying = f"{self.spill_path}.{os.getpid()}.replay"
+        try:
+            os.replace(self.spill_path, replaying)
+        except FileNotFoundError:
+            return
+        with open(replaying) as spill_file:
+            events = [json.loads(line) for line in spill_file if line.strip()]
+        for event in events:
+            event["occurred_at"] = datetime.fromisoformat(event["occurred_at"])
+        for index in range(0, len(events), self.batch_size):
+            await self.sink.write(events[index:index + self.batch_size])
+        os.remove(replaying)
+        logger.info("Replayed %d spilled audit events", len(events))
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            await self.flush()
+
+    async def _maintain(self) -> None:
+        # Runs at start and then periodically, so partitions exist well before they are needed
+        # even in workers that stay up for months; failures only delay the next attempt
+        while True:
+            try:
+                await self.sink.maintain()
+            except Exception:
+                logger.exception("Audit log maintenance failed")
+            await asyncio.sleep(self.maintenance_interval)
+
+    async def start(self) -> None:
+        """Replay spilled events and start the background flusher and maintenance."""
+        if not self.enabled:
+            return
+        self._ensure_queue()
+        try:
+            await self._replay_spill()
+        except Exception:
+            logger.exception("Failed to replay spilled audit events")
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        if self._maintenance_task is None:
+            self._maintenance_task = asyncio.create_task(self._maintain())
+
+    async def stop(self) -> None:
+        """Stop the flusher and drain whatever is still queued."""
+        if self._maintenance_task is not None:
+            self._maintenance_task.cancel()
+            try:
+                await self._maintenance_task
+            except asyncio.CancelledError:
+                pass
+            self._maintenance_task = None
+        if self._task is not None:
+            # Let the current write finish instead of cancelling it mid-batch
+            self._stopping = True
+            self._batch_ready.set()
+            await self._task
+            self._task = None
+            self._stopping = False
+        if self._queue is not None:
+            await self.flush()
+
+
+# Shared audit log written to by AuthService
+audit_log = AuditLog(
+    DatabaseAuditSink(months_ahead=settings.AUDIT_PARTITION_MONTHS_AHEAD),
+    max_queue=settings.AUDIT_QUEUE_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL,
+    overflow=settings.AUDIT_OVERFLOW,
+    spill_path=settings.AUDIT_SPILL_PATH,
+    enabled=settings.AUDIT_ENABLED,
+    maintenance_interval=settings.AUDIT_PARTITION_CHECK_INTERVAL,
+)
@@ -1,50 +1,185 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from fastapi.responses import JSONResponse
+import re
+from typing import Callable, Iterable, NamedTuple, Optional
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 from src.schemas.user_schema import UserResponse
 from src.utils.jwt_utils import decode_access_token
-from fastapi import HTTPException, status
+from src.utils.metrics import observe_stage
+from src.utils.permissions import decode_permissions
+from src.utils.responses import error_response
+from src.utils.revocation import revocation_list
+from src.utils.session_store import is_session_handle, session_store
+from src.utils.token_cache import token_cache
+from fastapi import status
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, exempt_paths: list[str] = None):
-        super().__init__(app)
+
+def compile_exempt_paths(exempt_paths: list[str]) -> re.Pattern:
+    """
+    Compile exempt paths into a single anchored regex.
+
+    A path ending in "/" exempts everything below it ("/auth/" covers
+    "/auth/login"); any other path exempts itself and its sub-paths only at a
+    segment boundary ("/docs" covers "/docs/oauth2-redirect" but not "/docsx").
+
+    Args:
+        exempt_paths (list[str]): The paths to exempt from authentication.
+
+    Returns:
+        re.Pattern: A pattern whose `match` tells whether a path is exempt.
+    """
+    alternatives = [
+        re.escape(path) if path.endswith("/") else re.escape(path) + r"(?:/|$)"
+        for path in sorted(exempt_paths, key=len, reverse=True)
+    ]
+    # An empty alternation would match everything, so use a never-matching pattern instead
+    return re.compile("|".join(alternatives) if alternatives else r"(?!)")
+
+
+def public(endpoint: Callable) -> Callable:
+    """
+    Mark a route handler as reachable without a bearer token.
+
+    Apply it below the router decorator. AuthMiddleware picks marked routes up
+    from the app's route table, so the route needs no entry in `exempt_paths`.
+    """
+    endpoint.is_public = True
+    return endpoint
+
+
+def collect_public_paths(routes: Iterable) -> frozenset[str]:
+    """
+    Collect the exact paths of routes whose handler is marked with `public`.
+
+    Args:
+        routes (Iterable): The application's routes.
+
+    Returns:
+        frozenset[str]: The public paths; templated paths are left out.
+    """
+    return frozenset(
+        route.path for route in routes
+        if getattr(getattr(route, "endpoint", None), "is_public", False) and "{" not in route.path
+    )
+
+
+# 401 responses built once; Response objects are stateless and safe to send repeatedly
+_REJECTIONS = {
+    message: error_response(status.HTTP_401_UNAUTHORIZED, message)
+    for message in (
+        "Authorization header missing",
+        "Invalid authorization header",
+        "Invalid token type",
+        "Invalid token",
+        "Token revoked",
+    )
+}
+
+
+class CachedIdentity(NamedTuple):
+    """What the token cache keeps for a verified access token."""
+    user: UserResponse
+    jti: Optional[str]
+    roles: tuple[str, ...] = ()
+    permissions: int = 0
+
+
+def session_identity(claims: dict) -> CachedIdentity:
+    # Session claims were written by this service, so they are trusted without re-validation
+    return CachedIdentity(
+        UserResponse.model_construct(id=claims["id"], username=claims["username"], email=claims["email"]),
+        None,
+        tuple(claims.get("roles", ())),
+        decode_permissions(claims.get("perm")),
+    )
+
+
+class AuthMiddleware:
+    """
+    Pure ASGI middleware that authenticates bearer tokens.
+
+    Unlike BaseHTTPMiddleware it does not wrap the request and response in
+    extra tasks and memory streams, so streaming responses pass through
+    untouched.
+    """
+
+    def __init__(self, app: ASGIApp, exempt_paths: list[str] = None):
+        self.app = app
         self.exempt_paths = exempt_paths or []
+        self._exempt_pattern = compile_exempt_paths(self.exempt_paths)
+        self._public_paths: Optional[frozenset[str]] = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-    async def dispatch(self, request: Request, call_next):
-        # Check if the request path is in the list of exempt paths
-        if any(request.url.path.startswith(path) for path in self.exempt_paths):
-            return await call_next(request)
+        if self._public_paths is None:
+            # Routes are all registered by the first request; read the table once
+            self._public_paths = collect_public_paths(getattr(scope.get("app"), "routes", ()))
+        if scope["path"] in self._public_paths or self._exempt_pattern.match(scope["path"]):
+            await self.app(scope, receive, send)
+            return
 
         # Extract the token from the Authorization header
-        auth_header = request.headers.get("Authorization")
-        if auth_header:
-            token_type, token = auth_header.split()
-            if token_type.lower() != "bearer":
-                return JSONResponse(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    content={"error": True, "message": "Invalid token type", "data": None},
-                )
-        else:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"error": True, "message": "Authorization header missing", "data": None},
-            )
+        auth_header = Headers(scope=scope).get("authorization")
+        if not auth_header:
+            return await self._reject("Authorization header missing", scope, receive, send)
+
+        parts = auth_header.split()
+        if len(parts) != 2:
+            return await self._reject("Invalid authorization header", scope, receive, send)
+        token_type, token = parts
+        if token_type.lower() != "bearer":
+            return await self._reject("Invalid token type", scope, receive, send)
 
         try:
+            if is_session_handle(token):
+                # Opaque handle: resolved through the session store's near-cache
+                session = await session_store.resolve(token)
+                if session is None:
+                    return await self._reject("Invalid token", scope, receive, send)
+                identity = session_identity(session.claims)
+            else:
+                identity = self._verify_jwt(token)
+                if identity is None:
+                    return await self._reject("Invalid token", scope, receive, send)
+
+                # The Bloom filter clears almost every token locally; only probable hits reach the store
+                if identity.jti and await revocation_list.is_revoked(identity.jti):
+                    return await self._reject("Token revoked", scope, receive, send)
+        except Exception as e:
+            return await self._reject(str(e), scope, receive, send)
+
+        # Attach the user information to the request state for use in route handlers
+        state = scope.setdefault("state", {})
+        state["user"] = identity.user
+        state["roles"] = identity.roles
+        state["permissions"] = identity.permissions
+
+        # Proceed to the next middleware or route handler
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    def _verify_jwt(token: str) -> Optional[CachedIdentity]:
+        # Repeat requests with the same token skip signature checks and validation
+        identity = token_cache.get(token)
+        if identity is None:
             # Decode the token and retrieve the user information
-            user = decode_access_token(token)
+            with observe_stage("token_decode"):
+                user = decode_access_token(token)
             if user is None:
-                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+                return None
 
-            # Attach the user information to the request state for use in route handlers
-            user_response = UserResponse.model_validate(user)
-            request.state.user = user_response
-        except Exception as e:
-            return JSONResponse(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                content={"error": True, "message": str(e), "data": None},
+            identity = CachedIdentity(
+                UserResponse.model_validate(user),
+                user.get("jti"),
+                tuple(user.get("roles", ())),
+                decode_permissions(user.get("perm")),
             )
+            token_cache.set(token, identity, exp=user.get("exp"))
+        return identity
 
-        # Proceed to the next middleware or route handler
-        response = await call_next(request)
-        return response
+    @staticmethod
+    async def _reject(message: str, scope: Scope, receive: Receive, send: Send) -> None:
+        response = _REJECTIONS.get(message) or error_response(status.HTTP_401_UNAUTHORIZED, message)
+        await response(scope, receive, send)
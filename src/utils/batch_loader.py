@@ -0,0 +1,79 @@
+import asyncio
+import weakref
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+
+class _Batch:
+    def __init__(self):
+        self.futures: dict[Hashable, asyncio.Future] = {}
+        self.handle: Optional[asyncio.TimerHandle] = None
+
+
+class BatchLoader:
+    """
+    DataLoader-style coalescer for single-key lookups.
+
+    Keys requested within `window` seconds of each other on the same event
+    loop are fetched together with one call to `batch_fn`, which receives the
+    distinct keys and returns the found values by key. Keys it leaves out
+    resolve to None. State is kept per event loop, so one module-level
+    instance is safe to share.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[list], Awaitable[dict]],
+        window: float = 0.002,
+        max_batch_size: int = 500,
+    ):
+        self.batch_fn = batch_fn
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._batches: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _Batch]" = weakref.WeakKeyDictionary()
+        self._tasks: set[asyncio.Task] = set()
+
+    async def load(self, key: Hashable) -> Any:
+        """
+        Queue a key for the next batch and wait for its value.
+
+        Args:
+            key (Hashable): The key to look up.
+
+        Returns:
+            Any: The value `batch_fn` returned for the key, or None.
+        """
+        loop = asyncio.get_running_loop()
+        batch = self._batches.get(loop)
+        if batch is None:
+            batch = self._batches[loop] = _Batch()
+            batch.handle = loop.call_later(self.window, self._dispatch, loop)
+
+        future = batch.futures.get(key)
+        if future is None:
+            future = batch.futures[key] = loop.create_future()
+            if len(batch.futures) >= self.max_batch_size:
+                batch.handle.cancel()
+                self._dispatch(loop)
+        return await asyncio.shield(future)
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop) -> None:
+        batch = self._batches.pop(loop, None)
+        if batch is None:
+            return
+        task = loop.create_task(self._run(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: _Batch) -> None:
+        try:
+            values = await self.batch_fn(list(batch.futures))
+        except Exception as e:
+            for future in batch.futures.values():
+                if not future.done():
+                    future.set_exception(e)
+                    # Waiters see the error; mark it retrieved so it is not logged as unobserved
+                    future.exception()
+            return
+        for key, future in batch.futures.items():
+            if not future.done():
+                future.set_result(values.get(key))
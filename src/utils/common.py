@@ -1,14 +1,109 @@
+import orjson
+from sqlalchemy import Integer, Select, any_, bindparam, func, or_
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import Optional
+from typing import AsyncIterator, Iterable, Optional
+from src.env.config import settings
+from src.env.database import replica_router
 from src.models.response_model import ResponseModel
-from src.schemas.user_schema import UserResponse
+from src.schemas.user_schema import UserPage, UserResponse
 from src.models.user_model import User
+from src.utils.batch_loader import BatchLoader
+from src.utils.user_cache import user_cache
+
+def _read_keys(user_ids: Iterable[int] = (), emails: Iterable[str] = ()) -> list[str]:
+    # Identify users to the replica router's read-your-writes window
+    return [f"user:{user_id}" for user_id in user_ids] + [f"user-email:{email}" for email in emails]
+
+async def invalidate_user(user_id: Optional[int] = None, email: Optional[str] = None) -> None:
+    """
+    Call after writing a user: their next reads come from the primary and cached copies are dropped.
+
+    Args:
+        user_id (Optional[int]): The id of the written user.
+        email (Optional[str]): The email of the written user.
+    """
+    await invalidate_users(
+        [user_id] if user_id is not None else [],
+        [email] if email is not None else [],
+    )
+
+async def invalidate_users(user_ids: list[int], emails: list[str]) -> None:
+    """
+    Like `invalidate_user` for several users at once, with one round of pinning and invalidation.
+
+    Args:
+        user_ids (list[int]): The ids of the written users.
+        emails (list[str]): The emails of the written users.
+    """
+    # Pinned first, so a cache miss right after the invalidation cannot re-fill from a lagging replica
+    await replica_router.mark_written(_read_keys(user_ids, emails))
+    await user_cache.invalidate_many(user_ids, emails)
+
+def user_record(user: User) -> dict:
+    """
+    Convert a User row into the plain record kept in the user cache.
+
+    The password hash is included for logins, but only the in-process cache
+    backend stores it (see UserCache).
+
+    Args:
+        user (User): The user row.
+
+    Returns:
+        dict: The cacheable user fields.
+    """
+    return {
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "hashed_password": user.hashed_password,
+    }
+
+def public_user(record: dict) -> UserResponse:
+    # Records come from our own table, so build the response without re-validating it
+    return UserResponse.model_construct(**{field: record[field] for field in UserResponse.model_fields})
+
+async def load_user_records(user_ids: list[int], db: AsyncSession) -> dict[int, dict]:
+    """
+    Fetch several users with a single query.
+
+    On Postgres the ids travel as one array parameter (`id = ANY(:ids)`), so
+    the statement is the same whatever the number of ids and stays in the
+    driver's prepared statement cache.
+
+    Args:
+        user_ids (list[int]): The ids to fetch.
+        db (AsyncSession): The database session.
+
+    Returns:
+        dict[int, dict]: The found user records by id.
+    """
+    if not user_ids:
+        return {}
+    if db.bind.dialect.name == "postgresql":
+        condition = User.id == any_(bindparam("user_ids", list(user_ids), type_=ARRAY(Integer)))
+    else:
+        condition = User.id.in_(user_ids)
+    result = await db.execute(select(User).where(condition))
+    return {user.id: user_record(user) for user in result.scalars()}
+
+async def _load_user_batch(user_ids: list[int]) -> dict[int, dict]:
+    return await replica_router.run_read(lambda db: load_user_records(user_ids, db), keys=_read_keys(user_ids))
+
+# Merges concurrent single-user lookups on an event loop into one batched query
+user_loader = BatchLoader(_load_user_batch, window=settings.USER_BATCH_WINDOW_MS / 1000)
 
 async def get_user_by_email(email: str, db: AsyncSession) -> Optional[User]:
     """
     Retrieve a user by email.
 
+    Served from the user cache when it is the in-process one; the returned
+    User may then be a detached instance built from the cached record. A
+    shared cache does not hold password hashes, so with one this reads the
+    database directly rather than paying for a cache round trip as well.
+
     Args:
         email (str): The user's email.
         db (AsyncSession): The database session.
@@ -17,37 +112,138 @@ async def get_user_by_email(email: str, db: AsyncSession) -> Optional[User]:
         Optional[User]: The user if found, otherwise None.
     """
 
+    async def query(read_db: AsyncSession) -> Optional[dict]:
+        result = await read_db.execute(select(User).filter_by(email=email))
+        user = result.scalars().first()
+        return user_record(user) if user else None
+
+    async def load() -> Optional[dict]:
+        return await replica_router.run_read(query, primary=db, keys=_read_keys(emails=[email]))
+
     try:
-        user = db.execute(select(User).filter_by(email=email))
-        if user is None:
-            raise ValueError("Query result is None")
-        
-        return user
-    except ValueError as e:
-        # Log and raise value errors
-        raise e
+        if user_cache.cache_password_hashes:
+            record = await user_cache.get_by_email(email, load)
+        else:
+            record = await load()
     except Exception as e:
         # Log unexpected errors
         raise RuntimeError("An unexpected error occurred.")
 
-async def get_user_by_id( userId: int, db: AsyncSession) -> ResponseModel:
+    return User(**record) if record else None
+
+async def get_user_by_id( userId: int, db: AsyncSession) -> ResponseModel[UserResponse]:
+    async def load() -> Optional[dict]:
+        if settings.USER_BATCH_WINDOW_MS > 0:
+            return await user_loader.load(userId)
+        records = await replica_router.run_read(
+            lambda read_db: load_user_records([userId], read_db), primary=db, keys=_read_keys([userId])
+        )
+        return records.get(userId)
+
     try:
-        query = select(User).where(User.id == userId)
-        result = db.execute(query)
-        user = result.scalars().first()
-        
-        if user :
-            user_response = UserResponse.model_validate(user)
-            return ResponseModel(
+        record = await user_cache.get_by_id(userId, load)
+
+        if record :
+            return ResponseModel[UserResponse](
                 error=False,
                 message="Request successful",
-                data= user_response.model_dump()
+                data=public_user(record)
             )
         else:
             raise Exception("Invalid user id")
     except Exception as e:
-        return ResponseModel(
+        return ResponseModel[UserResponse](
             error=True,
             message=str(e),
             data=None
-        )
\ No newline at end of file
+        )
+
+
+async def get_users_by_ids(user_ids: list[int], db: AsyncSession) -> ResponseModel[list[UserResponse]]:
+    """
+    Retrieve several users at once, querying only the ids missing from the cache.
+
+    Args:
+        user_ids (list[int]): The ids to look up; duplicates are ignored.
+        db (AsyncSession): The database session.
+
+    Returns:
+        ResponseModel[list[UserResponse]]: The found users, in request order. Unknown ids are left out.
+    """
+    unique_ids = list(dict.fromkeys(user_ids))
+    async def load(missing: list[int]) -> dict[int, dict]:
+        return await replica_router.run_read(
+            lambda read_db: load_user_records(missing, read_db), primary=db, keys=_read_keys(missing)
+        )
+
+    records = await user_cache.get_many_by_id(unique_ids, load)
+    return ResponseModel[list[UserResponse]](
+        error=False,
+        message="Request successful",
+        data=[public_user(records[user_id]) for user_id in unique_ids if user_id in records]
+    )
+
+
+async def _fetch_all(db: AsyncSession, query: Select) -> list:
+    return (await db.execute(query)).all()
+
+def _search_users(query: Select, q: Optional[str]) -> Select:
+    # Lower-cased prefix match, served by the ix_users_*_lower_prefix indexes on Postgres
+    if q and q.strip():
+        prefix = q.strip().lower()
+        query = query.where(or_(
+            func.lower(User.username).startswith(prefix, autoescape=True),
+            func.lower(User.email).startswith(prefix, autoescape=True),
+        ))
+    return query
+
+async def list_users(db: AsyncSession, after: Optional[int] = None, limit: int = 50, q: Optional[str] = None) -> ResponseModel[UserPage]:
+    """
+    Return one page of users ordered by id, seeking past `after`.
+
+    Keyset pagination reads `limit` rows from the primary key index wherever
+    the page is, unlike OFFSET which reads and discards every earlier row.
+
+    Args:
+        db (AsyncSession): The database session.
+        after (Optional[int]): The last id of the previous page; None for the first page.
+        limit (int): The page size.
+        q (Optional[str]): A case-insensitive prefix of the username or email.
+
+    Returns:
+        ResponseModel[UserPage]: The page, with next_after set when more users follow.
+    """
+    query = select(User.id, User.username, User.email).order_by(User.id).limit(limit + 1)
+    if after is not None:
+        query = query.where(User.id > after)
+    rows = await replica_router.run_read(lambda read_db: _fetch_all(read_db, _search_users(query, q)), primary=db)
+    return ResponseModel[UserPage](
+        error=False,
+        message="Request successful",
+        data=UserPage.model_construct(
+            items=[public_user(row._mapping) for row in rows[:limit]],
+            next_after=rows[limit - 1].id if len(rows) > limit else None,
+        )
+    )
+
+async def export_users(q: Optional[str] = None, batch_size: int = 1000) -> AsyncIterator[bytes]:
+    """
+    Stream users as NDJSON, one chunk per batch of rows.
+
+    Rows come from a server-side cursor, so memory use is bounded by
+    `batch_size` however many users match. The generator opens its own
+    session (on a replica when configured) because the request's session is
+    closed before a streamed body is sent.
+
+    Args:
+        q (Optional[str]): A case-insensitive prefix of the username or email.
+        batch_size (int): Rows fetched per round trip.
+
+    Yields:
+        bytes: Newline-terminated JSON objects with id, username and email.
+    """
+    query = _search_users(select(User.id, User.username, User.email).order_by(User.id), q)
+    async with replica_router.read_session() as db:
+        result = await db.stream(query.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            yield b"".join(orjson.dumps(dict(row._mapping)) + b"\n" for row in rows)
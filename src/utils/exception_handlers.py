@@ -1,36 +1,41 @@
-from fastapi.responses import JSONResponse
 from fastapi import FastAPI, Request, status
 from fastapi.exceptions import RequestValidationError, HTTPException
 from src.models.response_model import ResponseModel
+from src.utils.responses import ModelResponse, error_response
 
 
 async def global_exception_handler(request: Request, exc: Exception):
-    return JSONResponse(
+    return ModelResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content=ResponseModel(
             error=True,
             message=str(exc),
             data=None
-        ).model_dump()
+        )
     )
 
 async def global_http_exception_handler(request: Request, exc: HTTPException):
-    return JSONResponse(
+    headers = getattr(exc, "headers", None)
+    if isinstance(exc.detail, str):
+        # Common errors (401, 404, ...) repeat the same few messages; reuse their serialized bodies
+        return error_response(exc.status_code, exc.detail, headers=headers)
+    return ModelResponse(
         status_code=exc.status_code,
         content=ResponseModel(
             error=True,
             message=exc.detail,
             data=None
-        ).model_dump()
+        ),
+        headers=headers
     )
 
 
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
-    return JSONResponse(
+    return ModelResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content=ResponseModel(
             error=True,
             message="Validation error",
             data=exc.errors()
-        ).model_dump()
+        )
     )
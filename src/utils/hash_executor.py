@@ -0,0 +1,155 @@
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from fastapi import HTTPException, status
+from src.env.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class HashingPoolBusy(HTTPException):
+    """Raised when the hashing queue is full; surfaces to clients as 503."""
+
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+
+class HashingExecutor:
+    """
+    Run CPU-bound password hashing off the event loop.
+
+    Work goes to a process pool so it spreads across cores, falling back to a
+    thread pool (bcrypt and argon2 release the GIL) where processes are not
+    available. At most `max_concurrency` jobs run at once; further callers
+    wait in line, and once `max_queue` callers are waiting new work is
+    rejected with HashingPoolBusy instead of piling up latency. Bulk work
+    submitted through `map` waits for a slot instead and does not count
+    against that limit.
+    """
+
+    def __init__(self, mode: str = "process", max_concurrency: int = 4, max_queue: int = 64):
+        self.mode = mode
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._waiting = 0
+        self._bulk_waiting = 0
+        self._running = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of callers waiting for a free hashing slot."""
+        return self._waiting + self._bulk_waiting
+
+    @property
+    def in_flight(self) -> int:
+        """Number of hashing jobs currently running."""
+        return self._running
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                try:
+                    self._executor = ProcessPoolExecutor(max_workers=self.max_concurrency)
+                except (OSError, NotImplementedError) as e:
+                    logger.warning("Process pool unavailable (%s), hashing on threads instead", e)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency, thread_name_prefix="hashing"
+                )
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any, wait: bool = False) -> Any:
+        """
+        Run `fn(*args)` on the pool, honouring the concurrency and queue limits.
+
+        Args:
+            fn (Callable): A picklable, module-level function.
+            *args: Arguments passed to `fn`.
+            wait (bool): Wait for a slot however long the queue is, instead of being rejected.
+
+        Returns:
+            Any: The function's result.
+
+        Raises:
+            HashingPoolBusy: If the wait queue is already full and `wait` is False.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        if wait:
+            self._bulk_waiting += 1
+        elif self._semaphore.locked() and self._waiting >= self.max_queue:
+            raise HashingPoolBusy()
+        else:
+            self._waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            if wait:
+                self._bulk_waiting -= 1
+            else:
+                self._waiting -= 1
+
+        self._running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._running -= 1
+            self._semaphore.release()
+
+    async def map(self, fn: Callable[..., Any], items: list) -> list:
+        """
+        Run `fn(item)` for every item, using all hashing slots.
+
+        Bulk callers keep at most `max_concurrency` jobs queued and wait for
+        slots rather than being rejected, so they share the pool with
+        interactive requests without tripping the queue limit. If one call
+        fails the others are cancelled and the error is raised.
+
+        Args:
+            fn (Callable): A picklable, module-level function.
+            items (list): One argument per call.
+
+        Returns:
+            list: The results, in the order of `items`.
+        """
+        results: list = [None] * len(items)
+        indexes = iter(range(len(items)))
+
+        async def worker() -> None:
+            # Workers pull from one shared iterator until it runs dry
+            for index in indexes:
+                results[index] = await self.run(fn, items[index], wait=True)
+
+        workers = [asyncio.create_task(worker()) for _ in range(min(self.max_concurrency, len(items)))]
+        try:
+            await asyncio.gather(*workers)
+        except BaseException:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            raise
+        return results
+
+    def shutdown(self) -> None:
+        """Stop the worker pool; a later call to `run` starts a fresh one."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        self._semaphore = None
+
+
+# Shared executor used by hash_utils and AuthService
+hashing_executor = HashingExecutor(
+    mode=settings.HASH_EXECUTOR,
+    max_concurrency=settings.HASH_MAX_CONCURRENCY,
+    max_queue=settings.HASH_MAX_QUEUE,
+)
@@ -1,12 +1,74 @@
+import asyncio
+import secrets
+from typing import Optional
 from passlib.context import CryptContext
+from src.env.config import settings
+from src.utils.hash_executor import hashing_executor
 
-# Password hashing context using bcrypt
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+def build_pwd_context() -> CryptContext:
+    """
+    Build the password hashing context from Settings.
 
-# Verify a plain password against a hashed password
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    The first scheme in PASSWORD_SCHEMES hashes new passwords; every other
+    scheme is still verified but marked deprecated, so `needs_update` flags
+    those hashes (and hashes with outdated cost parameters) for rehashing.
+
+    Returns:
+        CryptContext: The configured hashing context.
+    """
+    return CryptContext(
+        schemes=settings.PASSWORD_SCHEMES,
+        deprecated="auto",
+        argon2__type="ID",
+        argon2__memory_cost=settings.ARGON2_MEMORY_COST,
+        argon2__time_cost=settings.ARGON2_TIME_COST,
+        argon2__parallelism=settings.ARGON2_PARALLELISM,
+        bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    )
+
+# The single password hashing context shared by the whole service
+pwd_context = build_pwd_context()
 
-# Hash a password for storage
-def get_password_hash(password):
+# Blocking primitives; these run inside the hashing pool workers
+def hash_password_sync(password):
     return pwd_context.hash(password)
+
+def verify_password_sync(plain_password, hashed_password):
+    return pwd_context.verify(plain_password, hashed_password)
+
+# Check whether a stored hash uses a deprecated scheme or outdated costs (cheap, no hashing)
+def needs_rehash(hashed_password):
+    return pwd_context.needs_update(hashed_password)
+
+# Verify a plain password against a hashed password without blocking the event loop
+async def verify_password(plain_password, hashed_password):
+    return await hashing_executor.run(verify_password_sync, plain_password, hashed_password)
+
+# Hash a password for storage without blocking the event loop
+async def get_password_hash(password):
+    return await hashing_executor.run(hash_password_sync, password)
+
+# Hash of a random password with the current default scheme and costs, built once per process
+_dummy_hash: Optional[str] = None
+_dummy_hash_lock = asyncio.Lock()
+
+async def get_dummy_hash() -> str:
+    global _dummy_hash
+    if _dummy_hash is None:
+        async with _dummy_hash_lock:
+            if _dummy_hash is None:
+                _dummy_hash = await get_password_hash(secrets.token_urlsafe(32))
+    return _dummy_hash
+
+# Burn the same verify cost as a real account when the user does not exist; always False
+async def verify_dummy_password(plain_password) -> bool:
+    await verify_password(plain_password, await get_dummy_hash())
+    return False
+
+# Load the hashing backends in every pool worker (and build the dummy hash) before traffic arrives
+async def warm_up_hashing() -> None:
+    dummy_hash = await get_dummy_hash()
+    await asyncio.gather(*(
+        verify_password(secrets.token_urlsafe(8), dummy_hash)
+        for _ in range(hashing_executor.max_concurrency)
+    ))
@@ -0,0 +1,108 @@
+import asyncio
+import time
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from src.env.config import settings
+from src.env.database import engine
+from src.utils.hash_executor import HashingExecutor, hashing_executor
+
+
+class ReadinessProbe:
+    """
+    Dependency checks behind /readyz.
+
+    Pings the database and reads pool and hashing-queue occupancy. Results
+    are reused for `ttl` seconds and concurrent polls share one run, so
+    orchestrator polling from many sources costs at most one `SELECT 1` per
+    interval per worker.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        executor: HashingExecutor,
+        ttl: float = 2,
+        db_timeout: float = 1,
+        max_pool_saturation: float = 0.9,
+        max_hash_backlog: float = 0.8,
+    ):
+        self.engine = engine
+        self.executor = executor
+        self.ttl = ttl
+        self.db_timeout = db_timeout
+        self.max_pool_saturation = max_pool_saturation
+        self.max_hash_backlog = max_hash_backlog
+        self._result: Optional[tuple[bool, dict]] = None
+        self._expires_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def check(self) -> tuple[bool, dict]:
+        """
+        Run the probes, or return the cached result while it is fresh.
+
+        Returns:
+            tuple[bool, dict]: Whether every check passed, and the per-check details.
+        """
+        if self._result is not None and time.monotonic() < self._expires_at:
+            return self._result
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            # Another poll may have refreshed the result while this one waited
+            if self._result is None or time.monotonic() >= self._expires_at:
+                checks = {
+                    "database": await self._check_database(),
+                    "pool": self._check_pool(),
+                    "hashing": self._check_hashing(),
+                }
+                self._result = (all(check["ok"] for check in checks.values()), checks)
+                self._expires_at = time.monotonic() + self.ttl
+        return self._result
+
+    def invalidate(self) -> None:
+        """Forget the cached result so the next check probes again."""
+        self._result = None
+
+    async def _ping(self) -> None:
+        async with self.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    async def _check_database(self) -> dict:
+        start = time.perf_counter()
+        try:
+            # Bounded, so a saturated pool or unreachable host fails the probe instead of hanging it
+            await asyncio.wait_for(self._ping(), self.db_timeout)
+        except Exception as e:
+            return {"ok": False, "error": type(e).__name__}
+        return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+    def _check_pool(self) -> dict:
+        pool = self.engine.pool
+        if not hasattr(pool, "checkedout") or not hasattr(pool, "size"):
+            return {"ok": True}
+        max_overflow = getattr(pool, "_max_overflow", 0)
+        if max_overflow < 0:
+            # Unbounded overflow never saturates
+            return {"ok": True, "checked_out": pool.checkedout()}
+        saturation = pool.checkedout() / max(pool.size() + max_overflow, 1)
+        return {"ok": saturation < self.max_pool_saturation, "saturation": round(saturation, 3)}
+
+    def _check_hashing(self) -> dict:
+        backlog = self.executor.queue_depth / max(self.executor.max_queue, 1)
+        return {
+            "ok": backlog < self.max_hash_backlog,
+            "queue_depth": self.executor.queue_depth,
+            "in_flight": self.executor.in_flight,
+        }
+
+
+# Shared probe used by /readyz
+readiness_probe = ReadinessProbe(
+    engine,
+    hashing_executor,
+    ttl=settings.HEALTH_CACHE_TTL,
+    db_timeout=settings.HEALTH_DB_TIMEOUT,
+    max_pool_saturation=settings.HEALTH_MAX_POOL_SATURATION,
+    max_hash_backlog=settings.HEALTH_MAX_HASH_BACKLOG,
+)
@@ -0,0 +1,223 @@
+from abc import ABC, abstractmethod
+import asyncio
+import inspect
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Optional, Union
+import orjson
+from src.env.config import settings
+from src.utils.redis_client import create_redis_client
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription(ABC):
+    """An open subscription to one channel."""
+
+    @abstractmethod
+    async def get(self) -> bytes:
+        """Wait for the next message."""
+
+    @abstractmethod
+    async def close(self) -> None:
+        """Stop receiving messages."""
+
+
+class PubSubBackend(ABC):
+    """Publish/subscribe transport shared by every worker of a deployment."""
+
+    @abstractmethod
+    async def publish(self, channel: str, message: bytes) -> None:
+        """Send a message to every subscriber of a channel."""
+
+    @abstractmethod
+    async def subscribe(self, channel: str) -> Subscription:
+        """Subscribe to a channel; messages published after this returns are delivered."""
+
+
+class _InMemorySubscription(Subscription):
+    def __init__(self, subscribers: set):
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers = subscribers
+        subscribers.add(self.queue)
+
+    async def get(self) -> bytes:
+        return await self.queue.get()
+
+    async def close(self) -> None:
+        self._subscribers.discard(self.queue)
+
+
+class InMemoryPubSubBackend(PubSubBackend):
+    """Delivers to subscribers in this process only (a single worker, or tests)."""
+
+    def __init__(self):
+        self._channels: dict[str, set[asyncio.Queue]] = {}
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        for queue in self._channels.get(channel, ()):
+            queue.put_nowait(message)
+
+    async def subscribe(self, channel: str) -> Subscription:
+        return _InMemorySubscription(self._channels.setdefault(channel, set()))
+
+
+class _RedisSubscription(Subscription):
+    def __init__(self, pubsub: Any):
+        self.pubsub = pubsub
+        self._messages = pubsub.listen()
+
+    async def get(self) -> bytes:
+        async for message in self._messages:
+            if message["type"] == "message":
+                return message["data"]
+        raise ConnectionError("Subscription closed")
+
+    async def close(self) -> None:
+        await self.pubsub.aclose()
+
+
+class RedisPubSubBackend(PubSubBackend):
+    """Redis-protocol PUBLISH/SUBSCRIBE; reaches every worker on every host."""
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        await self.client.publish(channel, message)
+
+    async def subscribe(self, channel: str) -> Subscription:
+        pubsub = self.client.pubsub()
+        await pubsub.subscribe(channel)
+        return _RedisSubscription(pubsub)
+
+
+Handler = Callable[[list[str]], Union[None, Awaitable[None]]]
+
+
+class CacheInvalidator:
+    """
+    Keeps per-worker caches coherent across workers.
+
+    Each cache registers a handler under a name. After a write, the worker
+    that made it drops its own entries as before and calls `publish` with
+    the affected keys; every other worker subscribed to the channel then
+    runs the handler registered under that name. A worker ignores its own
+    messages. Broadcasting is best effort: when it fails, other workers
+    fall back on their caches' TTLs. After a lost subscription the caches
+    are cleared outright, since invalidations may have been missed.
+    """
+
+    def __init__(self, backend: Optional[PubSubBackend], channel: str = "inquest-auth:invalidate", retry_interval: float = 1):
+        self.backend = backend
+        self.channel = channel
+        self.retry_interval = retry_interval
+        self.origin = uuid.uuid4().hex
+        self._handlers: dict[str, tuple[Handler, Optional[Callable[[], None]]]] = {}
+        self._subscription: Optional[Subscription] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, handler: Handler, clear: Optional[Callable[[], None]] = None) -> None:
+        """
+        Register a cache.
+
+        Args:
+            name (str): The name its invalidations are published under.
+            handler (Handler): Drops the given keys; may be a coroutine function.
+            clear (Optional[Callable]): Drops everything, after a lost subscription.
+        """
+        self._handlers[name] = (handler, clear)
+
+    async def publish(self, name: str, keys: list[str]) -> None:
+        """
+        Tell the other workers to drop keys from a cache.
+
+        Args:
+            name (str): The name the cache registered under.
+            keys (list[str]): The keys to drop.
+        """
+        if self.backend is None or not keys:
+            return
+        try:
+            await self.backend.publish(self.channel, orjson.dumps({"origin": self.origin, "name": name, "keys": keys}))
+        except Exception:
+            logger.exception("Failed to broadcast a cache invalidation")
+
+    async def apply(self, message: bytes) -> None:
+        """Run the handler a message is addressed to, unless this worker sent it."""
+        payload = orjson.loads(message)
+        if payload["origin"] == self.origin or payload["name"] not in self._handlers:
+            return
+        handler, _ = self._handlers[payload["name"]]
+        result = handler(payload["keys"])
+        if inspect.isawaitable(result):
+            await result
+
+    def _clear_all(self) -> None:
+        for _, clear in self._handlers.values():
+            if clear is not None:
+                clear()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                if self._subscription is None:
+                    self._subscription = await self.backend.subscribe(self.channel)
+                    self._clear_all()
+                await self.apply(await self._subscription.get())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Cache invalidation subscription failed; resubscribing")
+                if self._subscription is not None:
+                    try:
+                        await self._subscription.close()
+                    except Exception:
+                        pass
+                    self._subscription = None
+                await asyncio.sleep(self.retry_interval)
+
+    async def start(self) -> None:
+        """Subscribe to the channel and apply invalidations from other workers."""
+        if self.backend is None or self._task is not None:
+            return
+        self._subscription = await self.backend.subscribe(self.channel)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._subscription is not None:
+            await self._subscription.close()
+            self._subscription = None
+
+
+def build_pubsub_backend(name: str) -> Optional[PubSubBackend]:
+    """
+    Create the configured pub/sub backend.
+
+    Args:
+        name (str): "memory", "redis" or "none".
+
+    Returns:
+        Optional[PubSubBackend]: The backend, or None when invalidations are not broadcast.
+    """
+    if name == "none":
+        return None
+    if name == "memory":
+        return InMemoryPubSubBackend()
+    if name == "redis":
+        return RedisPubSubBackend(create_redis_client(settings.REDIS_URL))
+    raise ValueError(f"Unknown cache invalidation backend '{name}'")
+
+
+# Shared by the user cache, the session near-cache and the revocation filter
+cache_invalidator = CacheInvalidator(
+    build_pubsub_backend(settings.CACHE_INVALIDATION_BACKEND),
+    channel=settings.CACHE_INVALIDATION_CHANNEL,
+)
@@ -0,0 +1,135 @@
+import json
+import os
+from dataclasses import dataclass
+from typing import Optional
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+from src.env.config import settings
+
+# Algorithms signed with a private key and verified with a published public key
+ASYMMETRIC_ALGORITHMS = {"RS256", "RS384", "RS512", "ES256", "ES384", "ES512"}
+
+
+@dataclass(frozen=True)
+class SigningKey:
+    kid: Optional[str]
+    algorithm: str
+    private_key: Key
+    public_key: Key
+
+
+class KeyRing:
+    """
+    The set of keys used to sign and verify access tokens.
+
+    With an HMAC algorithm the ring holds the shared SECRET_KEY. With an
+    asymmetric algorithm it holds every `<kid>.pem` private key found in
+    `keys_dir`: the active key signs new tokens, and all of them verify, so
+    a new key can be introduced and an old one retired without invalidating
+    tokens in flight. Keys are parsed once and the public JWKS document is
+    serialized up front.
+    """
+
+    def __init__(
+        self,
+        algorithm: str = "HS256",
+        secret_key: Optional[str] = None,
+        keys_dir: Optional[str] = None,
+        active_kid: Optional[str] = None,
+    ):
+        self.algorithm = algorithm
+        self.secret_key = secret_key
+        self.keys_dir = keys_dir
+        self.active_kid = active_kid
+        self.reload()
+
+    @classmethod
+    def from_settings(cls) -> "KeyRing":
+        return cls(
+            algorithm=settings.JWT_ALGORITHM,
+            secret_key=settings.SECRET_KEY,
+            keys_dir=settings.JWT_KEYS_DIR,
+            active_kid=settings.JWT_ACTIVE_KID,
+        )
+
+    @property
+    def is_asymmetric(self) -> bool:
+        return self.algorithm in ASYMMETRIC_ALGORITHMS
+
+    def reload(self) -> None:
+        """
+        (Re)load keys and rebuild the JWKS document, e.g. after a rotation.
+
+        Raises:
+            ValueError: If no usable key is configured or the active kid is unknown.
+        """
+        keys: dict[Optional[str], SigningKey] = {}
+        if self.is_asymmetric:
+            if not self.keys_dir or not os.path.isdir(self.keys_dir):
+                raise ValueError(f"JWT_KEYS_DIR must point to a directory of PEM keys for {self.algorithm}")
+            for filename in sorted(os.listdir(self.keys_dir)):
+                if not filename.endswith(".pem"):
+                    continue
+                kid = filename[: -len(".pem")]
+                with open(os.path.join(self.keys_dir, filename)) as pem_file:
+                    private_key = jwk.construct(pem_file.read(), self.algorithm)
+                keys[kid] = SigningKey(kid, self.algorithm, private_key, private_key.public_key())
+            if not keys:
+                raise ValueError(f"No .pem keys found in {self.keys_dir}")
+            active_kid = self.active_kid or list(keys)[-1]
+        else:
+            if not self.secret_key:
+                raise ValueError("SECRET_KEY must be set for HMAC-signed tokens")
+            hmac_key = jwk.construct(self.secret_key, self.algorithm)
+            keys[None] = SigningKey(None, self.algorithm, hmac_key, hmac_key)
+            active_kid = None
+
+        if active_kid not in keys:
+            raise ValueError(f"Active signing key '{active_kid}' not found")
+
+        self._keys = keys
+        self.signing_key = keys[active_kid]
+        self.jwks = {
+            "keys": [
+                {**key.public_key.to_dict(), "kid": key.kid, "use": "sig"}
+                for key in keys.values()
+                if self.is_asymmetric
+            ]
+        }
+        self.jwks_json = json.dumps(self.jwks, separators=(",", ":")).encode()
+
+    def sign(self, claims: dict) -> str:
+        """
+        Sign claims with the active key, stamping its `kid` into the header.
+
+        Args:
+            claims (dict): The claims to encode.
+
+        Returns:
+            str: The encoded JWT.
+        """
+        headers = {"kid": self.signing_key.kid} if self.signing_key.kid else None
+        return jwt.encode(claims, self.signing_key.private_key, algorithm=self.algorithm, headers=headers)
+
+    def verify(self, token: str) -> dict:
+        """
+        Verify a token against the key named by its `kid` header.
+
+        Args:
+            token (str): The encoded JWT.
+
+        Returns:
+            dict: The verified claims.
+
+        Raises:
+            JWTError: If the token is malformed, expired, badly signed or names an unknown key.
+        """
+        kid = jwt.get_unverified_header(token).get("kid") if self.is_asymmetric else None
+        key = self._keys.get(kid)
+        if key is None:
+            raise JWTError("Unknown signing key")
+        return jwt.decode(token, key.public_key, algorithms=[self.algorithm])
+
+
+# Shared key ring used to sign and verify access tokens
+key_ring = KeyRing.from_settings()
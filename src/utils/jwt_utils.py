@@ -1,6 +1,7 @@
+import uuid
 from datetime import datetime, timedelta, timezone
 from typing import Optional
-from jose import JWTError, jwt
+from jose import JWTError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from src.env.config import settings
@@ -8,6 +9,7 @@ from src.schemas.user_schema import UserResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from src.env.database import get_db
 from src.utils.common import get_user_by_email
+from src.utils.jwt_keys import key_ring
 
 # OAuth2PasswordBearer is used to extract the token from the Authorization header
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
@@ -29,8 +31,9 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.now(timezone.utc) + expires_delta
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
+    # A unique token id lets a single token be revoked before it expires
+    to_encode.update({"exp": expire, "jti": uuid.uuid4().hex})
+    encoded_jwt = key_ring.sign(to_encode)
     return encoded_jwt
 
 # Decode an access token to retrieve the username
@@ -45,7 +48,7 @@ def decode_access_token(token: str) -> Optional[str]:
         Optional[str]: The username if the token is valid, otherwise None.
     """
     try:
-        user = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+        user = key_ring.verify(token)
         return user
     except JWTError:
         return None
@@ -1,6 +1,96 @@
-from alembic.config import Config
+import os
+import zlib
 from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Fixed advisory lock key shared by every process migrating this database
+MIGRATION_LOCK_ID = zlib.crc32(b"inquest-auth:migrations")
+
+
+class SchemaOutOfDate(RuntimeError):
+    """Raised at startup when the database is not at the latest migration."""
+
+
+def alembic_config() -> Config:
+    """Load alembic.ini with paths resolved from the project root, not the working directory."""
+    alembic_cfg = Config(os.path.join(_ROOT, "alembic.ini"))
+    alembic_cfg.set_main_option("script_location", os.path.join(_ROOT, "alembic"))
+    return alembic_cfg
+
+
+def head_revisions(alembic_cfg: Config = None) -> set[str]:
+    """Return the head revision ids of the migration scripts (no database access)."""
+    return set(ScriptDirectory.from_config(alembic_cfg or alembic_config()).get_heads())
+
+
+def _current_revisions(connection: Connection) -> set[str]:
+    return set(MigrationContext.configure(connection).get_current_heads())
+
+
+async def current_revisions(engine: AsyncEngine) -> set[str]:
+    """Return the revision ids recorded in the database's alembic_version table."""
+    async with engine.connect() as conn:
+        return await conn.run_sync(_current_revisions)
+
+
+async def check_schema_version(engine: AsyncEngine) -> None:
+    """
+    Verify the database is at the latest migration.
+
+    This is one indexed read, cheap enough to run in every worker's lifespan.
+
+    Args:
+        engine (AsyncEngine): The engine to check.
+
+    Raises:
+        SchemaOutOfDate: If the recorded revision is not the scripts' head.
+    """
+    expected = head_revisions()
+    current = await current_revisions(engine)
+    if current != expected:
+        raise SchemaOutOfDate(
+            f"Database schema is at {', '.join(sorted(current)) or 'base'}, "
+            f"expected {', '.join(sorted(expected))}; run `python -m src.migrate upgrade`"
+        )
+
+
+def _upgrade(connection: Connection, alembic_cfg: Config, revision: str) -> None:
+    # alembic/env.py runs on this connection instead of opening its own
+    alembic_cfg.attributes["connection"] = connection
+    command.upgrade(alembic_cfg, revision)
+
+
+async def upgrade(engine: AsyncEngine, revision: str = "head") -> bool:
+    """
+    Upgrade the database, one process at a time.
+
+    On Postgres the upgrade runs inside a transaction holding an advisory
+    lock, so when several workers or deploy jobs start together the first
+    one migrates and the others block on the lock, then find the schema
+    already at head and return.
+
+    Args:
+        engine (AsyncEngine): The engine to migrate.
+        revision (str): The target revision.
 
-async def run_migrations():
-    alembic_cfg = Config("alembic.ini")
-    command.upgrade(alembic_cfg, "head")
\ No newline at end of file
+    Returns:
+        bool: True if migrations were applied, False if the schema was already at head.
+    """
+    alembic_cfg = alembic_config()
+    async with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            # Transaction-scoped, so it is released on commit or if this process dies
+            await conn.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID})
+        if revision == "head" and await conn.run_sync(_current_revisions) == head_revisions(alembic_cfg):
+            await conn.rollback()
+            return False
+        await conn.run_sync(_upgrade, alembic_cfg, revision)
+        await conn.commit()
+    return True
@@ -0,0 +1,128 @@
+import base64
+from typing import Callable, Iterable, Optional
+from fastapi import HTTPException, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from src.models.permission_model import Permission
+from src.models.role_model import Role, role_permissions, user_roles
+
+# Bit positions are part of the token format: never renumber them or reuse a retired bit.
+# The permissions table mirrors this catalogue (see the roles_and_permissions migration).
+PERMISSION_BITS: dict[str, int] = {
+    "users:read": 0,
+    "users:write": 1,
+    "users:import": 2,
+    "roles:manage": 3,
+    "tokens:introspect": 4,
+}
+
+
+class PermissionDenied(HTTPException):
+    """Raised when the caller's token lacks a required permission; surfaces to clients as 403."""
+
+    def __init__(self):
+        super().__init__(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
+
+
+def permission_mask(names: Iterable[str]) -> int:
+    """Build the bitmask for permission names from the catalogue; unknown names are ignored."""
+    mask = 0
+    for name in names:
+        bit = PERMISSION_BITS.get(name)
+        if bit is not None:
+            mask |= 1 << bit
+    return mask
+
+
+def permission_names(mask: int) -> list[str]:
+    """List the catalogue permissions whose bits are set in a mask."""
+    return [name for name, bit in PERMISSION_BITS.items() if mask >> bit & 1]
+
+
+def encode_permissions(mask: int) -> str:
+    """
+    Encode a permission bitmask for the `perm` token claim.
+
+    The mask is written little-endian and base64url-encoded without padding,
+    so a handful of permissions costs a couple of characters and the catalogue
+    can grow past JSON's safe integer range.
+
+    Args:
+        mask (int): The permission bitmask.
+
+    Returns:
+        str: The claim value ("" for no permissions).
+    """
+    if not mask:
+        return ""
+    raw = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_permissions(claim: Optional[str]) -> int:
+    """
+    Decode a `perm` claim back into its bitmask.
+
+    Args:
+        claim (Optional[str]): The claim value, or None if the token has none.
+
+    Returns:
+        int: The permission bitmask (0 for a missing or empty claim).
+    """
+    if not claim:
+        return 0
+    return int.from_bytes(base64.urlsafe_b64decode(claim + "=" * (-len(claim) % 4)), "little")
+
+
+async def load_user_authorization(user_id: int, db: AsyncSession) -> tuple[list[str], int]:
+    """
+    Load a user's role names and combined permission bitmask in one query.
+
+    Args:
+        user_id (int): The user's id.
+        db (AsyncSession): The database session.
+
+    Returns:
+        tuple[list[str], int]: The sorted role names and the permission bitmask.
+    """
+    result = await db.execute(
+        select(Role.name, Permission.bit)
+        .select_from(user_roles)
+        .join(Role, Role.id == user_roles.c.role_id)
+        .outerjoin(role_permissions, role_permissions.c.role_id == Role.id)
+        .outerjoin(Permission, Permission.id == role_permissions.c.permission_id)
+        .where(user_roles.c.user_id == user_id)
+    )
+    roles: set[str] = set()
+    mask = 0
+    for role_name, bit in result:
+        roles.add(role_name)
+        if bit is not None:
+            mask |= 1 << bit
+    return sorted(roles), mask
+
+
+def require_permission(name: str) -> Callable:
+    """
+    Build a dependency that requires a permission from the caller's token.
+
+    The permission's bit is looked up once, here; each request then tests it
+    against the bitmask AuthMiddleware decoded from the token, with no
+    database access.
+
+    Args:
+        name (str): A permission from PERMISSION_BITS.
+
+    Returns:
+        Callable: A FastAPI dependency raising PermissionDenied when the bit is not set.
+
+    Raises:
+        KeyError: If the permission is not in the catalogue (caught at import time).
+    """
+    flag = 1 << PERMISSION_BITS[name]
+
+    async def check_permission(request: Request) -> None:
+        if not getattr(request.state, "permissions", 0) & flag:
+            raise PermissionDenied()
+
+    return check_permission
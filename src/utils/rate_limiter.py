@@ -0,0 +1,185 @@
+from abc import ABC, abstractmethod
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from fastapi import HTTPException, Request, status
+from src.env.config import settings
+from src.utils.redis_client import create_redis_client
+
+
+class RateLimitExceeded(HTTPException):
+    """Raised when a caller is over its limit; surfaces to clients as 429 with Retry-After."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, please retry later",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+def sliding_window_retry_after(previous: int, current: int, elapsed: float, limit: int, window: float) -> float:
+    """
+    Evaluate a sliding-window counter.
+
+    The rate is estimated as the current fixed window's count plus the
+    previous window's count weighted by how much of it still overlaps the
+    sliding window. This needs two counters per key instead of a log of
+    every attempt.
+
+    Args:
+        previous (int): Attempts counted in the previous fixed window.
+        current (int): Attempts counted so far in the current fixed window, including this one.
+        elapsed (float): Seconds since the current fixed window started.
+        limit (int): Attempts allowed per window.
+        window (float): Window length in seconds.
+
+    Returns:
+        float: 0 if the attempt is allowed, otherwise seconds until it would be.
+    """
+    estimate = previous * (1 - elapsed / window) + current
+    if estimate <= limit:
+        return 0
+    if current > limit:
+        # Even with the previous window fully aged out this window is over; wait for the next one
+        return window - elapsed
+    # Wait until enough of the previous window has slid out
+    return window * (1 - (limit - current) / previous) - elapsed
+
+
+class RateLimitBackend(ABC):
+    """Counts attempts per key in fixed windows and applies the sliding-window estimate."""
+
+    @abstractmethod
+    async def hit(self, key: str, limit: int, window: float) -> float:
+        """
+        Record an attempt.
+
+        Returns:
+            float: 0 if the attempt is allowed, otherwise the seconds to wait.
+        """
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Per-process counters; each worker enforces its own share of the limit.
+
+    At most `max_keys` keys are tracked. Beyond that the least recently hit
+    key is forgotten, so spraying many distinct keys cannot reset the
+    counters of the keys under attack, which keep being hit.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._counters: OrderedDict[str, tuple[int, int, int]] = OrderedDict()  # key -> (window index, previous, current)
+
+    async def hit(self, key: str, limit: int, window: float) -> float:
+        now = time.time()
+        index = int(now // window)
+        stored_index, previous, current = self._counters.get(key, (index, 0, 0))
+        if stored_index != index:
+            previous = current if stored_index == index - 1 else 0
+            current = 0
+        current += 1
+
+        if key in self._counters:
+            self._counters.move_to_end(key)
+        elif len(self._counters) >= self.max_keys:
+            self._counters.popitem(last=False)
+        self._counters[key] = (index, previous, current)
+        return sliding_window_retry_after(previous, current, now - index * window, limit, window)
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """Counters shared by every worker through a Redis-protocol server."""
+
+    def __init__(self, client: Any, prefix: str = "rate-limit:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def hit(self, key: str, limit: int, window: float) -> float:
+        now = time.time()
+        index = int(now // window)
+        current_key = f"{self.prefix}{key}:{index}"
+        previous_key = f"{self.prefix}{key}:{index - 1}"
+
+        pipe = self.client.pipeline(transaction=False)
+        pipe.incr(current_key)
+        pipe.expire(current_key, math.ceil(window * 2))
+        pipe.get(previous_key)
+        current, _, previous = await pipe.execute()
+        return sliding_window_retry_after(int(previous or 0), int(current), now - index * window, limit, window)
+
+
+class LoginRateLimiter:
+    """Throttles login attempts per client IP and per target email."""
+
+    def __init__(self, backend: Optional[RateLimitBackend], ip_limit: int, email_limit: int, window: float):
+        self.backend = backend
+        self.ip_limit = ip_limit
+        self.email_limit = email_limit
+        self.window = window
+
+    async def check_ip(self, ip: Optional[str]) -> None:
+        """
+        Record a login attempt from an IP.
+
+        Raises:
+            RateLimitExceeded: If the IP is over its limit.
+        """
+        if self.backend is None or not ip:
+            return
+        await self._check(f"ip:{ip}", self.ip_limit)
+
+    async def check_email(self, email: str) -> None:
+        """
+        Record a login attempt against an email.
+
+        Raises:
+            RateLimitExceeded: If the email is over its limit.
+        """
+        if self.backend is None:
+            return
+        # Hashed so shared backends never hold raw addresses
+        digest = hashlib.sha256(email.strip().lower().encode()).hexdigest()
+        await self._check(f"email:{digest}", self.email_limit)
+
+    async def _check(self, key: str, limit: int) -> None:
+        retry_after = await self.backend.hit(key, limit, self.window)
+        if retry_after > 0:
+            raise RateLimitExceeded(retry_after)
+
+
+def build_rate_limit_backend(name: str) -> Optional[RateLimitBackend]:
+    """
+    Create the configured rate limit backend.
+
+    Args:
+        name (str): "memory", "redis" or "none".
+
+    Returns:
+        Optional[RateLimitBackend]: The backend, or None when limiting is disabled.
+    """
+    if name == "none":
+        return None
+    if name == "memory":
+        return InMemoryRateLimitBackend()
+    if name == "redis":
+        return RedisRateLimitBackend(create_redis_client(settings.REDIS_URL))
+    raise ValueError(f"Unknown rate limit backend '{name}'")
+
+
+# Shared login throttle used by auth_controller
+login_rate_limiter = LoginRateLimiter(
+    build_rate_limit_backend(settings.LOGIN_RATE_LIMIT_BACKEND),
+    ip_limit=settings.LOGIN_RATE_LIMIT_PER_IP,
+    email_limit=settings.LOGIN_RATE_LIMIT_PER_EMAIL,
+    window=settings.LOGIN_RATE_LIMIT_WINDOW,
+)
+
+
+async def limit_login_by_ip(request: Request) -> None:
+    # Dependency for /auth/login; runs before the body is parsed or the database is touched
+    await login_rate_limiter.check_ip(request.client.host if request.client else None)
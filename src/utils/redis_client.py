@@ -0,0 +1,26 @@
+from typing import Any
+
+
+def create_redis_client(url: str) -> Any:
+    """
+    Create an asyncio Redis client for a Redis-protocol server.
+
+    `redis` is an optional dependency; it is only needed when a Redis-backed
+    component is configured.
+
+    Args:
+        url (str): The server URL, e.g. redis://localhost:6379/0.
+
+    Returns:
+        redis.asyncio.Redis: The client.
+
+    Raises:
+        RuntimeError: If the redis package is not installed or no URL is set.
+    """
+    try:
+        import redis.asyncio as redis
+    except ImportError as e:
+        raise RuntimeError("The redis package is required for Redis-backed caches: pip install redis") from e
+    if not url:
+        raise RuntimeError("REDIS_URL must be set to use a Redis-backed cache")
+    return redis.from_url(url)
@@ -0,0 +1,48 @@
+from functools import lru_cache
+from typing import Any, Optional
+import orjson
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel
+
+
+class ModelResponse(ORJSONResponse):
+    """
+    JSON response that serializes a Pydantic model exactly once.
+
+    Handlers return `ModelResponse(envelope)` instead of the bare model, so
+    FastAPI does not dump, re-validate and re-encode it against the route's
+    response_model (which is still used for the OpenAPI schema). Models are
+    rendered by pydantic-core; anything else goes through orjson.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json().encode()
+        return super().render(content)
+
+
+@lru_cache(maxsize=128)
+def error_body(message: str) -> bytes:
+    """
+    Serialized `{"error": true, "message": ..., "data": null}` envelope.
+
+    The handful of error messages the service sends over and over are
+    rendered once and reused.
+
+    Args:
+        message (str): The error message.
+
+    Returns:
+        bytes: The JSON body.
+    """
+    return orjson.dumps({"error": True, "message": message, "data": None})
+
+
+def error_response(status_code: int, message: str, headers: Optional[dict] = None) -> Response:
+    """Build an error envelope response from a pre-serialized body."""
+    return Response(
+        content=error_body(message),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
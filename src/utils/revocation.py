@@ -0,0 +1,299 @@
+from abc import ABC, abstractmethod
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
+from sqlalchemy import and_, delete, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.future import select
+from src.env.config import settings
+from src.env.database import SessionLocal
+from src.models.revoked_token_model import RevokedToken
+from src.utils.bloom_filter import BloomFilter
+from src.utils.invalidation import CacheInvalidator, cache_invalidator
+
+logger = logging.getLogger(__name__)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; Postgres returns aware ones
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class RevocationBackend(ABC):
+    """
+    Authoritative store of revoked token ids (`jti`).
+
+    Besides point lookups a backend exposes a change feed: `changes_since`
+    returns revocations added after a cursor, which lets every worker keep
+    its local filter current without rescanning the whole store. Cursors
+    are opaque to callers; None reads the feed from the start. A backend
+    may return some revocations again on later calls.
+    """
+
+    @abstractmethod
+    async def revoke(self, jti: str, expires_at: datetime) -> None:
+        """Record a revoked token id until its token expires."""
+
+    @abstractmethod
+    async def is_revoked(self, jti: str) -> bool:
+        """Return whether a token id has been revoked."""
+
+    @abstractmethod
+    async def changes_since(self, cursor: Any) -> tuple[list[tuple[str, datetime]], Any]:
+        """Return the revocations after a cursor, and the cursor to resume from."""
+
+    async def purge_expired(self) -> None:
+        """Forget revocations whose tokens have expired anyway."""
+
+
+class InMemoryRevocationBackend(RevocationBackend):
+    """Process-local stand-in for a shared backend (tests, single worker)."""
+
+    def __init__(self):
+        # Sequence number -> revocation; the sequence is the change-feed cursor
+        self._log: dict[int, tuple[str, datetime]] = {}
+        self._sequence = 0
+        self._revoked: dict[str, datetime] = {}
+
+    async def revoke(self, jti: str, expires_at: datetime) -> None:
+        if jti not in self._revoked:
+            self._revoked[jti] = expires_at
+            self._sequence += 1
+            self._log[self._sequence] = (jti, expires_at)
+
+    async def is_revoked(self, jti: str) -> bool:
+        expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > datetime.now(timezone.utc)
+
+    async def changes_since(self, cursor: Optional[int]) -> tuple[list[tuple[str, datetime]], Optional[int]]:
+        changes = [(sequence, entry) for sequence, entry in self._log.items() if sequence > (cursor or 0)]
+        if not changes:
+            return [], cursor
+        return [entry for _, entry in changes], changes[-1][0]
+
+    async def purge_expired(self) -> None:
+        now = datetime.now(timezone.utc)
+        self._log = {sequence: entry for sequence, entry in self._log.items() if entry[1] > now}
+        self._revoked = {jti: expires_at for jti, expires_at in self._revoked.items() if expires_at > now}
+
+
+class DatabaseRevocationBackend(RevocationBackend):
+    """
+    The `revoked_tokens` table.
+
+    The change feed walks rows in (revoked_at, id) order. Neither the serial
+    id nor revoked_at follows commit order: a revocation whose transaction
+    started earlier can become visible after later ones were read. So the
+    cursor only moves past rows revoked more than `overlap` seconds ago,
+    and newer rows are returned again on every call until they are. The
+    overlap must exceed the longest revoke transaction plus the clock skew
+    between the database and the workers.
+    """
+
+    def __init__(self, batch_size: int = 1000, overlap: float = 30):
+        self.batch_size = batch_size
+        self.overlap = overlap
+
+    async def revoke(self, jti: str, expires_at: datetime) -> None:
+        async with SessionLocal() as db:
+            db.add(RevokedToken(jti=jti, expires_at=expires_at))
+            try:
+                await db.commit()
+            except IntegrityError:
+                # Already revoked, possibly by a concurrent request for the same token
+                await db.rollback()
+
+    async def is_revoked(self, jti: str) -> bool:
+        async with SessionLocal() as db:
+            expires_at = await db.scalar(select(RevokedToken.expires_at).where(RevokedToken.jti == jti))
+        return expires_at is not None and _as_utc(expires_at) > datetime.now(timezone.utc)
+
+    async def changes_since(self, cursor: Optional[tuple[datetime, int]]) -> tuple[list[tuple[str, datetime]], Optional[tuple[datetime, int]]]:
+        query = (
+            select(RevokedToken.id, RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at)
+            .order_by(RevokedToken.revoked_at, RevokedToken.id)
+            .limit(self.batch_size)
+        )
+        if cursor is not None:
+            revoked_at, row_id = cursor
+            query = query.where(or_(
+                RevokedToken.revoked_at > revoked_at,
+                and_(RevokedToken.revoked_at == revoked_at, RevokedToken.id > row_id),
+            ))
+        # Taken before the query, so every row revoked before it had committed by the time the query runs
+        settled_before = datetime.now(timezone.utc) - timedelta(seconds=self.overlap)
+        async with SessionLocal() as db:
+            rows = (await db.execute(query)).all()
+        for row_id, _, _, revoked_at in rows:
+            if _as_utc(revoked_at) > settled_before:
+                break
+            cursor = (revoked_at, row_id)
+        return [(jti, _as_utc(expires_at)) for _, jti, expires_at, _ in rows], cursor
+
+    async def purge_expired(self) -> None:
+        async with SessionLocal() as db:
+            await db.execute(delete(RevokedToken).where(RevokedToken.expires_at <= datetime.now(timezone.utc)))
+            await db.commit()
+
+
+class RevocationList:
+    """
+    Revocation checks with an in-process Bloom filter in front of the backend.
+
+    Almost every token is not revoked, and for those the filter answers
+    "definitely not" without I/O. Only probable hits are confirmed against
+    the backend. The filter follows the backend's change feed every
+    `sync_interval` seconds, so a revocation made by another worker takes
+    effect here within that interval, or as soon as its broadcast arrives
+    when an `invalidator` is set; revocations made by this worker take
+    effect immediately.
+    """
+
+    def __init__(
+        self,
+        backend: RevocationBackend,
+        capacity: int = 100000,
+        error_rate: float = 0.001,
+        sync_interval: float = 5,
+        invalidator: Optional[CacheInvalidator] = None,
+    ):
+        self.backend = backend
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_interval = sync_interval
+        self._filter = BloomFilter(capacity, error_rate)
+        self._cursor: Any = None
+        # Set while a replacement filter is being built: ids added meanwhile, to copy into it
+        self._added_during_rebuild: Optional[list[str]] = None
+        self._task: Optional[asyncio.Task] = None
+        self.invalidator = invalidator
+        if invalidator is not None:
+            # Missed broadcasts are caught up by the change feed, so nothing to clear
+            invalidator.register("revocation", self._add_to_filter)
+
+    def might_be_revoked(self, jti: str) -> bool:
+        return jti in self._filter
+
+    async def is_revoked(self, jti: str) -> bool:
+        """
+        Check a token id, consulting the backend only on a filter hit.
+
+        Args:
+            jti (str): The token's `jti` claim.
+
+        Returns:
+            bool: True if the token has been revoked.
+        """
+        if jti not in self._filter:
+            return False
+        return await self.backend.is_revoked(jti)
+
+    async def revoke(self, jti: str, expires_at: datetime) -> None:
+        """
+        Revoke a token until it would have expired.
+
+        Args:
+            jti (str): The token's `jti` claim.
+            expires_at (datetime): The token's expiry; the record is useless afterwards.
+        """
+        await self.backend.revoke(jti, expires_at)
+        self._add(jti)
+        if self.invalidator is not None:
+            await self.invalidator.publish("revocation", [jti])
+
+    def _add(self, jti: str) -> None:
+        self._filter.add(jti)
+        if self._added_during_rebuild is not None:
+            self._added_during_rebuild.append(jti)
+
+    def _add_to_filter(self, jtis: list[str]) -> None:
+        for jti in jtis:
+            self._add(jti)
+
+    async def _read_feed(self, bloom: BloomFilter, cursor: Any) -> Any:
+        now = datetime.now(timezone.utc)
+        while True:
+            changes, next_cursor = await self.backend.changes_since(cursor)
+            for jti, expires_at in changes:
+                if expires_at > now:
+                    bloom.add(jti)
+            # Repeated changes are harmless: adding an id twice leaves the filter as it was
+            if not changes or next_cursor == cursor:
+                return next_cursor
+            cursor = next_cursor
+
+    async def sync(self) -> None:
+        """Apply new revocations from the change feed, rebuilding the filter once it is over capacity."""
+        if self._filter.is_saturated:
+            await self._rebuild()
+        else:
+            self._cursor = await self._read_feed(self._filter, self._cursor)
+
+    async def _rebuild(self) -> None:
+        # The current filter keeps answering until the replacement has read the whole feed,
+        # so no revoked token slips through a half-built filter
+        self._added_during_rebuild = []
+        try:
+            await self.backend.purge_expired()
+            bloom = BloomFilter(self.capacity, self.error_rate)
+            cursor = await self._read_feed(bloom, None)
+            for jti in self._added_during_rebuild:
+                bloom.add(jti)
+        finally:
+            self._added_during_rebuild = None
+        self._filter, self._cursor = bloom, cursor
+        if bloom.is_saturated:
+            # More live revocations than the filter holds; grow it rather than rebuilding every sync
+            self.capacity *= 2
+            logger.warning("Revocation filter over capacity after a rebuild; growing it to %d", self.capacity)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+            except Exception:
+                logger.exception("Failed to refresh the revocation filter")
+
+    async def start(self) -> None:
+        """Load the current revocations and keep following the change feed."""
+        await self.sync()
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def build_revocation_backend(name: str) -> RevocationBackend:
+    """
+    Create the configured revocation backend.
+
+    Args:
+        name (str): "database" for the revoked_tokens table or "memory" for the in-process stand-in.
+
+    Returns:
+        RevocationBackend: The backend instance.
+    """
+    if name == "memory":
+        return InMemoryRevocationBackend()
+    if name == "database":
+        return DatabaseRevocationBackend(overlap=settings.REVOCATION_FEED_OVERLAP)
+    raise ValueError(f"Unknown revocation backend '{name}'")
+
+
+# Shared revocation list checked by AuthMiddleware
+revocation_list = RevocationList(
+    build_revocation_backend(settings.REVOCATION_BACKEND),
+    capacity=settings.REVOCATION_FILTER_CAPACITY,
+    error_rate=settings.REVOCATION_FILTER_ERROR_RATE,
+    sync_interval=settings.REVOCATION_SYNC_INTERVAL,
+    invalidator=cache_invalidator,
+)
@@ -0,0 +1,359 @@
+from abc import ABC, abstractmethod
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import secrets
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, NamedTuple, Optional
+from sqlalchemy import bindparam, delete, update
+from sqlalchemy.future import select
+from src.env.config import settings
+from src.env.database import SessionLocal
+from src.models.session_model import UserSession
+from src.utils.invalidation import CacheInvalidator, cache_invalidator
+from src.utils.redis_client import create_redis_client
+from src.utils.token_cache import TokenCache
+
+logger = logging.getLogger(__name__)
+
+
+class SessionRecord(NamedTuple):
+    """A stored session; times are Unix timestamps."""
+    claims: dict
+    expires_at: float
+    max_expires_at: float
+
+
+# secrets.token_urlsafe(32): 43 base64url characters
+_HANDLE_PATTERN = re.compile(r"[A-Za-z0-9_-]{43}")
+
+
+def is_session_handle(token: str) -> bool:
+    # Only well-formed handles in opaque mode reach the store, so junk bearer tokens cost no I/O
+    return settings.TOKEN_MODE == "opaque" and _HANDLE_PATTERN.fullmatch(token) is not None
+
+
+def hash_session_handle(handle: str) -> str:
+    return hashlib.sha256(handle.encode()).hexdigest()
+
+
+def _timestamp(value: datetime) -> float:
+    # SQLite hands back naive datetimes; Postgres returns aware ones
+    return (value if value.tzinfo else value.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def _datetime(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+
+class SessionBackend(ABC):
+    """Stores session records keyed by the SHA-256 of their handle."""
+
+    @abstractmethod
+    async def create(self, key: str, record: SessionRecord) -> None:
+        """Store a new session."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[SessionRecord]:
+        """Return a session, or None if it is unknown or expired."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> bool:
+        """Remove a session; returns whether it existed."""
+
+    @abstractmethod
+    async def touch_many(self, expiries: dict[str, float]) -> None:
+        """Push the sliding expiry of several sessions forward in one round trip."""
+
+    async def purge_expired(self) -> None:
+        pass
+
+
+class InMemorySessionBackend(SessionBackend):
+    """Per-process sessions; only suitable for a single worker."""
+
+    def __init__(self, maxsize: int = 100000):
+        self.maxsize = maxsize
+        self._records: OrderedDict[str, SessionRecord] = OrderedDict()
+
+    async def create(self, key: str, record: SessionRecord) -> None:
+        self._records[key] = record
+        while len(self._records) > self.maxsize:
+            self._records.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[SessionRecord]:
+        record = self._records.get(key)
+        if record is not None and record.expires_at <= time.time():
+            del self._records[key]
+            return None
+        return record
+
+    async def delete(self, key: str) -> bool:
+        return self._records.pop(key, None) is not None
+
+    async def touch_many(self, expiries: dict[str, float]) -> None:
+        for key, expires_at in expiries.items():
+            record = self._records.get(key)
+            if record is not None:
+                self._records[key] = record._replace(expires_at=expires_at)
+
+    async def purge_expired(self) -> None:
+        now = time.time()
+        for key in [key for key, record in self._records.items() if record.expires_at <= now]:
+            del self._records[key]
+
+
+class DatabaseSessionBackend(SessionBackend):
+    """The `sessions` table."""
+
+    async def create(self, key: str, record: SessionRecord) -> None:
+        async with SessionLocal() as db:
+            db.add(UserSession(
+                token_hash=key,
+                user_id=record.claims["id"],
+                claims=json.dumps(record.claims),
+                expires_at=_datetime(record.expires_at),
+                max_expires_at=_datetime(record.max_expires_at),
+            ))
+            await db.commit()
+
+    async def get(self, key: str) -> Optional[SessionRecord]:
+        async with SessionLocal() as db:
+            row = (await db.execute(
+                select(UserSession.claims, UserSession.expires_at, UserSession.max_expires_at)
+                .where(UserSession.token_hash == key)
+            )).first()
+        if row is None:
+            return None
+        claims, expires_at, max_expires_at = row
+        return SessionRecord(json.loads(claims), _timestamp(expires_at), _timestamp(max_expires_at))
+
+    async def delete(self, key: str) -> bool:
+        async with SessionLocal() as db:
+            result = await db.execute(delete(UserSession).where(UserSession.token_hash == key))
+            await db.commit()
+        return result.rowcount > 0
+
+    async def touch_many(self, expiries: dict[str, float]) -> None:
+        # One executemany UPDATE for the whole batch
+        statement = (
+            update(UserSession.__table__)
+            .where(UserSession.token_hash == bindparam("b_key"))
+            .values(expires_at=bindparam("b_expires_at"))
+        )
+        async with SessionLocal() as db:
+            await db.execute(statement, [
+                {"b_key": key, "b_expires_at": _datetime(expires_at)} for key, expires_at in expiries.items()
+            ])
+            await db.commit()
+
+    async def purge_expired(self) -> None:
+        async with SessionLocal() as db:
+            await db.execute(delete(UserSession).where(UserSession.expires_at <= datetime.now(timezone.utc)))
+            await db.commit()
+
+
+class RedisSessionBackend(SessionBackend):
+    """Sessions shared by every worker through a Redis-protocol server; key TTLs carry the sliding expiry."""
+
+    def __init__(self, client: Any, prefix: str = "session:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def create(self, key: str, record: SessionRecord) -> None:
+        value = json.dumps({"claims": record.claims, "max_expires_at": record.max_expires_at})
+        await self.client.set(self.prefix + key, value, px=max(1, int((record.expires_at - time.time()) * 1000)))
+
+    async def get(self, key: str) -> Optional[SessionRecord]:
+        pipe = self.client.pipeline(transaction=False)
+        pipe.get(self.prefix + key)
+        pipe.pttl(self.prefix + key)
+        value, ttl_ms = await pipe.execute()
+        if value is None or ttl_ms <= 0:
+            return None
+        stored = json.loads(value)
+        return SessionRecord(stored["claims"], time.time() + ttl_ms / 1000, stored["max_expires_at"])
+
+    async def delete(self, key: str) -> bool:
+        return await self.client.delete(self.prefix + key) > 0
+
+    async def touch_many(self, expiries: dict[str, float]) -> None:
+        pipe = self.client.pipeline(transaction=False)
+        for key, expires_at in expiries.items():
+            pipe.pexpireat(self.prefix + key, int(expires_at * 1000))
+        await pipe.execute()
+
+
+class SessionStore:
+    """
+    Opaque access tokens backed by a session store.
+
+    Handles are random and carry no data; the claims a JWT would hold live in
+    the backend. Each worker keeps resolved sessions in a near-cache for
+    `near_cache_ttl` seconds, so hot sessions cost no I/O. Revocations made by
+    this worker apply immediately; with an `invalidator` they reach the other
+    workers' near-caches as soon as the broadcast arrives, otherwise once the
+    entry lapses.
+
+    Expiry slides by `idle_timeout` on use, capped at `max_lifetime` from
+    login. The new expiry is only recorded locally and written back in one
+    batch every `touch_interval` seconds, and only once it has moved by at
+    least that much, so steady traffic does not turn reads into writes.
+    """
+
+    def __init__(
+        self,
+        backend: SessionBackend,
+        idle_timeout: float = 3600,
+        max_lifetime: float = 86400,
+        near_cache_ttl: float = 5,
+        near_cache_size: int = 10000,
+        touch_interval: float = 30,
+        invalidator: Optional[CacheInvalidator] = None,
+    ):
+        self.backend = backend
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.touch_interval = touch_interval
+        self.near_cache = TokenCache(maxsize=near_cache_size, ttl=near_cache_ttl)
+        self._touches: dict[str, float] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.invalidator = invalidator
+        if invalidator is not None:
+            invalidator.register("session-cache", self.near_cache.discard, self.near_cache.clear)
+
+    async def create(self, claims: dict) -> str:
+        """
+        Start a session.
+
+        Args:
+            claims (dict): The identity and authorization claims to attach.
+
+        Returns:
+            str: The opaque handle to hand to the client.
+        """
+        handle = secrets.token_urlsafe(32)
+        now = time.time()
+        await self.backend.create(
+            hash_session_handle(handle),
+            SessionRecord(claims, now + self.idle_timeout, now + self.max_lifetime),
+        )
+        return handle
+
+    async def resolve(self, handle: str, touch: bool = True) -> Optional[SessionRecord]:
+        """
+        Look up a live session.
+
+        Args:
+            handle (str): The opaque handle.
+            touch (bool): Whether this use slides the expiry (False for introspection).
+
+        Returns:
+            Optional[SessionRecord]: The session, or None if unknown, expired or revoked.
+        """
+        now = time.time()
+        record = self.near_cache.get(handle)
+        cached = record is not None
+        if not cached:
+            record = await self.backend.get(hash_session_handle(handle))
+            if record is None:
+                return None
+        if record.expires_at <= now:
+            self.near_cache.invalidate(handle)
+            return None
+
+        if touch:
+            extended = min(now + self.idle_timeout, record.max_expires_at)
+            if extended - record.expires_at >= self.touch_interval:
+                self._touches[hash_session_handle(handle)] = extended
+                record = record._replace(expires_at=extended)
+                cached = False
+        if not cached:
+            # Re-caching only on a load or a touch, so hot entries still lapse and get re-read
+            self.near_cache.set(handle, record, exp=record.expires_at)
+        return record
+
+    async def revoke(self, handle: str) -> bool:
+        """
+        End a session.
+
+        Args:
+            handle (str): The opaque handle.
+
+        Returns:
+            bool: True if the session existed.
+        """
+        self.near_cache.invalidate(handle)
+        key = hash_session_handle(handle)
+        self._touches.pop(key, None)
+        existed = await self.backend.delete(key)
+        if self.invalidator is not None:
+            await self.invalidator.publish("session-cache", [TokenCache.digest(handle)])
+        return existed
+
+    async def flush(self) -> None:
+        """Write pending expiry extensions to the backend in one batch."""
+        if not self._touches:
+            return
+        touches, self._touches = self._touches, {}
+        await self.backend.touch_many(touches)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.touch_interval)
+            try:
+                await self.flush()
+                await self.backend.purge_expired()
+            except Exception:
+                logger.exception("Failed to write back session expiries")
+
+    async def start(self) -> None:
+        """Start the periodic write-back of sliding expiries."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the write-back task and flush what is still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+def build_session_backend(name: str) -> SessionBackend:
+    """
+    Create the configured session backend.
+
+    Args:
+        name (str): "database", "redis" or "memory".
+
+    Returns:
+        SessionBackend: The backend instance.
+    """
+    if name == "memory":
+        return InMemorySessionBackend()
+    if name == "database":
+        return DatabaseSessionBackend()
+    if name == "redis":
+        return RedisSessionBackend(create_redis_client(settings.REDIS_URL))
+    raise ValueError(f"Unknown session store backend '{name}'")
+
+
+# Shared session store for TOKEN_MODE=opaque, used by AuthService and AuthMiddleware
+session_store = SessionStore(
+    build_session_backend(settings.SESSION_STORE_BACKEND),
+    idle_timeout=settings.SESSION_IDLE_TIMEOUT,
+    max_lifetime=settings.SESSION_MAX_LIFETIME,
+    near_cache_ttl=settings.SESSION_NEAR_CACHE_TTL,
+    near_cache_size=settings.SESSION_NEAR_CACHE_SIZE,
+    touch_interval=settings.SESSION_TOUCH_INTERVAL,
+    invalidator=cache_invalidator,
+)
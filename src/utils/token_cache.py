@@ -0,0 +1,97 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from src.env.config import settings
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of verified token claims.
+
+    Entries are keyed by a SHA-256 digest of the token (raw tokens are never
+    kept as keys) and expire after `ttl` seconds or at the token's own `exp`,
+    whichever comes first. Hit and miss counters are kept for monitoring.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, tuple[float, Any]] = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Any]:
+        """
+        Return the cached value for a token, or None on a miss or expired entry.
+
+        Args:
+            token (str): The raw bearer token.
+
+        Returns:
+            Optional[Any]: The cached value if present and still valid.
+        """
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def set(self, token: str, value: Any, exp: Optional[float] = None) -> None:
+        """
+        Cache a value for a token.
+
+        Args:
+            token (str): The raw bearer token.
+            value (Any): The value to cache, typically the validated user.
+            exp (Optional[float]): The token's `exp` claim as a Unix timestamp.
+        """
+        expires_at = time.time() + self.ttl
+        if exp is not None:
+            expires_at = min(expires_at, float(exp))
+        if expires_at <= time.time() or self.maxsize <= 0:
+            return
+
+        key = self._key(token)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def digest(token: str) -> str:
+        """Return the hex digest a token is keyed by, safe to share with other workers."""
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def invalidate(self, token: str) -> None:
+        """Drop a single token from the cache."""
+        self._entries.pop(self._key(token), None)
+
+    def discard(self, digests: list[str]) -> None:
+        """Drop entries by the hex digests `digest` returns."""
+        for digest in digests:
+            self._entries.pop(bytes.fromhex(digest), None)
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> dict:
+        """Return the current size and hit/miss counters."""
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Shared cache of decoded access tokens used by AuthMiddleware
+token_cache = TokenCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL)
@@ -0,0 +1,285 @@
+from abc import ABC, abstractmethod
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Optional
+from src.env.config import settings
+from src.utils.invalidation import CacheInvalidator, cache_invalidator
+from src.utils.redis_client import create_redis_client
+
+# Stored for ids/emails that do not exist, so enumeration traffic stays off the database
+_MISSING = "null"
+
+
+class CacheBackend(ABC):
+    """Key/value store holding serialized user records."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """Return the value stored under a key, or None."""
+
+    async def get_many(self, keys: list[str]) -> list[Optional[str]]:
+        return [await self.get(key) for key in keys]
+
+    @abstractmethod
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        """Store a value for `ttl` seconds."""
+
+    @abstractmethod
+    async def delete(self, *keys: str) -> None:
+        """Remove keys; unknown keys are ignored."""
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Per-process LRU with per-entry expiry."""
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class RedisCacheBackend(CacheBackend):
+    """Cache shared by every worker through a Redis-protocol server."""
+
+    def __init__(self, client: Any, prefix: str = "user-cache:"):
+        self.client = client
+        self.prefix = prefix
+
+    async def get(self, key: str) -> Optional[str]:
+        value = await self.client.get(self.prefix + key)
+        return value.decode() if isinstance(value, bytes) else value
+
+    async def get_many(self, keys: list[str]) -> list[Optional[str]]:
+        values = await self.client.mget([self.prefix + key for key in keys]) if keys else []
+        return [value.decode() if isinstance(value, bytes) else value for value in values]
+
+    async def set(self, key: str, value: str, ttl: float) -> None:
+        await self.client.set(self.prefix + key, value, px=int(ttl * 1000))
+
+    async def delete(self, *keys: str) -> None:
+        if keys:
+            await self.client.delete(*(self.prefix + key for key in keys))
+
+
+class UserCache:
+    """
+    Read-through cache of user records keyed by id and by email.
+
+    Lookups for unknown users are cached too (for a shorter time). Concurrent
+    misses for the same key are coalesced, so a burst of requests for one user
+    runs a single query. Writers must call `invalidate` after changing a user;
+    with an `invalidator`, other workers' per-process copies are dropped too.
+    A load that was already running when `invalidate` was called returns its
+    result to its callers but does not cache it, since it may predate the write.
+    With no backend every lookup goes straight to the loader.
+
+    Password hashes are only cached by the in-process backend; a shared
+    backend such as Redis stores records without them, so callers that
+    need the hash (logins) bypass it and only the in-process backend speeds
+    them up.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend],
+        ttl: float = 60,
+        negative_ttl: float = 10,
+        invalidator: Optional[CacheInvalidator] = None,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.invalidator = invalidator if backend is not None else None
+        self.cache_password_hashes = isinstance(backend, InMemoryCacheBackend)
+        self._inflight: dict[str, asyncio.Future] = {}
+        # Bumped by every invalidation; loads that started under an older epoch are not stored
+        self._epoch = 0
+        if self.invalidator is not None:
+            clear = backend.clear if isinstance(backend, InMemoryCacheBackend) else None
+            self.invalidator.register("user-cache", self._drop, clear)
+
+    @staticmethod
+    def _id_key(user_id: int) -> str:
+        return f"id:{user_id}"
+
+    @staticmethod
+    def _email_key(email: str) -> str:
+        return f"email:{email}"
+
+    async def get_by_id(self, user_id: int, loader: Callable[[], Awaitable[Optional[dict]]]) -> Optional[dict]:
+        return await self._get(self._id_key(user_id), loader)
+
+    async def get_by_email(self, email: str, loader: Callable[[], Awaitable[Optional[dict]]]) -> Optional[dict]:
+        return await self._get(self._email_key(email), loader)
+
+    async def get_many_by_id(
+        self,
+        user_ids: list[int],
+        loader: Callable[[list[int]], Awaitable[dict[int, dict]]],
+    ) -> dict[int, dict]:
+        """
+        Look up several users, loading every miss with one call to `loader`.
+
+        Args:
+            user_ids (list[int]): The ids to look up.
+            loader (Callable): Loads the missing ids, returning the found records by id.
+
+        Returns:
+            dict[int, dict]: The found records by id; unknown ids are left out.
+        """
+        if self.backend is None:
+            return await loader(user_ids)
+
+        found: dict[int, dict] = {}
+        missing: list[int] = []
+        cached = await self.backend.get_many([self._id_key(user_id) for user_id in user_ids])
+        for user_id, value in zip(user_ids, cached):
+            if value is None:
+                missing.append(user_id)
+            elif value != _MISSING:
+                found[user_id] = json.loads(value)
+
+        if missing:
+            epoch = self._epoch
+            loaded = await loader(missing)
+            if self._epoch == epoch:
+                for user_id in missing:
+                    await self._store(self._id_key(user_id), loaded.get(user_id))
+            found.update(loaded)
+        return found
+
+    async def _get(self, key: str, loader: Callable[[], Awaitable[Optional[dict]]]) -> Optional[dict]:
+        if self.backend is None:
+            return await loader()
+
+        cached = await self.backend.get(key)
+        if cached is not None:
+            return json.loads(cached)
+
+        # Single flight: followers wait for the query already running for this key
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        epoch = self._epoch
+        try:
+            record = await loader()
+            if self._epoch == epoch:
+                await self._store(key, record)
+            future.set_result(record)
+            return record
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Followers see the error; mark it retrieved so an unobserved failure is not logged
+            future.exception()
+            raise
+        finally:
+            # An invalidation may already have detached this load
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    async def _store(self, key: str, record: Optional[dict]) -> None:
+        if record is None:
+            await self.backend.set(key, _MISSING, self.negative_ttl)
+            return
+        if not self.cache_password_hashes:
+            record = {field: value for field, value in record.items() if field != "hashed_password"}
+        value = json.dumps(record)
+        await self.backend.set(self._id_key(record["id"]), value, self.ttl)
+        await self.backend.set(self._email_key(record["email"]), value, self.ttl)
+
+    async def _drop(self, keys: list[str]) -> None:
+        # New lookups start a fresh load instead of joining one that may predate the write
+        self._epoch += 1
+        for key in keys:
+            self._inflight.pop(key, None)
+        await self.backend.delete(*keys)
+
+    async def invalidate(self, user_id: Optional[int] = None, email: Optional[str] = None) -> None:
+        """
+        Drop cached entries (including negative ones) after a user is written.
+
+        Args:
+            user_id (Optional[int]): The id of the written user.
+            email (Optional[str]): The email of the written user.
+        """
+        await self.invalidate_many(
+            [user_id] if user_id is not None else [],
+            [email] if email is not None else [],
+        )
+
+    async def invalidate_many(self, user_ids: list[int], emails: list[str]) -> None:
+        """
+        Drop the cached entries of several written users with one delete and one broadcast.
+
+        Args:
+            user_ids (list[int]): The ids of the written users.
+            emails (list[str]): The emails of the written users.
+        """
+        if self.backend is None:
+            return
+        keys = [self._id_key(user_id) for user_id in user_ids] + [self._email_key(email) for email in emails]
+        if not keys:
+            return
+        await self._drop(keys)
+        if self.invalidator is not None:
+            await self.invalidator.publish("user-cache", keys)
+
+
+def build_user_cache_backend(name: str) -> Optional[CacheBackend]:
+    """
+    Create the configured cache backend.
+
+    Args:
+        name (str): "memory", "redis" or "none".
+
+    Returns:
+        Optional[CacheBackend]: The backend, or None when caching is disabled.
+    """
+    if name == "none":
+        return None
+    if name == "memory":
+        return InMemoryCacheBackend(maxsize=settings.USER_CACHE_SIZE)
+    if name == "redis":
+        return RedisCacheBackend(create_redis_client(settings.REDIS_URL))
+    raise ValueError(f"Unknown user cache backend '{name}'")
+
+
+# Shared user cache used by the lookup helpers in src.utils.common; a Redis cache is
+# already shared, so only per-process caches broadcast their invalidations
+user_cache = UserCache(
+    build_user_cache_backend(settings.USER_CACHE_BACKEND),
+    ttl=settings.USER_CACHE_TTL,
+    negative_ttl=settings.USER_CACHE_NEGATIVE_TTL,
+    invalidator=cache_invalidator if settings.USER_CACHE_BACKEND == "memory" else None,
+)
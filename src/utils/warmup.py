@@ -0,0 +1,48 @@
+import logging
+import time
+from src.env.config import settings
+from src.env.database import warm_pool
+from src.utils.hash_utils import warm_up_hashing
+from src.utils.jwt_utils import create_access_token, decode_access_token
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """
+    Whether this worker should receive traffic.
+
+    Liveness only says the process is up; readiness stays False until the
+    warm-up has run, and goes back to False once shutdown starts so the load
+    balancer drains the worker first.
+    """
+
+    def __init__(self):
+        self.ready = False
+
+    def mark_ready(self) -> None:
+        self.ready = True
+
+    def mark_not_ready(self) -> None:
+        self.ready = False
+
+
+# Shared readiness flag read by /readyz
+readiness = Readiness()
+
+
+async def warm_up() -> None:
+    """
+    Pay the first-request costs before the worker reports ready.
+
+    Opens the minimum pool connections, loads the password hashing backends
+    in every hashing worker (and builds the dummy hash used for unknown
+    emails), and runs a sign/verify round trip so the JWT backend and keys
+    are initialised.
+    """
+    start = time.perf_counter()
+    await warm_pool(settings.DB_POOL_MIN_SIZE)
+    await warm_up_hashing()
+    decode_access_token(create_access_token({"sub": "warm-up"}))
+    readiness.mark_ready()
+    logger.info("Worker warmed up in %.2fs", time.perf_counter() - start)
@@ -0,0 +1,58 @@
+import os
+import tempfile
+
+import pytest
+
+# Point the service at an offline SQLite stand-in before any src module reads Settings
+_db_dir = tempfile.mkdtemp(prefix="inquest-auth-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_db_dir}/test.db")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+
+import httpx
+
+from src.env.database import engine
+from src.models.base import Base
+import src.models.user_model  # noqa: F401  (register tables on Base.metadata)
+import src.models.role_model  # noqa: F401
+import src.models.permission_model  # noqa: F401
+import src.models.token_model  # noqa: F401
+import src.models.revoked_token_model  # noqa: F401
+import src.models.session_model  # noqa: F401
+import src.models.auth_event_model  # noqa: F401
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def db_schema(anyio_backend):
+    from src.utils.audit_log import audit_log
+    from src.utils.rate_limiter import InMemoryRateLimitBackend, login_rate_limiter
+    from src.utils.session_store import session_store
+    from src.utils.token_cache import token_cache
+    from src.utils.user_cache import user_cache
+
+    # Ids restart with every fresh schema, so cached entries from earlier tests would be stale
+    token_cache.clear()
+    session_store.near_cache.clear()
+    user_cache.backend.clear()
+    login_rate_limiter.backend = InMemoryRateLimitBackend()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield
+    # Write this test's audit events while their table still exists
+    await audit_log.flush()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+
+
+@pytest.fixture
+async def client(db_schema):
+    from src.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as http_client:
+        yield http_client
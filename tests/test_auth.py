@@ -0,0 +1,331 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+USER = {"username": "jane", "email": "jane@example.com", "password": "s3cret-pass"}
+
+
+async def test_register_and_login(client):
+    response = await client.post("/auth/register", json=USER)
+    assert response.status_code == 200
+    assert response.json()["data"]["email"] == USER["email"]
+
+    response = await client.post("/auth/login", json={"email": USER["email"], "password": USER["password"]})
+    assert response.status_code == 200
+    assert response.json()["data"]["token_type"] == "bearer"
+
+
+async def test_register_duplicate_email(client):
+    await client.post("/auth/register", json=USER)
+    response = await client.post("/auth/register", json=USER)
+    assert response.status_code == 400
+
+
+async def test_login_wrong_password(client):
+    await client.post("/auth/register", json=USER)
+    response = await client.post("/auth/login", json={"email": USER["email"], "password": "nope"})
+    assert response.status_code == 401
+
+
+async def test_hashing_pool_rejects_when_queue_full(anyio_backend):
+    import asyncio
+
+    from src.utils.hash_executor import HashingExecutor, HashingPoolBusy
+    from src.utils.hash_utils import hash_password_sync
+
+    executor = HashingExecutor(mode="thread", max_concurrency=1, max_queue=1)
+    try:
+        running = asyncio.ensure_future(executor.run(hash_password_sync, "first"))
+        queued = asyncio.ensure_future(executor.run(hash_password_sync, "second"))
+        await asyncio.sleep(0)
+        with pytest.raises(HashingPoolBusy):
+            await executor.run(hash_password_sync, "third")
+        assert (await running).startswith("$argon2id$")
+        await queued
+    finally:
+        executor.shutdown()
+
+
+async def test_bulk_hashing_waits_for_a_full_queue_and_cancels_on_failure(anyio_backend):
+    import asyncio
+
+    from src.utils.hash_executor import HashingExecutor
+
+    executor = HashingExecutor(mode="thread", max_concurrency=1, max_queue=1)
+    try:
+        running = asyncio.ensure_future(executor.run(str.upper, "first"))
+        queued = asyncio.ensure_future(executor.run(str.upper, "second"))
+        await asyncio.sleep(0)
+        # The interactive queue is full, but bulk work waits its turn instead of failing
+        assert await executor.map(str.upper, ["a", "b", "c"]) == ["A", "B", "C"]
+        await asyncio.gather(running, queued)
+
+        calls = []
+
+        def fail_on_b(item):
+            calls.append(item)
+            if item == "b":
+                raise ValueError(item)
+            return item
+
+        wide = HashingExecutor(mode="thread", max_concurrency=2, max_queue=1)
+        try:
+            with pytest.raises(ValueError):
+                await wide.map(fail_on_b, ["a", "b", "c", "d", "e", "f"])
+            assert len(calls) < 6 and wide.queue_depth == 0
+        finally:
+            wide.shutdown()
+    finally:
+        executor.shutdown()
+
+
+async def test_legacy_bcrypt_hash_is_upgraded_on_login(client):
+    import asyncio
+
+    from sqlalchemy import select, update
+
+    from src.env.database import SessionLocal
+    from src.models.user_model import User
+    from src.utils.hash_utils import pwd_context
+
+    await client.post("/auth/register", json=USER)
+    legacy_hash = pwd_context.hash(USER["password"], scheme="bcrypt")
+    async with SessionLocal() as db:
+        await db.execute(update(User).where(User.email == USER["email"]).values(hashed_password=legacy_hash))
+        await db.commit()
+
+    response = await client.post("/auth/login", json={"email": USER["email"], "password": USER["password"]})
+    assert response.status_code == 200
+
+    from src.controllers.auth_controller import auth_service
+    await asyncio.gather(*auth_service._background_tasks)
+    async with SessionLocal() as db:
+        stored = (await db.execute(select(User.hashed_password).filter_by(email=USER["email"]))).scalar_one()
+    assert stored.startswith("$argon2id$")
+
+    # A rehash that lost the race with a password change leaves the new hash alone
+    changed_hash = pwd_context.hash("changed-pass")
+    async with SessionLocal() as db:
+        await db.execute(update(User).where(User.email == USER["email"]).values(hashed_password=changed_hash))
+        await db.commit()
+        user_id = (await db.execute(select(User.id).filter_by(email=USER["email"]))).scalar_one()
+    await auth_service._rehash_password(user_id, USER["password"], legacy_hash)
+    async with SessionLocal() as db:
+        stored = (await db.execute(select(User.hashed_password).filter_by(email=USER["email"]))).scalar_one()
+    assert stored == changed_hash
+
+
+async def test_refresh_rotates_and_detects_reuse(client):
+    await client.post("/auth/register", json=USER)
+    login = await client.post("/auth/login", json={"email": USER["email"], "password": USER["password"]})
+    first_refresh = login.json()["data"]["refresh_token"]
+
+    response = await client.post("/auth/refresh", json={"refresh_token": first_refresh})
+    assert response.status_code == 200
+    second_refresh = response.json()["data"]["refresh_token"]
+    assert second_refresh != first_refresh
+
+    # Replaying the rotated token revokes the whole family, including its successor
+    replay = await client.post("/auth/refresh", json={"refresh_token": first_refresh})
+    assert replay.status_code == 401
+    response = await client.post("/auth/refresh", json={"refresh_token": second_refresh})
+    assert response.status_code == 401
+
+
+async def test_metrics_record_login_stages(client):
+    await client.post("/auth/register", json=USER)
+    await client.post("/auth/login", json={"email": USER["email"], "password": USER["password"]})
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    body = response.text
+    assert 'auth_stage_duration_seconds_count{stage="password_verify"}' in body
+    assert 'http_request_duration_seconds_count{method="POST",route="/auth/login",status="200"}' in body
+    assert "hashing_queue_depth" in body
+
+
+async def test_login_is_throttled_per_email_with_retry_after(client):
+    from src.utils.rate_limiter import login_rate_limiter
+
+    attempts = [
+        await client.post("/auth/login", json={"email": "victim@example.com", "password": "guess"})
+        for _ in range(login_rate_limiter.email_limit + 1)
+    ]
+    assert {response.status_code for response in attempts[:-1]} == {401}
+    assert attempts[-1].status_code == 429
+    assert int(attempts[-1].headers["Retry-After"]) >= 1
+
+
+async def test_redis_rate_limit_backend_shares_counters(anyio_backend):
+    import fakeredis
+
+    from src.utils.rate_limiter import RedisRateLimitBackend
+
+    server = fakeredis.FakeServer()
+    workers = [RedisRateLimitBackend(fakeredis.FakeAsyncRedis(server=server)) for _ in range(2)]
+    results = [await workers[i % 2].hit("ip:10.0.0.1", limit=3, window=60) for i in range(4)]
+    assert results[:3] == [0, 0, 0]
+    assert results[3] > 0
+
+
+async def test_rate_limit_key_spray_does_not_reset_targeted_counters(anyio_backend):
+    from src.utils.rate_limiter import InMemoryRateLimitBackend
+
+    backend = InMemoryRateLimitBackend(max_keys=10)
+    for i in range(30):
+        await backend.hit("email:victim", limit=100, window=60)
+        await backend.hit(f"email:spray-{i}", limit=100, window=60)
+    assert len(backend._counters) == 10
+    assert backend._counters["email:victim"][2] == 30
+
+
+def test_sliding_window_weights_previous_window():
+    from src.utils.rate_limiter import sliding_window_retry_after
+
+    # Halfway through the window, 10 previous attempts still count as 5
+    assert sliding_window_retry_after(previous=10, current=5, elapsed=30, limit=10, window=60) == 0
+    retry_after = sliding_window_retry_after(previous=10, current=6, elapsed=30, limit=10, window=60)
+    assert retry_after == pytest.approx(6)
+
+
+async def test_unknown_email_pays_the_verify_cost(client, monkeypatch):
+    import src.services.auth_service as auth_service_module
+
+    calls = []
+    original = auth_service_module.verify_dummy_password
+
+    async def spy(password):
+        calls.append(password)
+        return await original(password)
+
+    monkeypatch.setattr(auth_service_module, "verify_dummy_password", spy)
+    await client.post("/auth/register", json=USER)
+
+    unknown = await client.post("/auth/login", json={"email": "nobody@example.com", "password": "guess"})
+    wrong = await client.post("/auth/login", json={"email": USER["email"], "password": "guess"})
+    assert calls == ["guess"]
+    assert unknown.status_code == wrong.status_code == 401
+    assert unknown.json() == wrong.json()
+
+
+async def test_roles_and_permissions_are_embedded_in_tokens(client):
+    from jose import jwt
+    from starlette.requests import Request
+
+    from src.env.database import SessionLocal
+    from src.models.permission_model import Permission
+    from src.models.role_model import Role, user_roles
+    from src.utils.permissions import PermissionDenied, decode_permissions, require_permission
+
+    registered = await client.post("/auth/register", json=USER)
+    async with SessionLocal() as db:
+        role = Role(name="importer", permissions=[Permission(name="users:import", bit=2)])
+        db.add(role)
+        await db.flush()
+        await db.execute(user_roles.insert().values(user_id=registered.json()["data"]["id"], role_id=role.id))
+        await db.commit()
+
+    login = await client.post("/auth/login", json={"email": USER["email"], "password": USER["password"]})
+    claims = jwt.get_unverified_claims(login.json()["data"]["access_token"])
+    assert claims["roles"] == ["importer"]
+    assert decode_permissions(claims["perm"]) == 0b100
+
+    await require_permission("users:import")(Request({"type": "http", "state": {"permissions": 0b100}}))
+    with pytest.raises(PermissionDenied):
+        await require_permission("users:write")(Request({"type": "http", "state": {"permissions": 0b100}}))
+
+
+def test_permission_claim_round_trips_wide_masks():
+    from src.utils.permissions import decode_permissions, encode_permissions
+
+    for mask in (0, 1, 0b10110, 1 << 70 | 1):
+        assert decode_permissions(encode_permissions(mask)) == mask
+
+
+async def test_login_attempts_are_audited_in_batches(client):
+    from sqlalchemy import select
+
+    from src.env.database import SessionLocal
+    from src.models.auth_event_model import AuthEvent
+    from src.utils.audit_log import audit_log
+
+    await client.post("/auth/register", json=USER, headers={"User-Agent": "tests"})
+    await client.post("/auth/login", json={"email": USER["email"], "password": "wrong-pass"})
+    await client.post("/auth/login", json={"email": USER["email"], "password": USER["password"]})
+    await audit_log.flush()
+
+    async with SessionLocal() as db:
+        events = (await db.execute(
+            select(AuthEvent.event_type, AuthEvent.outcome, AuthEvent.user_agent)
+            .where(AuthEvent.email == USER["email"])
+            .order_by(AuthEvent.occurred_at)
+        )).all()
+    assert [(event_type, outcome) for event_type, outcome, _ in events] == [
+        ("register", "success"), ("login", "invalid_credentials"), ("login", "success"),
+    ]
+    assert events[0].user_agent == "tests"
+
+
+async def test_audit_overflow_policies(anyio_backend, tmp_path):
+    from src.utils.audit_log import AuditLog, AuditSink
+
+    class ListSink(AuditSink):
+        def __init__(self):
+            self.batches = []
+
+        async def write(self, events):
+            self.batches.append([event["outcome"] for event in events])
+
+    sink = ListSink()
+    dropping = AuditLog(sink, max_queue=2, batch_size=2, overflow="drop")
+    for outcome in ("a", "b", "c"):
+        await dropping.record("login", outcome)
+    assert dropping.dropped == 1
+    await dropping.flush()
+    assert sink.batches == [["a", "b"]]
+
+    spill_path = str(tmp_path / "spill.ndjson")
+    spilling = AuditLog(sink, max_queue=1, batch_size=10, overflow="spill", spill_path=spill_path, flush_interval=60)
+    for outcome in ("d", "e", "f"):
+        await spilling.record("login", outcome)
+    await spilling.start()
+    await spilling.stop()
+    assert sink.batches[1:] == [["e", "f"], ["d"]]
+
+
+async def test_audit_partition_maintenance_runs_in_the_background(anyio_backend):
+    import asyncio
+
+    from src.utils.audit_log import AuditLog, AuditSink
+
+    class FlakySink(AuditSink):
+        def __init__(self):
+            self.attempts = 0
+
+        async def write(self, events):
+            pass
+
+        async def maintain(self):
+            self.attempts += 1
+            if self.attempts == 1:
+                raise RuntimeError("partition creation failed")
+
+    sink = FlakySink()
+    log = AuditLog(sink, maintenance_interval=0.01)
+    # A failing maintenance run neither aborts start nor stops later attempts
+    await log.start()
+    await asyncio.sleep(0.1)
+    await log.stop()
+    assert sink.attempts >= 2
+
+
+def test_month_partitions_roll_over_the_year():
+    from datetime import date
+
+    from src.utils.audit_log import _month_partitions
+
+    assert _month_partitions(date(2026, 11, 18), 3) == [
+        (date(2026, 11, 1), date(2026, 12, 1)),
+        (date(2026, 12, 1), date(2027, 1, 1)),
+        (date(2027, 1, 1), date(2027, 2, 1)),
+    ]
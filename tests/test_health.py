@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from src.env.database import engine
+from src.utils.auth_middleware import collect_public_paths
+from src.utils.hash_executor import HashingExecutor
+from src.utils.health import ReadinessProbe, readiness_probe
+from src.utils.warmup import readiness, warm_up
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_liveness_needs_no_token(client):
+    response = await client.get("/healthz")
+    assert response.status_code == 200
+
+
+async def test_readiness_waits_for_warm_up(client):
+    readiness.mark_not_ready()
+    assert (await client.get("/readyz")).status_code == 503
+
+    await warm_up()
+    response = await client.get("/readyz")
+    assert response.status_code == 200
+    assert response.json()["message"] == "Ready"
+    readiness.mark_not_ready()
+
+
+async def test_readiness_reports_dependency_checks(client):
+    await warm_up()
+    readiness_probe.invalidate()
+    response = await client.get("/readyz")
+    readiness.mark_not_ready()
+    assert response.status_code == 200
+    assert set(response.json()["data"]) == {"database", "pool", "hashing"}
+
+
+async def test_probe_results_are_cached(anyio_backend):
+    pings = 0
+
+    class CountingProbe(ReadinessProbe):
+        async def _ping(self):
+            nonlocal pings
+            pings += 1
+
+    probe = CountingProbe(engine, HashingExecutor(max_queue=10), ttl=60)
+    await asyncio.gather(*(probe.check() for _ in range(5)))
+    await probe.check()
+    assert pings == 1
+
+
+async def test_hashing_backlog_fails_readiness(anyio_backend):
+    executor = HashingExecutor(max_queue=10)
+    executor._waiting = 9
+    ready, checks = await ReadinessProbe(engine, executor, max_hash_backlog=0.8).check()
+    assert not ready
+    assert checks["hashing"] == {"ok": False, "queue_depth": 9, "in_flight": 0}
+
+
+def test_public_routes_are_collected_from_the_route_table():
+    from src.main import app
+
+    public_paths = collect_public_paths(app.routes)
+    assert {"/healthz", "/readyz"} <= public_paths
+    assert "/users/me" not in public_paths
+
+
+async def test_warm_pool_closes_opened_connections_when_one_fails(monkeypatch):
+    import src.env.database as database
+
+    closed = []
+
+    class Connection:
+        async def execute(self, statement):
+            pass
+
+        async def close(self):
+            closed.append(self)
+
+    attempts = iter([Connection(), OSError("refused"), Connection()])
+
+    class Engine:
+        async def connect(self):
+            result = next(attempts)
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+    monkeypatch.setattr(database, "engine", Engine())
+    with pytest.raises(OSError):
+        await database.warm_pool(3)
+    assert len(closed) == 2
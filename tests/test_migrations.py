@@ -0,0 +1,45 @@
+import pytest
+from alembic import command
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.utils.migrations import (
+    SchemaOutOfDate,
+    alembic_config,
+    check_schema_version,
+    current_revisions,
+    head_revisions,
+    upgrade,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def scratch_engine(anyio_backend, tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/migrations.db")
+    yield engine
+    await engine.dispose()
+
+
+async def _stamp_head(engine):
+    def stamp(connection):
+        alembic_cfg = alembic_config()
+        alembic_cfg.attributes["connection"] = connection
+        command.stamp(alembic_cfg, "head")
+
+    async with engine.begin() as conn:
+        await conn.run_sync(stamp)
+
+
+async def test_check_fails_until_schema_is_at_head(scratch_engine):
+    with pytest.raises(SchemaOutOfDate, match="src.migrate upgrade"):
+        await check_schema_version(scratch_engine)
+
+    await _stamp_head(scratch_engine)
+    assert await current_revisions(scratch_engine) == head_revisions()
+    await check_schema_version(scratch_engine)
+
+
+async def test_upgrade_is_a_no_op_at_head(scratch_engine):
+    await _stamp_head(scratch_engine)
+    assert await upgrade(scratch_engine) is False
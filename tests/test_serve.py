@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+
+async def _eventually(condition, timeout: float = 2) -> bool:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        if asyncio.get_running_loop().time() > deadline:
+            return False
+        await asyncio.sleep(0.01)
+    return True
+
+
+async def test_invalidations_reach_other_workers_caches(anyio_backend):
+    import fakeredis
+
+    from src.utils.invalidation import CacheInvalidator, RedisPubSubBackend
+    from src.utils.token_cache import TokenCache
+    from src.utils.user_cache import InMemoryCacheBackend, UserCache
+
+    server = fakeredis.FakeServer()
+    workers = []
+    for _ in range(2):
+        invalidator = CacheInvalidator(RedisPubSubBackend(fakeredis.FakeAsyncRedis(server=server)))
+        backend = InMemoryCacheBackend()
+        near_cache = TokenCache()
+        UserCache(backend, invalidator=invalidator)
+        invalidator.register("session-cache", near_cache.discard, near_cache.clear)
+        await invalidator.start()
+        workers.append((invalidator, backend, near_cache))
+
+    try:
+        (first, first_backend, _), (_, second_backend, second_near_cache) = workers
+        for backend in (first_backend, second_backend):
+            await backend.set("email:ann@example.com", "null", 60)
+        second_near_cache.set("handle", "session")
+
+        # A registration on the first worker clears the negative entry the second worker holds
+        await UserCache(first_backend, invalidator=first).invalidate(email="ann@example.com")
+        assert await first_backend.get("email:ann@example.com") is None
+        assert await _eventually(lambda: "email:ann@example.com" not in second_backend._entries)
+
+        await first.publish("session-cache", [TokenCache.digest("handle")])
+        assert await _eventually(lambda: second_near_cache.get("handle") is None)
+    finally:
+        for invalidator, _, _ in workers:
+            await invalidator.stop()
+
+
+async def test_invalidator_ignores_its_own_messages(anyio_backend):
+    from src.utils.invalidation import CacheInvalidator, InMemoryPubSubBackend
+
+    received = []
+    backend = InMemoryPubSubBackend()
+    sender = CacheInvalidator(backend)
+    sender.register("cache", received.append)
+    receiver = CacheInvalidator(backend)
+    receiver.register("cache", received.append)
+    await sender.start()
+    await receiver.start()
+    try:
+        await sender.publish("cache", ["a", "b"])
+        assert await _eventually(lambda: received == [["a", "b"]])
+        await asyncio.sleep(0.05)
+        assert received == [["a", "b"]]
+    finally:
+        await sender.stop()
+        await receiver.stop()
+
+
+def test_server_options_default_to_one_worker_per_cpu(monkeypatch):
+    from src import serve
+
+    monkeypatch.setattr(serve, "_cgroup_cpu_limit", lambda: 1.5)
+    assert 1 <= serve.available_cpus() <= 2
+
+    monkeypatch.setattr(serve, "available_cpus", lambda: 3)
+    assert serve.server_options("127.0.0.1", 9000, 0)["workers"] == 3
+    options = serve.server_options("127.0.0.1", 9000, 5)
+    assert options["workers"] == 5
+    assert options["loop"] in ("uvloop", "asyncio") and options["http"] in ("httptools", "h11")
+    assert options["proxy_headers"] and options["forwarded_allow_ips"] == serve.settings.SERVER_FORWARDED_ALLOW_IPS
+
+
+def test_hashing_concurrency_is_split_between_workers(monkeypatch):
+    from src import serve
+
+    monkeypatch.setattr(serve.settings, "HASH_MAX_CONCURRENCY", 8)
+    assert serve.hash_concurrency_per_worker(4) == 2
+    assert serve.hash_concurrency_per_worker(16) == 1
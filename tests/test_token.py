@@ -0,0 +1,299 @@
+import time
+
+import pytest
+
+from src.utils.token_cache import TokenCache
+
+
+def test_token_cache_hit_and_miss_counters():
+    cache = TokenCache(maxsize=10, ttl=60)
+    assert cache.get("token") is None
+    cache.set("token", "user")
+    assert cache.get("token") == "user"
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+
+def test_token_cache_never_outlives_token_exp():
+    cache = TokenCache(maxsize=10, ttl=60)
+    cache.set("expired", "user", exp=time.time() - 1)
+    cache.set("expiring", "user", exp=time.time() + 0.05)
+    assert cache.get("expired") is None
+    assert cache.get("expiring") == "user"
+    time.sleep(0.06)
+    assert cache.get("expiring") is None
+
+
+def test_token_cache_evicts_least_recently_used():
+    cache = TokenCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def _write_rsa_key(directory, kid):
+    import rsa
+
+    _, private_key = rsa.newkeys(1024)
+    (directory / f"{kid}.pem").write_bytes(private_key.save_pkcs1())
+
+
+def test_rs256_key_rotation_verifies_old_and_new_keys(tmp_path):
+    from src.utils.jwt_keys import KeyRing
+
+    _write_rsa_key(tmp_path, "2024-01")
+    old_ring = KeyRing(algorithm="RS256", keys_dir=str(tmp_path))
+    old_token = old_ring.sign({"id": 1})
+
+    _write_rsa_key(tmp_path, "2024-02")
+    ring = KeyRing(algorithm="RS256", keys_dir=str(tmp_path))
+    new_token = ring.sign({"id": 2})
+
+    assert ring.signing_key.kid == "2024-02"
+    assert ring.verify(old_token)["id"] == 1
+    assert ring.verify(new_token)["id"] == 2
+    assert {key["kid"] for key in ring.jwks["keys"]} == {"2024-01", "2024-02"}
+    assert all("d" not in key for key in ring.jwks["keys"])
+
+
+def test_jwks_verifies_tokens_offline(tmp_path):
+    from jose import jwt
+
+    from src.utils.jwt_keys import KeyRing
+
+    _write_rsa_key(tmp_path, "main")
+    ring = KeyRing(algorithm="RS256", keys_dir=str(tmp_path))
+    token = ring.sign({"id": 7})
+    assert jwt.decode(token, ring.jwks, algorithms=["RS256"])["id"] == 7
+
+
+def test_bloom_filter_has_no_false_negatives():
+    from src.utils.bloom_filter import BloomFilter
+
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    items = [f"jti-{i}" for i in range(1000)]
+    for item in items:
+        bloom.add(item)
+    assert all(item in bloom for item in items)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10000))
+    assert false_positives < 300
+
+
+def test_bloom_filter_counts_repeated_adds_once():
+    from src.utils.bloom_filter import BloomFilter
+
+    bloom = BloomFilter(capacity=2, error_rate=0.01)
+    for _ in range(3):
+        bloom.add("jti-1")
+        bloom.add("jti-2")
+    assert bloom.count == 2 and not bloom.is_saturated
+
+
+@pytest.mark.anyio
+async def test_revoked_access_token_is_rejected(client):
+    user = {"username": "rita", "email": "rita@example.com", "password": "s3cret-pass"}
+    await client.post("/auth/register", json=user)
+    login = await client.post("/auth/login", json={"email": user["email"], "password": user["password"]})
+    token = login.json()["data"]["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert (await client.get("/users/me", headers=headers)).status_code == 200
+    assert (await client.post("/auth/revoke", json={"token": token})).status_code == 200
+    response = await client.get("/users/me", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["message"] == "Token revoked"
+
+
+@pytest.mark.anyio
+async def test_opaque_session_tokens_introspect_and_revoke(client, monkeypatch):
+    from src.env.config import settings
+    from src.env.database import SessionLocal
+    from src.models.permission_model import Permission
+    from src.models.role_model import Role, user_roles
+
+    monkeypatch.setattr(settings, "TOKEN_MODE", "opaque")
+    user = {"username": "omar", "email": "omar@example.com", "password": "s3cret-pass"}
+    registered = await client.post("/auth/register", json=user)
+    async with SessionLocal() as db:
+        role = Role(name="gateway", permissions=[Permission(name="tokens:introspect", bit=4)])
+        db.add(role)
+        await db.flush()
+        await db.execute(user_roles.insert().values(user_id=registered.json()["data"]["id"], role_id=role.id))
+        await db.commit()
+
+    login = await client.post("/auth/login", json={"email": user["email"], "password": user["password"]})
+    token = login.json()["data"]["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    assert "." not in token and len(token) < 64
+    assert (await client.get("/users/me", headers=headers)).json()["data"]["email"] == user["email"]
+
+    introspection = await client.post(
+        "/auth/introspect", content=f"token={token}", headers={**headers, "Content-Type": "application/x-www-form-urlencoded"}
+    )
+    assert introspection.json()["active"] is True
+    assert introspection.json()["scope"] == "tokens:introspect"
+
+    # Introspect from a second session, then revoke the first
+    second = await client.post("/auth/login", json={"email": user["email"], "password": user["password"]})
+    second_headers = {"Authorization": f"Bearer {second.json()['data']['access_token']}"}
+    assert (await client.post("/auth/revoke", json={"token": token})).status_code == 200
+    assert (await client.get("/users/me", headers=headers)).status_code == 401
+    introspection = await client.post("/auth/introspect", json={"token": token}, headers=second_headers)
+    assert introspection.json() == {"active": False}
+
+    for body in ("{not json", "[1, 2]"):
+        malformed = await client.post(
+            "/auth/introspect", content=body, headers={**second_headers, "Content-Type": "application/json"}
+        )
+        assert malformed.status_code == 400
+        assert malformed.json()["message"].startswith("invalid_request")
+
+
+async def test_junk_bearer_tokens_are_rejected_without_a_session_lookup(client, monkeypatch):
+    from src.env.config import settings
+    from src.utils.session_store import is_session_handle, session_store
+
+    async def unexpected(*args, **kwargs):
+        raise AssertionError("the session store was queried")
+
+    monkeypatch.setattr(session_store, "resolve", unexpected)
+    handle_shaped = "a" * 43
+    for mode, token in (("jwt", handle_shaped), ("opaque", "junk"), ("opaque", "a" * 44)):
+        monkeypatch.setattr(settings, "TOKEN_MODE", mode)
+        assert not is_session_handle(token)
+        response = await client.get("/users/me", headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 401 and response.json()["message"] == "Invalid token"
+
+    monkeypatch.setattr(settings, "TOKEN_MODE", "opaque")
+    assert is_session_handle(handle_shaped)
+
+
+@pytest.mark.anyio
+async def test_sliding_expiry_is_written_back_in_batches(anyio_backend):
+    from src.utils.session_store import InMemorySessionBackend, SessionRecord, SessionStore, hash_session_handle
+
+    writes = []
+
+    class RecordingBackend(InMemorySessionBackend):
+        async def touch_many(self, expiries):
+            writes.append(dict(expiries))
+            await super().touch_many(expiries)
+
+    store = SessionStore(RecordingBackend(), idle_timeout=100, max_lifetime=1000, touch_interval=10)
+    handle = await store.create({"id": 1, "username": "u", "email": "u@example.com"})
+    key = hash_session_handle(handle)
+    now = time.time()
+    await store.backend.create(key, SessionRecord({"id": 1}, now + 50, now + 1000))
+    store.near_cache.clear()
+
+    for _ in range(5):
+        assert (await store.resolve(handle)).expires_at >= now + 100
+    assert writes == []
+    assert (await store.backend.get(key)).expires_at < now + 51
+
+    await store.flush()
+    assert len(writes) == 1
+    assert (await store.backend.get(key)).expires_at >= now + 100
+
+
+@pytest.mark.anyio
+async def test_saturated_revocation_filter_is_rebuilt_without_a_gap(anyio_backend):
+    import asyncio
+    from datetime import datetime, timedelta, timezone
+
+    from src.utils.revocation import InMemoryRevocationBackend, RevocationList
+
+    backend = InMemoryRevocationBackend()
+    revocations = RevocationList(backend, capacity=4)
+    live = datetime.now(timezone.utc) + timedelta(hours=1)
+    short_lived = datetime.now(timezone.utc) + timedelta(seconds=0.2)
+    for i in range(3):
+        await backend.revoke(f"old-{i}", short_lived)
+    await backend.revoke("live", live)
+    await revocations.sync()
+    await revocations.revoke("late", live)
+    assert revocations._filter.is_saturated
+    await asyncio.sleep(0.3)
+
+    # The feed fails mid-rebuild: the old filter must stay in place
+    original = backend.changes_since
+
+    async def failing(cursor):
+        raise ConnectionError("backend down")
+
+    backend.changes_since = failing
+    with pytest.raises(ConnectionError):
+        await revocations.sync()
+    assert await revocations.is_revoked("live") and await revocations.is_revoked("late")
+
+    backend.changes_since = original
+    await revocations.sync()
+    assert not revocations._filter.is_saturated and revocations._filter.count == 2
+    assert await revocations.is_revoked("live") and await revocations.is_revoked("late")
+    assert not await revocations.is_revoked("old-0")
+
+    # Expired ids were purged, so the next sync reads only new changes instead of rebuilding again
+    await backend.revoke("newer", live)
+    await revocations.sync()
+    assert revocations._filter.count == 3 and await revocations.is_revoked("newer")
+
+
+def test_incomplete_revocation_backend_fails_when_created():
+    from src.utils.revocation import InMemoryRevocationBackend, RevocationBackend
+
+    class WithoutFeed(RevocationBackend):
+        async def revoke(self, jti, expires_at):
+            pass
+
+        async def is_revoked(self, jti):
+            return False
+
+    with pytest.raises(TypeError):
+        WithoutFeed()
+    InMemoryRevocationBackend()
+
+
+@pytest.mark.anyio
+async def test_concurrent_revocations_of_one_token_both_succeed(db_schema):
+    import asyncio
+    from datetime import datetime, timedelta, timezone
+
+    from src.utils.revocation import DatabaseRevocationBackend
+
+    backend = DatabaseRevocationBackend()
+    expires_at = datetime.now(timezone.utc) + timedelta(hours=1)
+    await asyncio.gather(*(backend.revoke("same-jti", expires_at) for _ in range(3)))
+    await backend.revoke("same-jti", expires_at)
+    assert await backend.is_revoked("same-jti")
+    changes, _ = await backend.changes_since(None)
+    assert [jti for jti, _ in changes] == ["same-jti"]
+
+
+@pytest.mark.anyio
+async def test_revocation_feed_catches_rows_that_commit_out_of_order(db_schema):
+    from datetime import datetime, timedelta, timezone
+
+    from src.env.database import SessionLocal
+    from src.models.revoked_token_model import RevokedToken
+    from src.utils.revocation import DatabaseRevocationBackend, RevocationList
+
+    now = datetime.now(timezone.utc)
+    live = now + timedelta(hours=1)
+    revocations = RevocationList(DatabaseRevocationBackend(overlap=30))
+    async with SessionLocal() as db:
+        db.add(RevokedToken(id=1, jti="settled", expires_at=live, revoked_at=now - timedelta(hours=1)))
+        # Committed first, though a transaction that started earlier took id 2
+        db.add(RevokedToken(id=3, jti="later", expires_at=live, revoked_at=now - timedelta(seconds=1)))
+        await db.commit()
+    await revocations.sync()
+    assert revocations.might_be_revoked("settled") and revocations.might_be_revoked("later")
+
+    async with SessionLocal() as db:
+        db.add(RevokedToken(id=2, jti="slow", expires_at=live, revoked_at=now - timedelta(seconds=2)))
+        await db.commit()
+    await revocations.sync()
+    assert await revocations.is_revoked("slow")
+    # The cursor moved past the settled row only
+    assert revocations._cursor[1] == 1
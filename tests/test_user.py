@@ -0,0 +1,315 @@
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+USER = {"username": "sam", "email": "sam@example.com", "password": "s3cret-pass"}
+
+
+async def _login(client) -> dict:
+    registered = await client.post("/auth/register", json=USER)
+    login = await client.post("/auth/login", json={"email": USER["email"], "password": USER["password"]})
+    token = login.json()["data"]["access_token"]
+    return {"user": registered.json()["data"], "headers": {"Authorization": f"Bearer {token}"}}
+
+
+async def test_read_users_me(client):
+    session = await _login(client)
+    response = await client.get("/users/me", headers=session["headers"])
+    assert response.status_code == 200
+    assert response.json()["data"]["email"] == USER["email"]
+
+
+async def test_get_user_by_id(client):
+    session = await _login(client)
+    response = await client.get(f"/users/{session['user']['id']}", headers=session["headers"])
+    assert response.status_code == 200
+    assert response.json()["data"]["username"] == USER["username"]
+
+
+async def test_unknown_user_returns_404_envelope(client):
+    session = await _login(client)
+    response = await client.get("/users/999999", headers=session["headers"])
+    assert response.status_code == 404
+    assert response.json() == {"error": True, "message": "User not found", "data": None}
+
+
+async def test_missing_authorization_header(client):
+    response = await client.get("/users/me")
+    assert response.status_code == 401
+
+
+async def test_malformed_authorization_header(client):
+    response = await client.get("/users/me", headers={"Authorization": "Bearer"})
+    assert response.status_code == 401
+    assert response.json()["message"] == "Invalid authorization header"
+
+
+def test_exempt_paths_match_at_segment_boundaries():
+    from src.utils.auth_middleware import compile_exempt_paths
+
+    pattern = compile_exempt_paths(["/auth/", "/docs"])
+    assert pattern.match("/auth/login")
+    assert pattern.match("/docs") and pattern.match("/docs/oauth2-redirect")
+    assert not pattern.match("/docsx")
+    assert not pattern.match("/users/me")
+
+
+async def test_user_cache_coalesces_concurrent_misses(anyio_backend):
+    import asyncio
+
+    from src.utils.user_cache import InMemoryCacheBackend, UserCache
+
+    cache = UserCache(InMemoryCacheBackend(), ttl=60, negative_ttl=60)
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return {"id": 1, "username": "sam", "email": "sam@example.com", "hashed_password": "x"}
+
+    results = await asyncio.gather(*(cache.get_by_id(1, load) for _ in range(20)))
+    assert calls == 1
+    assert all(result["username"] == "sam" for result in results)
+    assert (await cache.get_by_email("sam@example.com", load))["id"] == 1
+    assert calls == 1
+
+
+async def test_user_cache_negative_entries_and_invalidation(anyio_backend):
+    import fakeredis
+
+    from src.utils.user_cache import RedisCacheBackend, UserCache
+
+    cache = UserCache(RedisCacheBackend(fakeredis.FakeAsyncRedis()), ttl=60, negative_ttl=60)
+    calls = 0
+
+    async def missing():
+        nonlocal calls
+        calls += 1
+        return None
+
+    assert await cache.get_by_email("ghost@example.com", missing) is None
+    assert await cache.get_by_email("ghost@example.com", missing) is None
+    assert calls == 1
+
+    await cache.invalidate(email="ghost@example.com")
+    assert await cache.get_by_email("ghost@example.com", missing) is None
+    assert calls == 2
+
+
+async def test_load_racing_an_invalidation_is_not_cached(anyio_backend):
+    import asyncio
+
+    from src.utils.user_cache import InMemoryCacheBackend, UserCache
+
+    cache = UserCache(InMemoryCacheBackend())
+    started, release = asyncio.Event(), asyncio.Event()
+    stored = {"id": 1, "username": "ann", "email": "ann@example.com", "hashed_password": "h"}
+
+    async def slow_missing():
+        # A login lookup that began before the account existed
+        started.set()
+        await release.wait()
+        return None
+
+    async def found():
+        return stored
+
+    lookup = asyncio.create_task(cache.get_by_email("ann@example.com", slow_missing))
+    await started.wait()
+    await cache.invalidate(user_id=1, email="ann@example.com")
+    release.set()
+    assert await lookup is None
+
+    # The stale "unknown email" result was not cached, so the new account is found
+    assert await cache.get_by_email("ann@example.com", found) == stored
+
+
+async def test_shared_cache_does_not_store_password_hashes(anyio_backend):
+    import fakeredis
+
+    from src.utils.user_cache import RedisCacheBackend, UserCache
+
+    client = fakeredis.FakeAsyncRedis()
+    cache = UserCache(RedisCacheBackend(client))
+    record = {"id": 1, "username": "ann", "email": "ann@example.com", "hashed_password": "secret-hash"}
+
+    async def load():
+        return record
+
+    assert await cache.get_by_id(1, load) == record
+    assert b"secret-hash" not in await client.get("user-cache:id:1")
+    assert "hashed_password" not in await cache.get_by_email("ann@example.com", load)
+
+
+async def test_credential_lookups_bypass_a_shared_cache(client, monkeypatch):
+    import fakeredis
+
+    import src.utils.common as common
+    from src.env.database import SessionLocal
+    from src.utils.user_cache import RedisCacheBackend, UserCache
+
+    await client.post("/auth/register", json=USER)
+    redis = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(common, "user_cache", UserCache(RedisCacheBackend(redis)))
+    async with SessionLocal() as db:
+        user = await common.get_user_by_email(USER["email"], db)
+    assert user.hashed_password
+    assert await redis.keys("*") == []
+
+
+async def test_batch_lookup_returns_users_in_request_order(client):
+    session = await _login(client)
+    other = await client.post("/auth/register", json={"username": "ana", "email": "ana@example.com", "password": "pw-12345"})
+    ids = [other.json()["data"]["id"], session["user"]["id"], 999]
+
+    response = await client.post("/users/batch", json={"ids": ids}, headers=session["headers"])
+    assert response.status_code == 200
+    assert [user["username"] for user in response.json()["data"]] == ["ana", "sam"]
+
+    response = await client.get(f"/users?ids={ids[0]},{ids[1]}", headers=session["headers"])
+    assert [user["username"] for user in response.json()["data"]] == ["ana", "sam"]
+
+
+async def test_batch_loader_merges_concurrent_lookups(anyio_backend):
+    import asyncio
+
+    from src.utils.batch_loader import BatchLoader
+
+    batches = []
+
+    async def batch_fn(keys):
+        batches.append(sorted(keys))
+        return {key: key * 10 for key in keys if key != 3}
+
+    loader = BatchLoader(batch_fn, window=0.005)
+    results = await asyncio.gather(*(loader.load(key) for key in [1, 2, 2, 3]))
+    assert results == [10, 20, 20, None]
+    assert batches == [[1, 2, 3]]
+
+
+async def _grant(user_id: int, permission: str, bit: int) -> None:
+    from src.env.database import SessionLocal
+    from src.models.permission_model import Permission
+    from src.models.role_model import Role, user_roles
+
+    async with SessionLocal() as db:
+        role = Role(name=permission, permissions=[Permission(name=permission, bit=bit)])
+        db.add(role)
+        await db.flush()
+        await db.execute(user_roles.insert().values(user_id=user_id, role_id=role.id))
+        await db.commit()
+
+
+async def test_bulk_import_reports_row_errors_without_aborting(client, monkeypatch):
+    import json
+
+    from src.utils.hash_utils import pwd_context
+    from src.utils.user_cache import user_cache
+
+    registered = await client.post("/auth/register", json=USER)
+    body = "\n".join([
+        json.dumps({"username": "ann", "email": "ann@example.com", "password": "ann-pass"}),
+        json.dumps({"username": "bob", "email": "bob@example.com", "hashed_password": pwd_context.hash("bob-pass", scheme="bcrypt")}),
+        json.dumps({"username": "ann2", "email": "ann@example.com", "password": "x"}),
+        json.dumps({"username": "sam2", "email": USER["email"], "password": "x"}),
+        "{not json",
+        json.dumps({"username": "eve", "email": "eve@example.com"}),
+    ]).encode() + b"\n" + json.dumps({"username": "ida", "email": "ida@example.com", "password": "x"}).encode().replace(b"ida", b"id\xe9", 1)
+
+    session = await _login(client)
+    assert (await client.post("/users/import", content=body, headers=session["headers"])).status_code == 403
+
+    await _grant(registered.json()["data"]["id"], "users:import", 2)
+    session = await _login(client)
+    invalidated = []
+    invalidate_many = user_cache.invalidate_many
+
+    async def recording(user_ids, emails):
+        invalidated.append(sorted(emails))
+        await invalidate_many(user_ids, emails)
+
+    monkeypatch.setattr(user_cache, "invalidate_many", recording)
+    response = await client.post("/users/import", content=body, headers=session["headers"])
+    assert response.status_code == 200
+    report = response.json()["data"]
+    assert (report["imported"], report["failed"]) == (2, 5)
+    assert [error["line"] for error in report["errors"]] == [3, 5, 6, 7, 4]
+    assert report["errors"][3]["error"] == "Malformed row"
+    # One invalidation for the whole chunk
+    assert invalidated == [["ann@example.com", "bob@example.com"]]
+
+    login = await client.post("/auth/login", json={"email": "bob@example.com", "password": "bob-pass"})
+    assert login.status_code == 200
+
+
+async def test_csv_rows_are_parsed_against_the_header(anyio_backend):
+    from src.services.user_import_service import iter_lines, parse_rows
+
+    async def chunks():
+        yield b"username,email,password\r\nann,ann@exa"
+        yield b"mple.com,\"p,w\"\r\n\r\nbad,row\n"
+
+    rows = [row async for row in parse_rows(iter_lines(chunks()), "csv")]
+    assert rows == [(2, {"username": "ann", "email": "ann@example.com", "password": "p,w"}), (4, None)]
+
+
+async def test_list_users_pages_by_id_and_searches_by_prefix(client):
+    import json
+
+    registered = await client.post("/auth/register", json=USER)
+    for name in ("ann", "annie", "bob"):
+        await client.post("/auth/register", json={"username": name, "email": f"{name}@example.com", "password": "pw-pass"})
+
+    session = await _login(client)
+    assert (await client.get("/users", headers=session["headers"])).status_code == 403
+    assert (await client.get("/users/export", headers=session["headers"])).status_code == 403
+
+    await _grant(registered.json()["data"]["id"], "users:read", 0)
+    session = await _login(client)
+    first = (await client.get("/users", params={"limit": 3}, headers=session["headers"])).json()["data"]
+    assert [user["username"] for user in first["items"]] == ["sam", "ann", "annie"]
+    second = (await client.get("/users", params={"limit": 3, "after": first["next_after"]}, headers=session["headers"])).json()["data"]
+    assert [user["username"] for user in second["items"]] == ["bob"] and second["next_after"] is None
+
+    search = await client.get("/users", params={"q": "ANN"}, headers=session["headers"])
+    assert [user["username"] for user in search.json()["data"]["items"]] == ["ann", "annie"]
+    assert (await client.get("/users", params={"q": "%"}, headers=session["headers"])).json()["data"]["items"] == []
+
+    export = await client.get("/users/export", params={"q": "a"}, headers=session["headers"])
+    assert export.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line)["email"] for line in export.text.splitlines()] == ["ann@example.com", "annie@example.com"]
+
+
+async def test_replica_reads_fail_over_and_respect_recent_writes(db_schema, tmp_path):
+    from src.env.database import ReplicaRouter, SessionLocal, engine_options
+    from sqlalchemy.ext.asyncio import create_async_engine
+    from src.models.base import Base
+    from src.models.user_model import User
+    from src.utils.common import load_user_records
+
+    # A second SQLite database stands in for a replica that has not caught up
+    replica_url = f"sqlite+aiosqlite:///{tmp_path}/replica.db"
+    replica = create_async_engine(replica_url, **engine_options(replica_url))
+    async with replica.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(User.__table__.insert().values(id=1, username="stale", email="ann@example.com"))
+    await replica.dispose()
+    async with SessionLocal() as db:
+        db.add(User(id=1, username="ann", email="ann@example.com"))
+        await db.commit()
+
+    unreachable_url = f"sqlite+aiosqlite:///{tmp_path}/missing/replica.db"
+    router = ReplicaRouter(SessionLocal, [unreachable_url, replica_url], sticky_window=60, retry_interval=60)
+    try:
+        async def read_username() -> str:
+            records = await router.run_read(lambda db: load_user_records([1], db), keys=["user:1"])
+            return records[1]["username"]
+
+        assert [await read_username() for _ in range(2)] == ["stale", "stale"]
+        assert router._replica_order() == [1]
+
+        await router.mark_written(["user:1"])
+        assert await read_username() == "ann"
+    finally:
+        await router.dispose()